@@ -0,0 +1,201 @@
+import atexit
+import concurrent.futures
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import Counter
+
+
+class ConversionCache:
+    """Content-addressed cache of pdf2htmlEX outputs. An entry is keyed by the hash of the pdf content and of the
+    conversion settings, hence identical resumes uploaded under different names share the entry, and replacing a pdf
+    changes its key. Each entry is a directory in cache_dir holding the generated files (optionally gzip compressed)
+    and a metadata file. When the cache grows over max_size bytes, the least recently used entries are evicted, except
+    for the entries in use (see lookup and release). Concurrent conversions of the same key are run only once (see
+    start_conversion)."""
+
+    METADATA_FILENAME = "conversion.json"
+
+    def __init__(self, cache_dir, max_size=None, compress=False):
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_size = max_size
+        self.compress = compress
+        self.scratch_dir = None
+        self.lock = threading.Lock()
+        # Conversions in progress: key -> Future of the (status code, error output) of the conversion.
+        self.conversions_in_progress = {}
+        # Number of users of the entries returned by lookup (key -> count), these entries are not evicted.
+        self.pinned_keys = Counter()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        atexit.register(self.close)
+
+    def get_key(self, pdf_path, settings):
+        """Returns the cache key of the pdf file converted with the given settings (list of pdf2htmlEX arguments)."""
+        content_hash = hashlib.sha256()
+        with open(pdf_path, 'rb') as pdf_file:
+            for chunk in iter(lambda: pdf_file.read(1024 * 1024), b''):
+                content_hash.update(chunk)
+        content_hash.update(json.dumps(settings).encode("utf-8"))
+        return content_hash.hexdigest()
+
+    def get_entry_dir(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def lookup(self, key):
+        """Returns the path of the cached html for the key, or None if the key is not cached. The entry is marked as
+        recently used, and isn't evicted until the html is released (see release). Compressed entries are expanded
+        into a scratch directory, which is removed on close()."""
+
+        with self.lock:
+            self.pinned_keys[key] += 1
+        metadata = self.load_metadata(key)
+        if metadata is None:
+            self.unpin(key)
+            return None
+        entry_dir = self.get_entry_dir(key)
+        os.utime(os.path.join(entry_dir, self.METADATA_FILENAME))
+        if not metadata['compressed']:
+            return os.path.join(entry_dir, metadata['html'])
+        return os.path.join(self.expand_entry(key, metadata), metadata['html'])
+
+    def release(self, html_path):
+        """Releases the entry of the html returned by lookup, once its files are not read any more. The entry can be
+        evicted again."""
+        self.unpin(os.path.basename(os.path.dirname(html_path)))
+
+    def unpin(self, key):
+        with self.lock:
+            self.pinned_keys[key] -= 1
+            if self.pinned_keys[key] <= 0:
+                del self.pinned_keys[key]
+
+    def start_conversion(self, key):
+        """Registers a conversion of the key. Returns the Future of the conversion of the key, and whether the caller
+        has to run the conversion (and report its status code and error output with finish_conversion). Otherwise the
+        key is being converted already, and the caller waits for the Future instead of converting the pdf again."""
+        with self.lock:
+            conversion = self.conversions_in_progress.get(key)
+            if conversion is not None:
+                return conversion, False
+            conversion = self.conversions_in_progress[key] = concurrent.futures.Future()
+            return conversion, True
+
+    def finish_conversion(self, key, status_code, error_output=""):
+        """Reports the end of the conversion started with start_conversion to the callers waiting for it."""
+        with self.lock:
+            conversion = self.conversions_in_progress.pop(key)
+        conversion.set_result((status_code, error_output))
+
+    def load_metadata(self, key):
+        """Returns the metadata of the entry (see store), or None if the key is not cached."""
+        try:
+            with open(os.path.join(self.get_entry_dir(key), self.METADATA_FILENAME)) as metadata_file:
+                return json.load(metadata_file)
+        except (OSError, ValueError):
+            return None
+
+    def expand_entry(self, key, metadata):
+        """Decompresses the files of the entry into the scratch directory and returns the directory of the files."""
+        with self.lock:
+            if self.scratch_dir is None:
+                self.scratch_dir = tempfile.mkdtemp(prefix="cv-parser-cache-")
+        expanded_dir = os.path.join(self.scratch_dir, key)
+        if not os.path.isdir(expanded_dir):
+            temporary_dir = tempfile.mkdtemp(dir=self.scratch_dir)
+            for filename in metadata['files']:
+                with gzip.open(os.path.join(self.get_entry_dir(key), filename + ".gz"), 'rb') as compressed_file, \
+                        open(os.path.join(temporary_dir, filename), 'wb') as expanded_file:
+                    shutil.copyfileobj(compressed_file, expanded_file)
+            try:
+                os.rename(temporary_dir, expanded_dir)
+            except OSError:
+                # Expanded by another thread in the meantime.
+                shutil.rmtree(temporary_dir, ignore_errors=True)
+        return expanded_dir
+
+    def create_output_dir(self):
+        """Returns a new, empty directory for a conversion, whose output is stored later with store()."""
+        return tempfile.mkdtemp(prefix=".converting-", dir=self.cache_dir)
+
+    def store(self, key, output_dir, html_filename, metadata=None):
+        """Moves the files generated into output_dir (see create_output_dir) into the cache entry of the key.
+        html_filename is the name of the generated html file, metadata is an optional dictionary of additional
+        information stored with the entry. Evicts the least recently used entries, if the cache grew too large."""
+
+        entry_metadata = dict(metadata or {})
+        entry_metadata['html'] = html_filename
+        entry_metadata['compressed'] = self.compress
+        entry_metadata['files'] = sorted(os.listdir(output_dir))
+        entry_metadata['created'] = time.time()
+
+        if self.compress:
+            for filename in entry_metadata['files']:
+                file_path = os.path.join(output_dir, filename)
+                with open(file_path, 'rb') as original_file, gzip.open(file_path + ".gz", 'wb') as compressed_file:
+                    shutil.copyfileobj(original_file, compressed_file)
+                os.remove(file_path)
+
+        with open(os.path.join(output_dir, self.METADATA_FILENAME), 'w') as metadata_file:
+            json.dump(entry_metadata, metadata_file)
+
+        try:
+            # The rename is atomic, readers never see a half-written entry.
+            os.rename(output_dir, self.get_entry_dir(key))
+        except OSError:
+            # The same pdf was stored in the meantime.
+            shutil.rmtree(output_dir, ignore_errors=True)
+        self.evict(keep=key)
+
+    def evict(self, keep=None):
+        """Removes the least recently used entries (except for keep and the entries in use) until the cache fits into
+        max_size bytes."""
+        if self.max_size is None:
+            return
+
+        with self.lock:
+            entries = []
+            total_size = 0
+            for key in os.listdir(self.cache_dir):
+                if key.startswith('.'):
+                    # Conversion in progress (see create_output_dir).
+                    continue
+                metadata_path = os.path.join(self.get_entry_dir(key), self.METADATA_FILENAME)
+                if not os.path.isfile(metadata_path):
+                    continue
+                entry_size = get_directory_size(self.get_entry_dir(key))
+                entries.append((os.path.getmtime(metadata_path), key, entry_size))
+                total_size += entry_size
+
+            for last_used, key, entry_size in sorted(entries):
+                if total_size <= self.max_size:
+                    break
+                if key == keep or key in self.pinned_keys:
+                    continue
+                shutil.rmtree(self.get_entry_dir(key), ignore_errors=True)
+                if self.scratch_dir is not None:
+                    shutil.rmtree(os.path.join(self.scratch_dir, key), ignore_errors=True)
+                total_size -= entry_size
+
+    def close(self):
+        """Removes the scratch directory of the expanded entries."""
+        with self.lock:
+            if self.scratch_dir is not None:
+                shutil.rmtree(self.scratch_dir, ignore_errors=True)
+                self.scratch_dir = None
+
+
+def get_directory_size(directory):
+    """Returns the total size of the files in the directory (in bytes)."""
+    size = 0
+    for root, dirs, files in os.walk(directory):
+        for filename in files:
+            try:
+                size += os.path.getsize(os.path.join(root, filename))
+            except OSError:
+                pass
+    return size
@@ -0,0 +1,179 @@
+import asyncio
+import os
+import queue
+import shutil
+import sys
+import threading
+from collections import namedtuple
+
+from .scraper import DEFAULT_PDF_TO_HTML_PROFILE, PDF_TO_HTML_PROFILES, build_pdf_to_html_command, \
+    create_conversion_output_dir, get_conversion_metadata, get_path_of_generated_html, move_conversion_output
+
+
+# Result of a pdf -> html conversion. html_path is None, if the file could not be converted.
+ConversionResult = namedtuple('ConversionResult', ['pdf_path', 'html_path', 'return_code', 'error_output'])
+
+
+class PdfToHtmlConversionPool:
+    """Converts pdf files to html with concurrently running pdf2htmlEX processes. At most max_concurrency conversions
+    run at the same time (by default one per cpu core), and the results are returned in the order the conversions
+    finish. Like convert_pdf_to_html, the html is generated into the directory of the profile next to the pdf (and
+    pdfs, that were already converted with the profile, are not converted again), unless a ConversionCache is given.
+    The cached html of a result has to be released (see ConversionCache.release), once it's parsed. profile is the
+    name of the conversion profile (see PDF_TO_HTML_PROFILES)."""
+
+    def __init__(self, max_concurrency=None, timeout=None, cache=None, profile=DEFAULT_PDF_TO_HTML_PROFILE):
+        self.max_concurrency = max_concurrency or os.cpu_count() or 1
+        self.timeout = timeout
+        self.cache = cache
+        self.profile = profile
+
+    async def convert(self, pdf_path, semaphore):
+        """Converts a single pdf file, once the semaphore lets the conversion start. Returns a ConversionResult."""
+
+        if self.cache is not None:
+            return await self.convert_with_cache(pdf_path, semaphore)
+
+        path_of_generated_html = get_path_of_generated_html(pdf_path, self.profile)
+        if os.path.exists(path_of_generated_html):
+            return ConversionResult(pdf_path, path_of_generated_html, 0, "")
+
+        output_dir = create_conversion_output_dir(pdf_path, self.profile)
+        try:
+            return_code, error_output = await self.execute_pdf_to_html_process(pdf_path, output_dir, semaphore)
+        except asyncio.CancelledError:
+            shutil.rmtree(output_dir, ignore_errors=True)
+            raise
+        if return_code != 0:
+            shutil.rmtree(output_dir, ignore_errors=True)
+            return ConversionResult(pdf_path, None, return_code, error_output)
+        move_conversion_output(output_dir, pdf_path, self.profile)
+        return ConversionResult(pdf_path, path_of_generated_html, return_code, error_output)
+
+    async def convert_with_cache(self, pdf_path, semaphore):
+        """Same as convert, but the html is taken from (or generated into) the cache. The pdf is hashed in the default
+        executor, and a pdf already being converted (by another task or thread) is not converted again."""
+
+        loop = asyncio.get_event_loop()
+        key = await loop.run_in_executor(None, self.cache.get_key, pdf_path, PDF_TO_HTML_PROFILES[self.profile])
+        path_of_cached_html = self.cache.lookup(key)
+        if path_of_cached_html is not None:
+            return ConversionResult(pdf_path, path_of_cached_html, 0, "")
+
+        conversion, converting = self.cache.start_conversion(key)
+        if not converting:
+            # Shielded, a cancelled waiter must not cancel the conversion of the other task.
+            return_code, error_output = await asyncio.shield(asyncio.wrap_future(conversion))
+        else:
+            return_code, error_output = None, "The conversion was cancelled."
+            try:
+                return_code, error_output = await self.convert_into_cache(pdf_path, key, semaphore)
+            finally:
+                self.cache.finish_conversion(key, return_code, error_output)
+        if return_code != 0:
+            return ConversionResult(pdf_path, None, return_code, error_output)
+        return ConversionResult(pdf_path, self.cache.lookup(key), return_code, error_output)
+
+    async def convert_into_cache(self, pdf_path, key, semaphore):
+        """Converts the pdf into the cache entry of the key (unless it was stored in the meantime) and returns the
+        status code and the error output of pdf2htmlEX."""
+
+        if self.cache.load_metadata(key) is not None:
+            return 0, ""
+        output_dir = self.cache.create_output_dir()
+        try:
+            return_code, error_output = await self.execute_pdf_to_html_process(pdf_path, output_dir, semaphore)
+        except asyncio.CancelledError:
+            shutil.rmtree(output_dir, ignore_errors=True)
+            raise
+        if return_code != 0:
+            shutil.rmtree(output_dir, ignore_errors=True)
+            return return_code, error_output
+
+        self.cache.store(key, output_dir, os.path.basename(get_path_of_generated_html(pdf_path)),
+                         get_conversion_metadata(pdf_path, self.profile))
+        return return_code, error_output
+
+    async def execute_pdf_to_html_process(self, pdf_path, destination_dir, semaphore):
+        """Runs pdf2htmlEX (once the semaphore lets it start) and returns its status code and error output."""
+
+        command = build_pdf_to_html_command(pdf_path, destination_dir, self.profile)
+        async with semaphore:
+            try:
+                process = await asyncio.create_subprocess_exec(*command,
+                                                               stdout=asyncio.subprocess.DEVNULL,
+                                                               stderr=asyncio.subprocess.PIPE)
+            except OSError as error:
+                return None, str(error)
+            try:
+                error_output = await asyncio.wait_for(process.communicate(), self.timeout)
+                return process.returncode, error_output[1].decode("utf-8", "replace")
+            except (asyncio.TimeoutError, asyncio.CancelledError) as exception:
+                process.kill()
+                await process.wait()
+                if isinstance(exception, asyncio.CancelledError):
+                    raise
+                return process.returncode, "pdf2htmlEX did not finish in " + str(self.timeout) + " seconds."
+
+    async def convert_all(self, pdf_paths):
+        """Asynchronous generator, that converts the pdf files and yields the ConversionResults as soon as the
+        conversions finish. Conversions that are still running are cancelled, if the generator is closed early."""
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        tasks = [asyncio.ensure_future(self.convert(pdf_path, semaphore)) for pdf_path in pdf_paths]
+        try:
+            for next_finished_task in asyncio.as_completed(tasks):
+                yield await next_finished_task
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def iterate_conversions(self, pdf_paths):
+        """Synchronous counterpart of convert_all: a generator, that yields the ConversionResults as soon as the
+        conversions finish. The event loop runs in a background thread, hence the finished conversions are collected
+        and replaced by new ones (keeping max_concurrency conversions running), while the caller processes a result.
+        The running conversions are cancelled, if the generator is closed early."""
+
+        loop = asyncio.new_event_loop()
+        # Before Python 3.8 the child watcher of the subprocesses has to be attached to the loop in the main thread.
+        asyncio.set_event_loop(loop)
+        if sys.version_info < (3, 8):
+            asyncio.get_child_watcher().attach_loop(loop)
+
+        finished_results = queue.Queue()
+        end_of_conversions = object()
+
+        async def collect_results():
+            results = self.convert_all(pdf_paths)
+            try:
+                async for result in results:
+                    finished_results.put((result, None))
+            except Exception as exception:
+                finished_results.put((None, exception))
+            finally:
+                await results.aclose()
+                finished_results.put((end_of_conversions, None))
+
+        def run_event_loop():
+            try:
+                loop.run_until_complete(collecting_task)
+            except asyncio.CancelledError:
+                pass
+
+        collecting_task = loop.create_task(collect_results())
+        thread = threading.Thread(target=run_event_loop, daemon=True)
+        thread.start()
+        try:
+            while True:
+                result, exception = finished_results.get()
+                if exception is not None:
+                    raise exception
+                if result is end_of_conversions:
+                    return
+                yield result
+        finally:
+            loop.call_soon_threadsafe(collecting_task.cancel)
+            thread.join()
+            asyncio.set_event_loop(None)
+            loop.close()
@@ -0,0 +1,303 @@
+import zipfile
+
+from lxml import etree
+
+from .scraper import correct_left_margin
+from .staticscraper import format_css_pixel_value
+
+
+WORDPROCESSINGML_NAMESPACE = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+MARKUP_COMPATIBILITY_NAMESPACE = 'http://schemas.openxmlformats.org/markup-compatibility/2006'
+NAMESPACES = {'w': WORDPROCESSINGML_NAMESPACE}
+
+# Word documents have no rendered layout, the vertical positions of the lines are synthesized for a letter sized
+# page with 1 inch margins (in pixels, 96 per inch), each line taking LINE_HEIGHT times its font size.
+PAGE_TOP = 11 * 96 - 96
+PAGE_BOTTOM = 96
+LINE_HEIGHT = 1.2
+
+# Font size (in half-points) used if neither the document nor the styles define one.
+DEFAULT_FONT_SIZE = 22
+
+# Runs of a paragraph (including the runs of hyperlinks, tracked insertions etc.), in document order.
+PARAGRAPH_RUNS_XPATH = './w:r | ./w:hyperlink/w:r | ./w:ins/w:r | ./w:smartTag/w:r | ./w:fldSimple/w:r | ' \
+                       './w:sdt/w:sdtContent/w:r'
+
+
+def convert_docx_resume_to_object(docx_file):
+    """Reads the paragraphs and their formatting straight from the Word (.docx) resume, given by its path or as a
+    binary file object. The returned list of "line dictionaries" is the same as the one returned by
+    convert_html_resume_to_object: the font size, family and color are the ones of the first visible run of the
+    line, the left margin is the indentation of the paragraph. Since Word documents don't store the layout of the
+    pages, the bottom margins and page breaks are synthesized (see DocxLayout)."""
+
+    return list(iterate_docx_resume_lines(docx_file))
+
+
+def iterate_docx_resume_lines(docx_file):
+    """Generator version of convert_docx_resume_to_object, yielding the "line dictionaries" in document order."""
+
+    with zipfile.ZipFile(docx_file) as docx_package:
+        document = etree.fromstring(docx_package.read('word/document.xml'))
+        styles = DocxStyles(read_optional_part(docx_package, 'word/styles.xml'))
+
+    layout = DocxLayout()
+    for paragraph in iterate_docx_paragraphs(document):
+        lines = split_paragraph_into_lines(paragraph)
+        if is_drawing_anchor(paragraph, lines):
+            continue
+        paragraph_properties = styles.get_paragraph_properties(paragraph)
+        if paragraph_properties['page_break_before']:
+            layout.break_page()
+        layout.add_space(paragraph_properties['space_before'])
+
+        for line_runs, page_break_after_line in lines:
+            line_props = get_docx_line_properties(line_runs, paragraph_properties, styles, layout)
+            yield line_props
+            if page_break_after_line:
+                layout.break_page()
+
+        layout.add_space(paragraph_properties['space_after'])
+        if paragraph.find('w:pPr/w:sectPr', NAMESPACES) is not None:
+            # The end of a section starts a new page.
+            layout.break_page()
+
+
+def iterate_docx_paragraphs(element):
+    """Yields the paragraphs (<w:p>) in the element in document order, including the paragraphs of tables and text
+    boxes, which follow the paragraph they are anchored in. Text boxes are stored twice, as a drawing (mc:Choice) and
+    as its VML fallback (mc:Fallback), only the drawing is read."""
+
+    for child in element:
+        if child.tag == w('p'):
+            yield child
+        if child.tag != '{' + MARKUP_COMPATIBILITY_NAMESPACE + '}Fallback':
+            yield from iterate_docx_paragraphs(child)
+
+
+def is_drawing_anchor(paragraph, lines):
+    """Returns whether the paragraph only anchors drawings (e.g. text boxes, whose paragraphs are read separately),
+    without text of its own. lines are the lines of the paragraph (see split_paragraph_into_lines)."""
+
+    if any(run_text.strip() for line_runs, page_break in lines for run, run_text in line_runs):
+        return False
+    return any(run.find('w:drawing', NAMESPACES) is not None or run.find('w:pict', NAMESPACES) is not None or
+               run.find('{' + MARKUP_COMPATIBILITY_NAMESPACE + '}AlternateContent') is not None
+               for line_runs, page_break in lines for run, run_text in line_runs)
+
+
+def w(tag):
+    """Returns the qualified name of a WordprocessingML element or attribute."""
+    return '{' + WORDPROCESSINGML_NAMESPACE + '}' + tag
+
+
+def read_optional_part(docx_package, part_name):
+    """Returns the parsed xml part of the package, or None if the package doesn't contain it."""
+    try:
+        return etree.fromstring(docx_package.read(part_name))
+    except KeyError:
+        return None
+
+
+class DocxLayout:
+    """Synthesizes the vertical position and the page number of the lines of a Word document."""
+
+    def __init__(self):
+        self.page_number = 1
+        self.bottom_margin = PAGE_TOP
+
+    def add_space(self, space):
+        self.bottom_margin -= space
+
+    def add_line(self, line_height):
+        """Moves below the next line (starting a new page if it doesn't fit) and returns its bottom margin."""
+        if self.bottom_margin - line_height < PAGE_BOTTOM and self.bottom_margin < PAGE_TOP:
+            self.break_page()
+        self.bottom_margin -= line_height
+        return self.bottom_margin
+
+    def break_page(self):
+        if self.bottom_margin < PAGE_TOP:
+            self.page_number += 1
+            self.bottom_margin = PAGE_TOP
+
+
+def split_paragraph_into_lines(paragraph):
+    """Splits the runs of the paragraph at the line breaks (<w:br/>) and page breaks. Returns a list of
+    (runs, page_break_after_line) tuples, where runs is a list of (run, text) tuples."""
+
+    lines = []
+    current_line = []
+    for run in paragraph.xpath(PARAGRAPH_RUNS_XPATH, namespaces=NAMESPACES):
+        text = ""
+        for element in run:
+            if element.tag == w('t'):
+                text += element.text or ""
+            elif element.tag in (w('tab'), w('ptab')):
+                text += " "
+            elif element.tag in (w('br'), w('cr')):
+                current_line.append((run, text))
+                text = ""
+                page_break = element.get(w('type')) == 'page'
+                lines.append((current_line, page_break))
+                current_line = []
+            elif element.tag == w('lastRenderedPageBreak') and (text or any(t for r, t in current_line)):
+                # Word rendered a page break in the middle of the paragraph, keep the text before it on its page.
+                current_line.append((run, text))
+                text = ""
+                lines.append((current_line, True))
+                current_line = []
+        current_line.append((run, text))
+    lines.append((current_line, False))
+    return lines
+
+
+def get_docx_line_properties(line_runs, paragraph_properties, styles, layout):
+    """Puts the details (font-size, font-family, left-margin, text-color and text) of a line of a paragraph into a
+    dictionary. The style of the line is the style of its first run containing visible text."""
+
+    text = "".join(run_text for run, run_text in line_runs)
+    first_visible_run = next((run for run, run_text in line_runs if run_text.strip()), None)
+    run_properties = styles.get_run_properties(first_visible_run, paragraph_properties)
+    if run_properties['caps']:
+        text = text.upper()
+    text = text.rstrip()
+
+    font_size = half_points_to_pixels(run_properties['size'])
+    return {
+        'font_size': format_css_pixel_value(font_size),
+        'font_family': run_properties['font_family'],
+        'left_margin': correct_left_margin(format_css_pixel_value(paragraph_properties['indentation']), text),
+        'font_color': run_properties['color'],
+        'bottom_margin': format_css_pixel_value(layout.add_line(font_size * LINE_HEIGHT)),
+        'line_text': text,
+        'page_number': format(layout.page_number, 'x')
+    }
+
+
+class DocxStyles:
+    """Resolves the formatting of paragraphs and runs from their direct formatting, their styles (following the
+    basedOn chain) and the document defaults of styles.xml."""
+
+    def __init__(self, styles_document):
+        self.styles = {}
+        self.default_paragraph_style = None
+        self.default_run_properties = None
+        self.default_paragraph_properties = None
+        if styles_document is None:
+            return
+        for style in styles_document.iterfind('w:style', NAMESPACES):
+            self.styles[style.get(w('styleId'))] = style
+            if style.get(w('type')) == 'paragraph' and style.get(w('default')) in ('1', 'true', 'on'):
+                self.default_paragraph_style = style.get(w('styleId'))
+        self.default_run_properties = styles_document.find('w:docDefaults/w:rPrDefault/w:rPr', NAMESPACES)
+        self.default_paragraph_properties = styles_document.find('w:docDefaults/w:pPrDefault/w:pPr', NAMESPACES)
+
+    def get_style_chain(self, style_id):
+        """Returns the style and the styles it's based on, starting with the style itself."""
+        chain = []
+        while style_id in self.styles and len(chain) < 20:
+            style = self.styles[style_id]
+            chain.append(style)
+            based_on = style.find('w:basedOn', NAMESPACES)
+            style_id = None if based_on is None else based_on.get(w('val'))
+        return chain
+
+    def get_paragraph_properties(self, paragraph):
+        """Returns the indentation (in pixels), the spacing before and after the paragraph (in pixels), whether it
+        starts on a new page, and its style id."""
+
+        paragraph_properties = paragraph.find('w:pPr', NAMESPACES)
+        style_element = None if paragraph_properties is None else paragraph_properties.find('w:pStyle', NAMESPACES)
+        style_id = self.default_paragraph_style if style_element is None else style_element.get(w('val'))
+
+        # Direct formatting first, then the styles, then the document defaults.
+        sources = [paragraph_properties] + [style.find('w:pPr', NAMESPACES) for style in
+                                            self.get_style_chain(style_id)] + [self.default_paragraph_properties]
+        sources = [source for source in sources if source is not None]
+
+        indentation = find_property_value(sources, 'w:ind', ('left', 'start'), 0)
+        first_line = find_property_value(sources, 'w:ind', ('firstLine',), 0)
+        hanging = find_property_value(sources, 'w:ind', ('hanging',), 0)
+        return {
+            'style_id': style_id,
+            'indentation': twips_to_pixels(indentation + first_line - hanging),
+            'space_before': twips_to_pixels(find_property_value(sources, 'w:spacing', ('before',), 0)),
+            'space_after': twips_to_pixels(find_property_value(sources, 'w:spacing', ('after',), 0)),
+            'page_break_before': is_property_enabled(sources, 'w:pageBreakBefore')
+        }
+
+    def get_run_properties(self, run, paragraph_properties):
+        """Returns the font size (in half-points), the font family (with -Bold / -Italic suffixes, the way pdf font
+        names distinguish them), the color in rgba() format and whether the run is written with capitals."""
+
+        run_properties = None if run is None else run.find('w:rPr', NAMESPACES)
+        style_element = None if run_properties is None else run_properties.find('w:rStyle', NAMESPACES)
+        run_styles = [] if style_element is None else self.get_style_chain(style_element.get(w('val')))
+
+        paragraph_styles = self.get_style_chain(paragraph_properties['style_id'])
+        sources = [run_properties] + [style.find('w:rPr', NAMESPACES) for style in run_styles] + \
+                  [style.find('w:rPr', NAMESPACES) for style in paragraph_styles] + [self.default_run_properties]
+        sources = [source for source in sources if source is not None]
+
+        font_family = find_property_value(sources, 'w:rFonts', ('ascii', 'hAnsi', 'cs'), '', int_value=False)
+        if is_property_enabled(sources, 'w:b'):
+            font_family += '-Bold'
+        if is_property_enabled(sources, 'w:i'):
+            font_family += '-Italic'
+        return {
+            'size': find_property_value(sources, 'w:sz', ('val',), DEFAULT_FONT_SIZE),
+            'font_family': font_family,
+            'color': format_docx_color(find_property_value(sources, 'w:color', ('val',), 'auto', int_value=False)),
+            'caps': is_property_enabled(sources, 'w:caps')
+        }
+
+
+def find_property_value(sources, tag, attributes, default, int_value=True):
+    """Returns the value of the first of the attributes of the property element (e.g. w:sz) found in the first
+    properties element (w:pPr / w:rPr) of sources, that defines it."""
+    for source in sources:
+        element = source.find(tag, NAMESPACES)
+        if element is None:
+            continue
+        for attribute in attributes:
+            value = element.get(w(attribute))
+            if value is None:
+                continue
+            if not int_value:
+                return value
+            try:
+                return int(float(value))
+            except ValueError:
+                continue
+    return default
+
+
+def is_property_enabled(sources, tag):
+    """Returns true if the toggle property (e.g. w:b) is enabled by the first properties element defining it."""
+    for source in sources:
+        element = source.find(tag, NAMESPACES)
+        if element is not None:
+            return element.get(w('val'), 'true') not in ('0', 'false', 'off', 'none')
+    return False
+
+
+def twips_to_pixels(twips):
+    """Converts twentieths of a point to pixels (96 per inch)."""
+    return twips / 20 * 96 / 72
+
+
+def half_points_to_pixels(half_points):
+    """Converts half-points (the unit of font sizes) to pixels (96 per inch)."""
+    return half_points / 2 * 96 / 72
+
+
+def format_docx_color(color):
+    """Converts a Word color (e.g. 1F497D, or auto) to the rgba() format returned by WebDriver."""
+    if len(color) != 6:
+        return 'rgba(0, 0, 0, 1)'
+    try:
+        components = [int(color[i:i + 2], 16) for i in (0, 2, 4)]
+    except ValueError:
+        return 'rgba(0, 0, 0, 1)'
+    return 'rgba(' + ', '.join(str(component) for component in components) + ', 1)'
@@ -0,0 +1,194 @@
+from collections import namedtuple
+
+from .textCleaners import normalize_line_text
+
+
+# A section keyword found in a line: the name of the section (e.g. Skills), the matched keyword, the (start, end)
+# position of its first occurrence in the cleaned text of the line, whether it's written with capitals in the line
+# and whether the line consists of the keyword only.
+SectionKeywordMatch = namedtuple('SectionKeywordMatch', ['section', 'keyword', 'span', 'all_caps', 'full_match'])
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton finding all occurrences of a set of keywords in a text in a single scan, instead of
+    searching the keywords one by one. Each keyword is added with a value, that is returned with its occurrences."""
+
+    def __init__(self):
+        self.transitions = [{}]
+        self.failure = [0]
+        self.outputs = [[]]
+
+    def add(self, keyword, value):
+        """Adds the keyword to the automaton. Has to be called before build()."""
+        if not keyword:
+            return
+        state = 0
+        for character in keyword:
+            next_state = self.transitions[state].get(character)
+            if next_state is None:
+                next_state = len(self.transitions)
+                self.transitions[state][character] = next_state
+                self.transitions.append({})
+                self.failure.append(0)
+                self.outputs.append([])
+            state = next_state
+        self.outputs[state].append((len(keyword), value))
+
+    def build(self):
+        """Computes the failure links (the longest proper suffix of each state, that is also a state), once all
+        keywords were added."""
+        queue = list(self.transitions[0].values())
+        for state in queue:
+            for character, next_state in self.transitions[state].items():
+                failure = self.failure[state]
+                while failure and character not in self.transitions[failure]:
+                    failure = self.failure[failure]
+                if state:
+                    self.failure[next_state] = self.transitions[failure].get(character, 0)
+                self.outputs[next_state] = self.outputs[next_state] + self.outputs[self.failure[next_state]]
+                queue.append(next_state)
+        return self
+
+    def iterate_matches(self, text):
+        """Yields (start, end, value) for every occurrence of every keyword in the text, ordered by their end."""
+        state = 0
+        for index, character in enumerate(text):
+            while state and character not in self.transitions[state]:
+                state = self.failure[state]
+            state = self.transitions[state].get(character, 0)
+            for length, value in self.outputs[state]:
+                yield index + 1 - length, index + 1, value
+
+
+class SectionKeywordMatcher:
+    """Matches the lines of a resume against all section keywords (see load_section_separator_keywords_from_dictionary)
+    at once. The keywords are matched case insensitively anywhere in the cleaned text of the line (see
+    clean_text_from_nonbasic_characters), the way they were searched with regular expressions one by one."""
+
+    def __init__(self, keywords_dict):
+        self.automaton = KeywordAutomaton()
+        self.sections_of_full_matches = {}
+        for section_order, (section, keywords) in enumerate(keywords_dict.items()):
+            # The longer keywords are more specific ("Work Experience" instead of "Experience"), they are preferred.
+            for keyword_rank, keyword in enumerate(sorted(keywords, key=len, reverse=True)):
+                self.automaton.add(keyword.lower(), (section_order, keyword_rank, section, keyword))
+            for keyword in keywords:
+                self.sections_of_full_matches.setdefault(keyword.upper(), section)
+        self.automaton.build()
+
+    def match_line(self, normalized_text):
+        """Returns a SectionKeywordMatch for each section, whose keywords are found in the text (a NormalizedText,
+        see normalize_line_text, or a string), in the order of the sections in the keywords dictionary. The match of
+        a section is its longest keyword found in the text."""
+
+        if isinstance(normalized_text, str):
+            normalized_text = normalize_line_text(normalized_text)
+        line_text = normalized_text.cleaned
+        best_matches = {}
+        for start, end, (section_order, keyword_rank, section, keyword) in \
+                self.automaton.iterate_matches(line_text.lower()):
+            best_match = best_matches.get(section_order)
+            if best_match is None or keyword_rank < best_match[0]:
+                best_matches[section_order] = (keyword_rank, section, keyword, (start, end))
+        if not best_matches:
+            return []
+
+        return [SectionKeywordMatch(section, keyword, span, keyword.upper() in line_text,
+                                    normalized_text.alphanumeric == keyword.upper())
+                for keyword_rank, section, keyword, span in
+                (best_matches[section_order] for section_order in sorted(best_matches))]
+
+    def find_section_of_heading(self, normalized_text):
+        """Returns the name of the first section having a keyword, that the text (a NormalizedText or a string)
+        entirely matches (ignoring case and non alphanumeric characters), or None."""
+        if isinstance(normalized_text, str):
+            normalized_text = normalize_line_text(normalized_text)
+        if not normalized_text.cleaned.strip():
+            return None
+        return self.sections_of_full_matches.get(normalized_text.alphanumeric)
+
+
+# A skill found in a text: the skill (as written in skills_to_find.txt) and the (start, end) position of its
+# occurrence in the lowercased text.
+SkillMatch = namedtuple('SkillMatch', ['skill', 'span'])
+
+
+class SkillMatcher:
+    """Finds the known skills in a text with a single scan of a KeywordAutomaton, instead of searching the skills one
+    by one. The skills are matched case insensitively, only as whole words: the characters before and after the skill
+    can't be letters or digits. Occurrences of the skills may not overlap, the longer skills win ("javascript" hides
+    "java", "machine learning" hides "learning"). Skills differing only in case (e.g. "java" and "Java") are one
+    skill, reported as written first in the skill list."""
+
+    def __init__(self, skills):
+        self.automaton = KeywordAutomaton()
+        self.ranks = {}
+        # The longer skills are preferred, the first of the skills differing only in case is kept.
+        for rank, skill in enumerate(sorted(skills, key=len, reverse=True)):
+            keyword = skill.lower()
+            if keyword and keyword not in self.ranks:
+                self.ranks[keyword] = rank
+                self.automaton.add(keyword, (rank, skill))
+        self.automaton.build()
+
+    def find_skills(self, text):
+        """Returns the SkillMatch of every occurrence of the skills in the text, in the order of their position."""
+        text = text.lower()
+        candidates = [(rank, start, end, skill) for start, end, (rank, skill) in self.automaton.iterate_matches(text)
+                      if is_skill_boundary(text, start - 1) and is_skill_boundary(text, end)]
+
+        # Claim the characters of the text for the longest skills first.
+        claimed = [False] * len(text)
+        skill_matches = []
+        for rank, start, end, skill in sorted(candidates):
+            if not any(claimed[start:end]):
+                claimed[start:end] = [True] * (end - start)
+                skill_matches.append(SkillMatch(skill, (start, end)))
+        skill_matches.sort(key=lambda skill_match: skill_match.span)
+        return skill_matches
+
+    def find_distinct_skills(self, text):
+        """Returns the skills found in the text, each skill once, the longest skills first."""
+        ranked_skills = {}
+        for skill_match in self.find_skills(text):
+            ranked_skills[skill_match.skill] = self.ranks[skill_match.skill.lower()]
+        return sorted(ranked_skills, key=ranked_skills.get)
+
+
+def is_skill_boundary(text, index):
+    """Returns true if a skill may start after or end before the index of the text: it's outside of the text, or
+    the character is neither a letter (a-z) nor a digit."""
+    if index < 0 or index >= len(text):
+        return True
+    character = text[index]
+    return not (character.isdecimal() or 'a' <= character <= 'z' or 'A' <= character <= 'Z')
+
+
+class SectionKeywords(dict):
+    """Dictionary of the section keywords (section name -> list of keywords) carrying its compiled
+    SectionKeywordMatcher. The matcher is compiled on first use, the dictionary shouldn't be modified afterwards."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.compiled_matcher = None
+
+    @property
+    def matcher(self):
+        if self.compiled_matcher is None:
+            self.compiled_matcher = SectionKeywordMatcher(self)
+        return self.compiled_matcher
+
+
+# Matchers compiled for plain keyword dictionaries, by their content.
+compiled_section_keyword_matchers = {}
+
+
+def get_section_keyword_matcher(keywords_dict):
+    """Returns the SectionKeywordMatcher of the keywords dictionary, compiled only once for the same keywords."""
+    if isinstance(keywords_dict, SectionKeywords):
+        return keywords_dict.matcher
+    key = tuple((section, tuple(keywords)) for section, keywords in keywords_dict.items())
+    matcher = compiled_section_keyword_matchers.get(key)
+    if matcher is None:
+        matcher = compiled_section_keyword_matchers[key] = SectionKeywordMatcher(keywords_dict)
+    return matcher
@@ -0,0 +1,111 @@
+from collections import namedtuple
+
+import numpy
+
+from .styleindex import QUANTIZATION_BUCKETS
+
+
+# Number of occurrences of the different values of a visual property. values are in the order of their first
+# occurrence, counts[i] is the number of occurrences of values[i].
+Histogram = namedtuple('Histogram', ['values', 'counts'])
+
+
+class LayoutStatistics:
+    """Visual properties of a sequence of resume lines (Lines of a LineTable) stored as NumPy columns, so that the
+    statistics of the layout (histograms, most frequent values, differences between adjacent lines) are computed for
+    the whole resume at once, instead of line by line. Sizes and positions of lines without a loaded style are NaN."""
+
+    def __init__(self, lines):
+        self.font_size = numpy.array([line.font_size for line in lines], dtype=float)
+        self.font_family = numpy.array([line.font_family for line in lines], dtype=object)
+        self.left_margin = numpy.array([line.left_margin for line in lines], dtype=float)
+        self.font_color = numpy.array([line.font_color for line in lines], dtype=object)
+        self.bottom_margin = numpy.array([line.bottom_margin for line in lines], dtype=float)
+        self.page_number = numpy.array([line.page_number for line in lines], dtype=object)
+
+    def __len__(self):
+        return len(self.font_size)
+
+    def quantized(self):
+        """Quantizes the font sizes and left margins into the buckets of the StyleIndex (see
+        quantize_visual_property), so that near-identical values are counted together. Returns self."""
+        for visual_property, bucket in QUANTIZATION_BUCKETS.items():
+            setattr(self, visual_property, numpy.floor(getattr(self, visual_property) / bucket + 0.5) * bucket)
+        return self
+
+    def histogram(self, visual_property):
+        """Returns the Histogram of the visual property (e.g. 'font_size') of the lines."""
+        return histogram_of_values(getattr(self, visual_property))
+
+    def vertical_distances(self):
+        """Returns the distance between the bottom of the previous and the current line for each line, truncated to
+        integers (0 for the first line). The distance is negative if a new page or a new column started."""
+        return get_differences_of_adjacent_values(self.bottom_margin)
+
+    def left_margin_differences(self):
+        """Returns the difference between the left margin of the previous and the current line for each line,
+        truncated to integers (0 for the first line). The difference is positive if the line starts more to the
+        left than the previous one."""
+        return get_differences_of_adjacent_values(self.left_margin)
+
+    def page_changes(self):
+        """Returns a boolean for each line that is true if the line is on another page than the previous line."""
+        changes = numpy.zeros(len(self), dtype=bool)
+        changes[1:] = self.page_number[1:] != self.page_number[:-1]
+        return changes
+
+
+def histogram_of_values(values):
+    """Counts the occurrences of the different values of the array. Returns a Histogram."""
+    if not len(values):
+        return Histogram(numpy.array([], dtype=values.dtype), numpy.array([], dtype=int))
+    unique_values, first_indexes, counts = numpy.unique(values, return_index=True, return_counts=True)
+    order = numpy.argsort(first_indexes, kind='mergesort')
+    return Histogram(unique_values[order], counts[order])
+
+
+def most_frequent_value(histogram, min_occurrences=1):
+    """Returns the (value, occurrences) tuple of the most frequent value that occurred at least min_occurrences times,
+    or None if there is no such value. From equally frequent values the first occurring one is returned."""
+    if not len(histogram.counts):
+        return None
+    index = int(numpy.argmax(histogram.counts))
+    if histogram.counts[index] < min_occurrences:
+        return None
+    return to_python_value(histogram.values[index]), int(histogram.counts[index])
+
+
+def largest_value(histogram, min_occurrences=1):
+    """Returns the (value, occurrences) tuple of the largest value that occurred at least min_occurrences times, or
+    None if there is no such value."""
+    return find_extreme_value(histogram, min_occurrences, numpy.argmax)
+
+
+def smallest_value(histogram, min_occurrences=1):
+    """Returns the (value, occurrences) tuple of the smallest value that occurred at least min_occurrences times, or
+    None if there is no such value."""
+    return find_extreme_value(histogram, min_occurrences, numpy.argmin)
+
+
+def find_extreme_value(histogram, min_occurrences, arg_function):
+    """Helper of largest_value and smallest_value, arg_function is numpy.argmax or numpy.argmin."""
+    frequent_indexes = numpy.flatnonzero(histogram.counts >= min_occurrences)
+    if not len(frequent_indexes):
+        return None
+    index = frequent_indexes[arg_function(histogram.values[frequent_indexes])]
+    return to_python_value(histogram.values[index]), int(histogram.counts[index])
+
+
+def to_python_value(value):
+    """Converts NumPy scalars (e.g. numpy.float64) to the corresponding Python type."""
+    return value.item() if isinstance(value, numpy.generic) else value
+
+
+def get_differences_of_adjacent_values(values):
+    """Returns values[i - 1] - values[i] for each i truncated to integers, and 0 for the first value (and where one
+    of the values is NaN)."""
+    differences = numpy.zeros(len(values), dtype=int)
+    float_differences = values[:-1] - values[1:]
+    known = ~numpy.isnan(float_differences)
+    differences[1:][known] = numpy.trunc(float_differences[known])
+    return differences
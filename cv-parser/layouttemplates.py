@@ -0,0 +1,229 @@
+import atexit
+import fcntl
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+
+from .layoutstatistics import LayoutStatistics
+
+
+# Number of the most frequent font sizes and left margins, that are part of the layout fingerprint.
+FINGERPRINT_HISTOGRAM_SIZE = 5
+
+# Number of lines of the first page, that have to use a font family or font color, so that it's part of the layout
+# fingerprint. Fonts used by a single line (e.g. a highlighted word) vary from resume to resume.
+FINGERPRINT_MIN_LINES = 2
+
+# Number of wins after which a work experience segmentation is tried first for a layout template.
+MIN_SEGMENTATION_WINS = 2
+
+# Number of agreeing deductions of the style of the section keywords, after which the style of a layout template is
+# used without deducing it from the resume.
+MIN_KEYWORD_STYLE_DEDUCTIONS = 2
+
+# Number of resumes of a layout template, after which the template is saved into the store file. Templates seen
+# only once (one-off layouts) are kept in memory only.
+MIN_TEMPLATE_RESUMES = 2
+
+# Number of records after which the recorded counts are saved into the store file.
+FLUSH_INTERVAL = 50
+
+# Maximum number of templates, whose counts are kept in memory until they are saved. The least recently seen
+# templates are forgotten first.
+MAX_UNSAVED_TEMPLATES = 10000
+
+
+def get_layout_fingerprint(resume_object):
+    """Returns the fingerprint of the layout template of the resume (LineTable): a hash of the fonts of its first page
+    (the font families and font colors of at least FINGERPRINT_MIN_LINES lines), and of the most frequent (quantized)
+    font sizes and left margins of the page. Resumes generated from the same template (e.g. LinkedIn exports,
+    Europass) share the fingerprint, however many section keywords they contain. The style of the first page is
+    loaded by every backend, the two-phase ones included, hence the fingerprint of a resume doesn't depend on the
+    backend. The fingerprint is computed once per LineTable."""
+
+    if resume_object.layout_fingerprint is None:
+        first_page_lines = [line for line in resume_object if line.page_index == 0]
+        resume_object.ensure_styles(first_page_lines)
+        layout_statistics = LayoutStatistics(first_page_lines).quantized()
+        layout = {
+            'font_families': get_frequent_values(layout_statistics.histogram('font_family')),
+            'font_colors': get_frequent_values(layout_statistics.histogram('font_color')),
+            'font_sizes': get_most_frequent_values(layout_statistics.histogram('font_size')),
+            'left_margins': get_most_frequent_values(layout_statistics.histogram('left_margin'))
+        }
+        resume_object.layout_fingerprint = hashlib.sha1(json.dumps(layout, sort_keys=True).encode("utf-8")).hexdigest()
+    return resume_object.layout_fingerprint
+
+
+def get_frequent_values(histogram, min_occurrences=FINGERPRINT_MIN_LINES):
+    """Returns the values of the Histogram, that occurred at least min_occurrences times, in increasing order."""
+    values_and_counts = zip(histogram.values.tolist(), histogram.counts)
+    return sorted(value for value, count in values_and_counts if count >= min_occurrences)
+
+
+def get_most_frequent_values(histogram, number_of_values=FINGERPRINT_HISTOGRAM_SIZE):
+    """Returns the most frequent values of the Histogram in increasing order."""
+    order = sorted(range(len(histogram.counts)), key=lambda index: -histogram.counts[index])
+    return sorted(histogram.values[index].item() for index in order[:number_of_values])
+
+
+class LayoutTemplateStore:
+    """Persistent store of what was learned about the layout templates (see get_layout_fingerprint) of the parsed
+    resumes: how many times each style of the section keywords was deduced, and how many times each work experience
+    segmentation won for the template. The counts are recorded in memory, and merged into the json store file every
+    FLUSH_INTERVAL records (and by flush). The file is reloaded before the merge and replaced atomically, while a lock
+    file is locked, so that several processes can share it. Only the templates of at least MIN_TEMPLATE_RESUMES
+    resumes are saved."""
+
+    def __init__(self, path, flush_interval=FLUSH_INTERVAL):
+        self.path = os.path.abspath(path)
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+        self.templates = self.load()
+        # Counts recorded since they were last saved (fingerprint -> template), the least recently seen first.
+        self.unsaved_templates = OrderedDict()
+        self.number_of_unsaved_records = 0
+
+    def load(self):
+        """Reads the templates from the store file (an empty store if it doesn't exist or is damaged)."""
+        try:
+            with open(self.path) as store_file:
+                templates = json.load(store_file)
+        except (OSError, ValueError):
+            return {}
+        return templates if isinstance(templates, dict) else {}
+
+    @contextmanager
+    def locked_store_file(self):
+        """Locks the lock file of the store file (the store path with a .lock suffix), while the store file is loaded,
+        merged and saved. The other processes sharing the store file wait for the lock."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path + ".lock", 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def save(self):
+        """Writes the templates into a temporary file, that replaces the store file."""
+        store_dir = os.path.dirname(self.path)
+        os.makedirs(store_dir, exist_ok=True)
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=store_dir, prefix=".layouttemplates-")
+        try:
+            with os.fdopen(file_descriptor, 'w') as store_file:
+                json.dump(self.templates, store_file)
+            os.replace(temporary_path, self.path)
+        except OSError:
+            print("The layout templates can't be saved into " + self.path)
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+
+    def get_counts(self, fingerprint, counter_name):
+        """Returns the saved and the unsaved counts of the template (e.g. 'segmentation_wins') in a Counter."""
+        with self.lock:
+            counts = Counter(self.templates.get(fingerprint, {}).get(counter_name, {}))
+            counts.update(self.unsaved_templates.get(fingerprint, {}).get(counter_name, {}))
+        return counts
+
+    def count(self, fingerprint, counter_name, key):
+        """Increments a count of the template in memory, and saves the counts every flush_interval records."""
+        with self.lock:
+            template = self.unsaved_templates.pop(fingerprint, {})
+            self.unsaved_templates[fingerprint] = template
+            counts = template.setdefault(counter_name, {})
+            counts[key] = counts.get(key, 0) + 1
+            while len(self.unsaved_templates) > MAX_UNSAVED_TEMPLATES:
+                self.unsaved_templates.popitem(last=False)
+
+            self.number_of_unsaved_records += 1
+            if self.number_of_unsaved_records >= self.flush_interval:
+                self.save_unsaved_templates()
+
+    def flush(self):
+        """Saves the counts recorded since the last save."""
+        with self.lock:
+            self.save_unsaved_templates()
+
+    def save_unsaved_templates(self):
+        """Merges the unsaved counts of the templates seen at least MIN_TEMPLATE_RESUMES times into the freshly
+        loaded store file, and saves it. The lock has to be held."""
+        self.number_of_unsaved_records = 0
+        try:
+            with self.locked_store_file():
+                self.templates = self.load()
+                templates_changed = False
+                for fingerprint, unsaved_template in list(self.unsaved_templates.items()):
+                    template = self.templates.get(fingerprint)
+                    if template is None:
+                        if count_resumes_of_template(unsaved_template) < MIN_TEMPLATE_RESUMES:
+                            continue
+                        template = self.templates[fingerprint] = {}
+                    for counter_name, unsaved_counts in unsaved_template.items():
+                        counts = template.setdefault(counter_name, {})
+                        for key, count in unsaved_counts.items():
+                            counts[key] = counts.get(key, 0) + count
+                    del self.unsaved_templates[fingerprint]
+                    templates_changed = True
+
+                if templates_changed:
+                    self.save()
+        except OSError:
+            print("The layout templates can't be saved into " + self.path)
+
+    def get_keyword_style(self, fingerprint, min_deductions=1):
+        """Returns the visual properties (font size, font family, left margin, font color) of the section keywords
+        deduced most of the times for the template (see deduce_visual_properties_of_keywords_in_resume), if they were
+        deduced at least min_deductions times, otherwise None."""
+        keyword_styles = self.get_counts(fingerprint, 'keyword_styles')
+        if not keyword_styles:
+            return None
+        keyword_style, deductions = keyword_styles.most_common(1)[0]
+        return json.loads(keyword_style) if deductions >= min_deductions else None
+
+    def record_keyword_style(self, fingerprint, keyword_style):
+        """Counts a deduction of the visual properties of the section keywords for the template."""
+        self.count(fingerprint, 'keyword_styles', json.dumps(keyword_style, sort_keys=True))
+
+    def get_preferred_segmentation(self, fingerprint):
+        """Returns the work experience segmentation, that won most of the times for the template (at least
+        MIN_SEGMENTATION_WINS times), or None."""
+        segmentation_wins = self.get_counts(fingerprint, 'segmentation_wins')
+        if not segmentation_wins:
+            return None
+        segmentation, wins = segmentation_wins.most_common(1)[0]
+        return segmentation if wins >= MIN_SEGMENTATION_WINS else None
+
+    def record_segmentation(self, fingerprint, segmentation):
+        """Counts a win of the work experience segmentation for the template."""
+        self.count(fingerprint, 'segmentation_wins', segmentation)
+
+
+def count_resumes_of_template(template):
+    """Returns the number of resumes, whose layout was recorded in the template: the number of deduced keyword
+    styles or of segmentation wins, whichever is larger (both are recorded at most once per resume)."""
+    return max(sum(counts.values()) for counts in template.values()) if template else 0
+
+
+# The store used by the parser, None if the layout templates are not learned.
+default_layout_template_store = None
+
+
+def get_default_layout_template_store():
+    """Returns the process-wide LayoutTemplateStore, or None if it's not configured."""
+    return default_layout_template_store
+
+
+def configure_default_layout_template_store(path):
+    """Sets the file of the process-wide LayoutTemplateStore (None disables the store)."""
+    global default_layout_template_store
+    if default_layout_template_store is not None:
+        default_layout_template_store.flush()
+    default_layout_template_store = None if path is None else LayoutTemplateStore(path)
+    if default_layout_template_store is not None:
+        atexit.register(default_layout_template_store.flush)
+    return default_layout_template_store
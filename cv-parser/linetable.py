@@ -0,0 +1,201 @@
+import sys
+
+from .scraper import correct_left_margin
+from .staticscraper import format_css_pixel_value
+from .textCleaners import normalize_line_text
+
+
+# Visual properties that are stored as numbers (in pixels) instead of css strings like '12.48px'.
+PIXEL_PROPERTIES = ('font_size', 'left_margin', 'bottom_margin')
+
+# Keys of the "line dictionaries" returned by the extraction backends.
+LINE_PROPERTIES = ('font_size', 'font_family', 'left_margin', 'font_color', 'bottom_margin', 'line_text',
+                   'page_number')
+
+
+# Visual properties returned by the style loader of a LineTable (see LineTable.ensure_styles), in this order.
+STYLE_PROPERTIES = ('font_size', 'font_family', 'left_margin', 'font_color', 'bottom_margin')
+
+
+def parse_pixel_value(value):
+    """Converts a css pixel value to a number (e.g.: '12.48px' -> 12.48)."""
+    if isinstance(value, str) and value.endswith('px'):
+        value = value[:-2]  # Remove the px post-script
+    return float(value)
+
+
+class Line:
+    """A line of the resume with its visual properties. Sizes and positions are parsed into numbers once, repeated
+    strings (font family, color, page number) are interned. For backward compatibility a line can still be read like
+    the former "line dictionaries", e.g. line['font_size'] returns '12.48px'. The visual properties are None, while
+    the style of the line is not loaded yet (see LineTable.ensure_styles). The normalized forms of the text, that
+    the stages of the parser compare, are computed once per line (see normalized_text)."""
+
+    __slots__ = ('font_size', 'font_family', 'left_margin', 'font_color', 'bottom_margin', 'line_text',
+                 'page_number', 'page_index', 'line_index', 'normalized_text_cache')
+
+    def __init__(self, font_size, font_family, left_margin, font_color, bottom_margin, line_text, page_number,
+                 page_index, line_index=0):
+        self.font_size = font_size
+        self.font_family = font_family
+        self.left_margin = left_margin
+        self.font_color = font_color
+        self.bottom_margin = bottom_margin
+        self.line_text = line_text
+        self.page_number = page_number
+        self.page_index = page_index
+        self.line_index = line_index
+        self.normalized_text_cache = None
+
+    @classmethod
+    def from_dict(cls, line_props, page_index, line_index=0):
+        """Creates the line from a "line dictionary" of an extraction backend. page_index is the (0 based) position
+        of the line's page in the resume, line_index is the position of the line in its LineTable."""
+        return cls(parse_pixel_value(line_props['font_size']),
+                   sys.intern(line_props['font_family']),
+                   parse_pixel_value(line_props['left_margin']),
+                   sys.intern(line_props['font_color']),
+                   parse_pixel_value(line_props['bottom_margin']),
+                   line_props['line_text'],
+                   sys.intern(str(line_props['page_number'])),
+                   page_index,
+                   line_index)
+
+    @property
+    def normalized_text(self):
+        """The NormalizedText of the line text (see normalize_line_text), computed on first use."""
+        if self.normalized_text_cache is None or self.normalized_text_cache[0] is not self.line_text:
+            self.normalized_text_cache = (self.line_text, normalize_line_text(self.line_text))
+        return self.normalized_text_cache[1]
+
+    @property
+    def has_style(self):
+        return self.font_size is not None
+
+    def set_style(self, font_size, font_family, left_margin, font_color, bottom_margin):
+        """Sets the visual properties of the line from the css values returned by a style loader. The left margin is
+        corrected the same way as by the extraction backends (see correct_left_margin)."""
+        self.font_size = parse_pixel_value(font_size)
+        self.font_family = sys.intern(font_family)
+        self.left_margin = parse_pixel_value(correct_left_margin(left_margin, self.line_text))
+        self.font_color = sys.intern(font_color)
+        self.bottom_margin = parse_pixel_value(bottom_margin)
+
+    def __getitem__(self, key):
+        if key in PIXEL_PROPERTIES:
+            value = getattr(self, key)
+            return None if value is None else format_css_pixel_value(value)
+        if key in LINE_PROPERTIES:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in LINE_PROPERTIES
+
+    def keys(self):
+        return list(LINE_PROPERTIES)
+
+    def get(self, key, default=None):
+        return self[key] if key in LINE_PROPERTIES else default
+
+    def as_dict(self):
+        """Returns the line as a "line dictionary"."""
+        return {key: self[key] for key in LINE_PROPERTIES}
+
+    def __repr__(self):
+        return 'Line(' + repr(self.as_dict()) + ')'
+
+
+class LineTable:
+    """Compact representation of the lines of a resume, used by every stage of the parser instead of the list of
+    "line dictionaries". It behaves like a list of Lines, and as_dicts() returns the former representation.
+
+    The table can also be created from the texts of the lines only (see from_texts), if fetching the visual
+    properties is expensive (e.g. it takes a browser round-trip). The styles are then fetched by the style_loader,
+    only for the lines passed to ensure_styles."""
+
+    def __init__(self, lines=None, style_loader=None):
+        self.lines = [] if lines is None else list(lines)
+        self.style_loader = style_loader
+        # Computed once by get_layout_fingerprint.
+        self.layout_fingerprint = None
+
+    @classmethod
+    def from_dicts(cls, resume_object):
+        """Creates the table from a list of "line dictionaries". A LineTable is returned as it is."""
+        if isinstance(resume_object, LineTable):
+            return resume_object
+        line_table = cls()
+        for line_props in resume_object:
+            line_table.append_dict(line_props)
+        return line_table
+
+    @classmethod
+    def from_texts(cls, line_texts, style_loader):
+        """Creates the table from (page_number, text) pairs of the lines, without their visual properties.
+        style_loader is called with a list of line indexes and returns the (font_size, font_family, left_margin,
+        font_color, bottom_margin) css values of each line (e.g. ('12.48px', 'ff1', '95.5px', 'rgba(0, 0, 0, 1)',
+        '700px'))."""
+        line_table = cls(style_loader=style_loader)
+        for page_number, text in line_texts:
+            page_number = sys.intern(str(page_number))
+            line_table.lines.append(Line(None, None, None, None, None, text, page_number,
+                                         line_table.get_page_index(page_number), len(line_table.lines)))
+        return line_table
+
+    def append_dict(self, line_props):
+        """Appends a "line dictionary" (or a Line) to the end of the table and returns the appended Line."""
+        page_index = self.get_page_index(str(line_props['page_number']))
+        line_index = len(self.lines)
+        if isinstance(line_props, Line):
+            line = Line(line_props.font_size, line_props.font_family, line_props.left_margin, line_props.font_color,
+                        line_props.bottom_margin, line_props.line_text, line_props.page_number, page_index,
+                        line_index)
+            line.normalized_text_cache = line_props.normalized_text_cache
+        else:
+            line = Line.from_dict(line_props, page_index, line_index)
+        self.lines.append(line)
+        return line
+
+    def get_page_index(self, page_number):
+        """Returns the page_index of a line of the page_number, appended to the end of the table."""
+        if not self.lines:
+            return 0
+        previous_line = self.lines[-1]
+        if page_number != previous_line.page_number:
+            return previous_line.page_index + 1
+        return previous_line.page_index
+
+    def ensure_styles(self, lines):
+        """Fetches the visual properties of the given lines of the table, whose style is not loaded yet, with a single
+        call of the style loader."""
+        lines_without_style = [line for line in lines if not line.has_style]
+        if not lines_without_style or self.style_loader is None:
+            return
+        styles = self.style_loader([line.line_index for line in lines_without_style])
+        for line, style in zip(lines_without_style, styles):
+            line.set_style(*style)
+
+    def as_dicts(self):
+        """Returns the lines as a list of "line dictionaries"."""
+        return [line.as_dict() for line in self.lines]
+
+    def __len__(self):
+        return len(self.lines)
+
+    def __iter__(self):
+        return iter(self.lines)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return LineTable(self.lines[index], self.style_loader)
+        return self.lines[index]
+
+
+def get_normalized_text(line):
+    """Returns the NormalizedText of a Line (computed once per line), a "line dictionary" or a text."""
+    if isinstance(line, Line):
+        return line.normalized_text
+    if isinstance(line, str):
+        return normalize_line_text(line)
+    return normalize_line_text(line['line_text'])
@@ -1,9 +1,28 @@
-from pkg_resources import resource_string, resource_listdir
+import io
 import json
+import queue
+import shutil
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby
 from os import path
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 
 from .scraper import *
+from .staticscraper import *
+from .pdfscraper import *
+from .docxscraper import *
+from .conversionpool import *
+from .conversioncache import *
+from .linetable import *
+from .styleindex import *
+from .layouttemplates import *
+from .layoutstatistics import *
+from .preprocessing import *
+from .keywordmatcher import *
+from .resourceregistry import *
 from .textCleaners import *
 from .dateregex import *
 
@@ -11,14 +30,169 @@ from string import punctuation
 from nltk.corpus import stopwords
 
 
-def extract_information_into_json(html_path):
-    """Parses the resume (of html format), extracts the relevant information, and returns it in a dictionary."""
+# Functions loading the resume into the list of "line dictionaries". 'selenium' renders the html resume (converted by
+# pdf2htmlEX) in Chrome, 'static' resolves the pdf2htmlEX css classes without a browser and 'pdf' reads the text
+# layout straight from the pdf file. 'docx' reads Word resumes, that are never converted.
+EXTRACTION_BACKENDS = {
+    'selenium': convert_html_resume_to_object,
+    'static': convert_static_html_resume_to_object,
+    'pdf': convert_pdf_resume_to_object,
+    'docx': convert_docx_resume_to_object
+}
+
+# Backends that read the pdf resume itself, hence the resume doesn't have to be converted to html first.
+PDF_EXTRACTION_BACKENDS = {'pdf'}
+
+# Backend reading the Word (.docx) resumes, whatever backend is chosen for the pdf resumes.
+DOCX_EXTRACTION_BACKEND = 'docx'
+
+
+# Backends scraping in two phases: the texts of the lines first, then the styles of only those lines, whose style is
+# used by the analysis (see LineTable.ensure_styles). The functions are context managers, that keep the resume open
+# for the second phase.
+TWO_PHASE_EXTRACTION_BACKENDS = {
+    'selenium-two-phase': open_html_resume_for_two_phase_scraping
+}
+
+# Backends rendering the html resume in a browser.
+SELENIUM_EXTRACTION_BACKENDS = {'selenium', 'selenium-two-phase'}
+
+
+# Generator versions of the EXTRACTION_BACKENDS, yielding the "line dictionaries" page by page.
+STREAMING_EXTRACTION_BACKENDS = {
+    'selenium': iterate_html_resume_lines,
+    'static': iterate_static_html_resume_lines,
+    'pdf': iterate_pdf_resume_lines,
+    'docx': iterate_docx_resume_lines
+}
+
+
+# Memory-backed file system, preferred for the scratch directories of parse_resume_data.
+MEMORY_BACKED_DIRECTORY = '/dev/shm'
+
+
+def parse_resume_data(resume_data, backend='selenium', cache=None, profile=DEFAULT_PDF_TO_HTML_PROFILE,
+                      streaming=False, skip_trailing_pages=False):
+    """Parses a pdf resume given as bytes or as a binary file object and returns the extracted information in a
+    dictionary (see extract_information). The files of the conversion are written into a private scratch directory
+    (memory-backed if possible), that is removed afterwards, or taken from (and stored in) the ConversionCache.
+    The PDF_EXTRACTION_BACKENDS read the data directly, without writing any file, and so are Word (.docx) resumes
+    read by the DOCX_EXTRACTION_BACKEND."""
+
+    # Word resumes (zip archives) are read by the DOCX_EXTRACTION_BACKEND, whatever the backend is.
+    resume_file = get_seekable_resume_file(resume_data)
+    if zipfile.is_zipfile(resume_file):
+        resume_file.seek(0)
+        return extract_information(resume_file, DOCX_EXTRACTION_BACKEND, streaming, skip_trailing_pages)
+    resume_file.seek(0)
+
+    if backend in PDF_EXTRACTION_BACKENDS:
+        return extract_information(resume_file, backend, streaming, skip_trailing_pages)
+
+    scratch_dir = create_scratch_directory()
+    try:
+        pdf_path = os.path.join(scratch_dir, "resume.pdf")
+        with open(pdf_path, 'wb') as pdf_file:
+            shutil.copyfileobj(resume_file, pdf_file)
+
+        html_path = convert_pdf_to_html(pdf_path, cache, profile)
+        if html_path is None:
+            return None
+        try:
+            return extract_information(html_path, backend, streaming, skip_trailing_pages)
+        finally:
+            if cache is not None:
+                cache.release(html_path)
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+
+def get_seekable_resume_file(resume_data):
+    """Returns a binary file object of the resume data (bytes or file object), that supports seeking (as required by
+    the pdf parser)."""
+    if isinstance(resume_data, bytes):
+        return io.BytesIO(resume_data)
+    if hasattr(resume_data, 'seekable') and resume_data.seekable():
+        return resume_data
+    return io.BytesIO(resume_data.read())
+
+
+def get_extraction_backend_of_resume(resume_path, backend):
+    """Returns the backend extracting the lines of the resume file: the DOCX_EXTRACTION_BACKEND for Word resumes, the
+    given backend otherwise."""
+    if resume_path.lower().endswith('.docx'):
+        return DOCX_EXTRACTION_BACKEND
+    return backend
+
+
+def create_scratch_directory():
+    """Creates a private temporary directory for the intermediate files of a conversion. The directory is created on
+    a memory-backed file system (/dev/shm), if available."""
+    parent_dir = None
+    if os.path.isdir(MEMORY_BACKED_DIRECTORY) and os.access(MEMORY_BACKED_DIRECTORY, os.W_OK):
+        parent_dir = MEMORY_BACKED_DIRECTORY
+    return tempfile.mkdtemp(prefix="cv-parser-", dir=parent_dir)
+
+
+def extract_information_into_json(resume_path, backend='selenium', streaming=False, skip_trailing_pages=False):
+    """Same as extract_information, but returns the extracted information as json data."""
+    return json.dumps(extract_information(resume_path, backend, streaming, skip_trailing_pages))
+
+
+def extract_information(resume_path, backend='selenium', streaming=False, skip_trailing_pages=False):
+    """Parses the resume (of html format, of pdf format for the PDF_EXTRACTION_BACKENDS or of docx format for the
+    DOCX_EXTRACTION_BACKEND, also given as a binary file object), extracts the relevant information, and returns it
+    in a dictionary. The backend (see EXTRACTION_BACKENDS) determines how the visual properties of the lines are
+    extracted. In streaming mode the section keywords of the first pages are analyzed, while the next pages are still
+    being extracted in the background. If skip_trailing_pages is set, the pages are
+    extracted one by one, only until the work experience and skills sections are closed (see
+    stop_after_work_experience_and_skills). Neither applies to the TWO_PHASE_EXTRACTION_BACKENDS.
+    The fragments of the visual lines are merged (see coalesce_line_fragments) before the analysis, and the repeated
+    headers and footers are removed, unless the lines are analyzed while they arrive (see preprocess_resume_lines)."""
 
     # Load section separator keywords (education, work experience, skills etc.) and their synonymes.
     section_separator_keywords_dict = load_section_separator_keywords_from_dictionary()
 
-    # Load the external HTML resume to the memory using an internal representation (dictionary).
-    resume_object = convert_html_resume_to_object(html_path)
+    if backend in TWO_PHASE_EXTRACTION_BACKENDS:
+        # Load the texts of the lines, their styles are fetched on demand, while the resume is analyzed.
+        with TWO_PHASE_EXTRACTION_BACKENDS[backend](resume_path) as (line_texts, fetch_line_styles):
+            resume_object = LineTable.from_texts(line_texts, fetch_line_styles)
+            parsed_resume = break_text_into_sections(resume_object, section_separator_keywords_dict)
+            parsed_resume = parse_work_experience(resume_object, parsed_resume)
+    elif skip_trailing_pages:
+        # Extract the next page only when it's requested, there is no need to read ahead in the background.
+        resume_lines = coalesce_line_fragments(STREAMING_EXTRACTION_BACKENDS[backend](resume_path))
+        resume_lines = stop_after_work_experience_and_skills(resume_lines, section_separator_keywords_dict)
+        resume_object, parsed_resume = break_streamed_text_into_sections(resume_lines,
+                                                                         section_separator_keywords_dict)
+        parsed_resume = parse_work_experience(resume_object, parsed_resume)
+    elif streaming:
+        # Load the resume page by page and find the sections while the pages arrive.
+        resume_lines = iterate_in_background(STREAMING_EXTRACTION_BACKENDS[backend](resume_path))
+        resume_lines = coalesce_line_fragments(resume_lines)
+        resume_object, parsed_resume = break_streamed_text_into_sections(resume_lines,
+                                                                         section_separator_keywords_dict)
+        parsed_resume = parse_work_experience(resume_object, parsed_resume)
+    else:
+        # Load the external HTML resume to the memory using an internal representation (LineTable).
+        return extract_information_from_lines(EXTRACTION_BACKENDS[backend](resume_path),
+                                              section_separator_keywords_dict)
+
+    # Use a "learning algorithm" to identify yet unknown skills in the skills section
+    learn_skills_from_resume(parsed_resume)
+
+    # analyze the skill section for known skills / programming languages
+    return parse_skills(parsed_resume)
+
+
+def extract_information_from_lines(resume_lines, section_separator_keywords_dict=None, learn_skills=True):
+    """Same as extract_information, for a resume already loaded into a LineTable or a list of "line dictionaries".
+    If learn_skills is not set, the unknown skills of the resume are not added to the skill dictionary."""
+
+    if section_separator_keywords_dict is None:
+        section_separator_keywords_dict = load_section_separator_keywords_from_dictionary()
+
+    resume_object = preprocess_resume_lines(resume_lines)
 
     # Find sections in the resume using section separator keywords.
     parsed_resume = break_text_into_sections(resume_object, section_separator_keywords_dict)
@@ -27,154 +201,380 @@ def extract_information_into_json(html_path):
     parsed_resume = parse_work_experience(resume_object, parsed_resume)
 
     # Use a "learning algorithm" to identify yet unknown skills in the skills section
-    learn_skills_from_resume(parsed_resume)
+    if learn_skills:
+        learn_skills_from_resume(parsed_resume)
 
     # analyze the skill section for known skills / programming languages
-    parsed_resume = parse_skills(parsed_resume)
+    return parse_skills(parsed_resume)
+
+
+def extract_bundled_information_into_json(resume_path, backend='selenium', max_workers=None):
+    """Same as extract_bundled_information, but returns the extracted information as json data."""
+    return json.dumps(extract_bundled_information(resume_path, backend, max_workers))
+
+
+def extract_bundled_information(resume_path, backend='selenium', max_workers=None):
+    """Parses a bundle of resumes concatenated into a single document (e.g. sent by an agency). The lines of the
+    whole bundle are extracted once, split into the page ranges of the individual resumes (see split_resume_bundle),
+    and the ranges are parsed as separate resumes concurrently, in max_workers processes (by default one per cpu).
+    Returns the list of the extracted information of each resume (see extract_information), the 'Pages' of each
+    contain the (1 based) numbers of its first and last page in the bundle."""
+
+    section_separator_keywords_dict = load_section_separator_keywords_from_dictionary()
+    resume_object = LineTable.from_dicts(EXTRACTION_BACKENDS[backend](resume_path))
+    page_ranges = split_resume_bundle(resume_object, section_separator_keywords_dict)
+
+    lines_of_resumes = [[] for page_range in page_ranges]
+    resume_index = 0
+    for line in resume_object:
+        while line.page_index > page_ranges[resume_index][1]:
+            resume_index += 1
+        lines_of_resumes[resume_index].append(line.as_dict())
+
+    if len(lines_of_resumes) == 1:
+        parsed_resumes = [extract_information_from_lines(lines_of_resumes[0], section_separator_keywords_dict)]
+    else:
+        # The workers start with the counts of the parent process, they must not be saved twice.
+        if get_default_layout_template_store() is not None:
+            get_default_layout_template_store().flush()
+        with ProcessPoolExecutor(max_workers) as executor:
+            results = list(executor.map(extract_information_of_bundled_resume, lines_of_resumes))
+        parsed_resumes = [parsed_resume for parsed_resume, learned_skills in results]
+
+        # The skills learned by the workers are saved at once, and recognized in the skill section of every resume.
+        learned_skills = [skill for parsed_resume, skills in results for skill in skills]
+        if learned_skills:
+            save_learned_skills(learned_skills)
+            parsed_resumes = [parse_skills(parsed_resume) for parsed_resume in parsed_resumes]
+
+    for parsed_resume, (first_page_index, last_page_index) in zip(parsed_resumes, page_ranges):
+        parsed_resume['Pages'] = [first_page_index + 1, last_page_index + 1]
+    return parsed_resumes
+
+
+def extract_information_of_bundled_resume(resume_lines):
+    """Same as extract_information_from_lines, run in the worker processes of extract_bundled_information. The
+    layout templates learned from the resume are saved before the result is returned, as the workers exit without
+    saving them. The skills learned from the resume are returned (with the extracted information) instead of being
+    saved, the parent process saves the skills of all the workers at once."""
+    parsed_resume = extract_information_from_lines(resume_lines, learn_skills=False)
+    if get_default_layout_template_store() is not None:
+        get_default_layout_template_store().flush()
+    return parsed_resume, find_unknown_skills_of_resume(parsed_resume)
+
+
+# Number of non-blank lines at the top of a page, that are checked for the name and contact block of a new resume.
+TOP_OF_PAGE_LINES = 4
+
+# E-mail addresses, and phone numbers starting with a country code or a label.
+contact_regex = re.compile(r'[\w.+-]+@[\w-]+\.\w+|(\+|\b(tel|phone|mobile)\b\W*)\d[\d /().-]{6,}\d', re.IGNORECASE)
+
+
+def split_resume_bundle(resume_object, keywords_dict):
+    """Finds the boundaries of the resumes in a bundle (LineTable) by the signals of its pages. A new resume starts
+    on a page, if
+    - its top lines contain a contact block (e-mail address or phone number), that differs from the top of the
+      previous page (a header repeated on every page of the same resume doesn't start a new one), or
+    - the sequence of the section headings starts over: the first heading of the page is the first heading of the
+      current resume, and the previous page ended in another section (a heading repeated at the top of a
+      continuation page, e.g. "Experience" after "Work Experience", doesn't start a new resume).
+    Returns the list of the (first_page_index, last_page_index) ranges of the resumes."""
+
+    page_ranges = []
+    first_page_index = None
+    first_heading_of_resume = None
+    current_heading = None
+    top_of_previous_page = None
+    for page_index, page_lines in groupby(resume_object, key=lambda line: line.page_index):
+        page_lines = list(page_lines)
+        top_of_page = get_top_of_page_lines(page_lines)
+        headings = find_headings_of_page(page_lines, keywords_dict)
+        first_heading = headings[0] if headings else None
+
+        if first_page_index is None:
+            first_page_index = page_index
+        elif page_starts_new_resume(top_of_page, top_of_previous_page, first_heading, first_heading_of_resume,
+                                    current_heading):
+            page_ranges.append((first_page_index, page_index - 1))
+            first_page_index = page_index
+            first_heading_of_resume = None
+
+        if first_heading_of_resume is None:
+            first_heading_of_resume = first_heading
+        if headings:
+            current_heading = headings[-1]
+        top_of_previous_page = top_of_page
+
+    if first_page_index is not None:
+        page_ranges.append((first_page_index, resume_object[len(resume_object) - 1].page_index))
+    return page_ranges
+
+
+def page_starts_new_resume(top_of_page, top_of_previous_page, first_heading, first_heading_of_resume,
+                           current_heading):
+    """Returns true if the signals of the page (see split_resume_bundle) show the start of a new resume.
+    current_heading is the section of the last heading before the page."""
+    if any(contact_regex.search(line.line_text) for line in top_of_page) and \
+            get_texts_of_top_of_page(top_of_page) != get_texts_of_top_of_page(top_of_previous_page):
+        return True
+    return first_heading is not None and first_heading == first_heading_of_resume and \
+        current_heading != first_heading
+
+
+def get_top_of_page_lines(page_lines):
+    """Returns the first TOP_OF_PAGE_LINES non-blank lines of the page."""
+    top_of_page = []
+    for line in page_lines:
+        if line.line_text.strip():
+            top_of_page.append(line)
+            if len(top_of_page) == TOP_OF_PAGE_LINES:
+                break
+    return top_of_page
+
 
-    # Return the results as a json data.
-    json_data = json.dumps(parsed_resume)
-    return json_data
+def get_texts_of_top_of_page(top_of_page):
+    """Returns the texts of the lines normalized the same way as the repeated headers (see get_repeated_line_key), so
+    that e.g. page numbers don't matter."""
+    return [get_repeated_line_key(line)[2] for line in top_of_page]
+
+
+def find_headings_of_page(page_lines, keywords_dict):
+    """Returns the sections of the headings (see find_section_of_heading) on the page, in their order."""
+    sections = []
+    for line in page_lines:
+        section = find_section_of_heading(line, keywords_dict)
+        if section is not None:
+            sections.append(section)
+    return sections
 
 
 def load_section_separator_keywords_from_dictionary():
-    """Loads the section keywords (e.g.: "Work Experience", "Skills") from the resources into a dictionary.
+    """Returns the section keywords (e.g.: "Work Experience", "Skills") of the resources in a dictionary.
     The key is always the filename (E.g.: Skills.txt -> Skills) and the values are the list of keywords (skill, skills,
-    abilities, languages etc."""
-
-    keywords_dict = {}
-    for name in resource_listdir('resources.keywordlists', ''):
-        if os.path.splitext(name)[1] == '.txt':
-            keywords_dict[os.path.splitext(name)[0]] = \
-                resource_string('resources.keywordlists', name).decode("utf-8", "strict").splitlines()
-    return keywords_dict
+    abilities, languages etc. The keywords are loaded and compiled only once (see ResourceRegistry), the returned
+    dictionary must not be modified."""
+    return resource_registry.get('section_keywords')
 
 
 def break_text_into_sections(resume_info, keywords_dict):
     """Breaks the resume into sections and returns a dictionary that contains section keywords (work experience,
-    skills etc.) as keys and the lines that correspond to the key as list of values."""
+    skills etc.) as keys and the lines that correspond to the key as list of values. resume_info is a LineTable, or
+    a list of "line dictionaries"."""
 
+    resume_info = LineTable.from_dicts(resume_info)
     visual_properties_of_resume = get_visual_properties_of_section_keywords(resume_info, keywords_dict)
 
-    visual_properties_of_keywords_in_resume = deduce_visual_properties_of_keywords_in_resume(
-        visual_properties_of_resume)
+    visual_properties_of_keywords_in_resume = find_visual_properties_of_keywords_in_resume(
+        resume_info, visual_properties_of_resume)
 
     return break_resume_in_sections(resume_info, keywords_dict, visual_properties_of_keywords_in_resume)
 
 
+def break_streamed_text_into_sections(resume_lines, keywords_dict):
+    """Streaming version of break_text_into_sections: consumes the "line dictionaries" from the resume_lines iterator
+    (e.g. a generator yielding the lines page by page), and collects the visual properties of the section keywords
+    while the lines arrive, instead of waiting for the whole resume. Returns the list of the consumed lines (the
+    resume object, as a LineTable) and the sections."""
+
+    resume_object = LineTable()
+    visual_properties_of_resume = create_visual_properties_of_section_keywords()
+    for line_props in resume_lines:
+        line = resume_object.append_dict(line_props)
+        add_visual_properties_of_section_keywords_in_line(line, keywords_dict, visual_properties_of_resume)
+
+    visual_properties_of_keywords_in_resume = find_visual_properties_of_keywords_in_resume(
+        resume_object, visual_properties_of_resume)
+
+    return resume_object, break_resume_in_sections(resume_object, keywords_dict,
+                                                   visual_properties_of_keywords_in_resume)
+
+
+def stop_after_work_experience_and_skills(resume_lines, keywords_dict,
+                                          required_sections=('WorkExperience', 'Skills')):
+    """Yields the "line dictionaries" of the resume_lines iterator until all of the required_sections were closed,
+    i.e. each of their headings was followed by the heading of another section. The iterator is closed then, hence
+    the trailing pages of the resume (publications, references etc.) are not extracted at all. Headings are the lines
+    entirely matching a section keyword."""
+
+    closed_sections = set()
+    current_section = None
+    try:
+        for line_props in resume_lines:
+            yield line_props
+
+            section = find_section_of_heading(line_props, keywords_dict)
+            if section is not None and section != current_section:
+                if current_section in required_sections:
+                    closed_sections.add(current_section)
+                current_section = section
+                if closed_sections.issuperset(required_sections):
+                    return
+    finally:
+        if hasattr(resume_lines, 'close'):
+            resume_lines.close()
+
+
+def find_section_of_heading(line_text, keywords_dict):
+    """Returns the name of the section (e.g. Skills), if the text entirely matches one of its keywords, else None.
+    line_text is the text, or the Line (or "line dictionary") itself, whose normalized text is reused."""
+    return get_section_keyword_matcher(keywords_dict).find_section_of_heading(get_normalized_text(line_text))
+
+
+def iterate_in_background(iterator, max_buffered_items=10000):
+    """Consumes the iterator in a background thread and yields its items. This way the next pages of a resume are
+    extracted (e.g. scraped by the browser) while the caller processes the lines of the previous pages. Exceptions of
+    the iterator are re-raised in the caller. If the caller stops early, the iterator is closed."""
+
+    buffered_items = queue.Queue(max_buffered_items)
+    stopped = threading.Event()
+    end_of_iteration = object()
+
+    def put(item):
+        while not stopped.is_set():
+            try:
+                buffered_items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def consume_iterator():
+        try:
+            for item in iterator:
+                if not put((item, None)):
+                    break
+            else:
+                put((end_of_iteration, None))
+        except Exception as exception:
+            put((None, exception))
+        finally:
+            if hasattr(iterator, 'close'):
+                iterator.close()
+
+    thread = threading.Thread(target=consume_iterator, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, exception = buffered_items.get()
+            if exception is not None:
+                raise exception
+            if item is end_of_iteration:
+                return
+            yield item
+    finally:
+        stopped.set()
+        thread.join()
+
+
 def get_visual_properties_of_section_keywords(resume_object, keywords_dict):
     """Section keywords are typically written with different style. (Capitals, bold (font-family), font-size,
     left margin, font-color etc.) This function extracts the visual properties of the section keywords found in
     the resume and returns these as a dictionary."""
 
-    # Collect occurrences of visual properties.
-    # E.g. for font-size: 46px : ["Education", "Work"], 42px : ["Skills", "Summary"] ...
-    font_size_dict = defaultdict(list)
-    font_family_dict = defaultdict(list)
-    left_margin_dict = defaultdict(list)
-    font_color_dict = defaultdict(list)
-
-    # Store the number of occurrences of different visual properties. (e.g.: font_size : {'48px': 8, '44.16px': 1})
-    # Properties of lines, where the entire line was written with capitals:
+    # Only the style of the lines containing section keywords is used, fetch them in a single batch.
+    resume_object.ensure_styles([line for line in resume_object if line_contains_section_keyword(line, keywords_dict)])
+
+    visual_properties_of_resume = create_visual_properties_of_section_keywords()
+    for line in resume_object:
+        add_visual_properties_of_section_keywords_in_line(line, keywords_dict, visual_properties_of_resume)
+    return visual_properties_of_resume
+
+
+def line_contains_section_keyword(line, keywords_dict):
+    """Returns true if any of the section keywords is found in the text of the line."""
+    return bool(get_section_keyword_matcher(keywords_dict).match_line(line.normalized_text))
+
+
+def create_visual_properties_of_section_keywords():
+    """Returns the (empty) dictionary, in which the visual properties of the section keywords are collected by
+    add_visual_properties_of_section_keywords_in_line."""
+
+    # Store the lines, whose visual properties are counted by deduce_visual_properties_of_keywords_in_resume.
+    # Lines, where the entire line was written with capitals:
     all_caps_properties = {
-        'font_size': {},
-        'font_family': {},
-        'left_margin': {},
-        'font_color': {},
+        'lines': [],
         'number_of_capital_matches': 0
     }
-    # Properties of texts, where the line entirely matched the section keyword
+    # Lines, where the line entirely matched the section keyword
     entire_match_properties = {
-        'font_size': {},
-        'font_family': {},
-        'left_margin': {},
-        'font_color': {},
+        'lines': []
     }
 
-    for line in resume_object:
-        line_text = clean_text_from_nonbasic_characters(line['line_text'])
-        # key = Skills, values = [Abilities, Areas of Experience, Areas of Expertise, Areas of Knowledge]
-        for key, value_list in keywords_dict.items():
-            # Sort the values by their length in descending order. This is important otherwise "Experience" will be
-            # matched before than "Work Experience" or "Areas of Experience" and these are more concrete / specific.
-            value_list = sorted(value_list, key=len, reverse=True)
-            for keyword in value_list:
-                if keyword_found_in_text(keyword, line_text):
-                    font_size_dict[line['font_size']].append(line_text)
-                    font_family_dict[line['font_family']].append(line_text)
-                    left_margin_dict[line['left_margin']].append(line_text)
-                    font_color_dict[line['font_color']].append(line_text)
-
-                    # If keywords are written with capitals, collect their visual properties.
-                    if keyword_found_in_text_with_capitals(keyword, line_text):
-                        all_caps_properties = add_line_props_to_dict(line, all_caps_properties)
-                        all_caps_properties['number_of_capital_matches'] += 1
-
-                    # If currnet line fully matches the keyword, collect their visual properties.
-                    if keyword_fully_matches_text(keyword, line_text):
-                        entire_match_properties = add_line_props_to_dict(line, entire_match_properties)
-                    break
-
+    # Collect occurrences of visual properties.
+    # E.g. for font-size: 46.0 : ["Education", "Work"], 42.0 : ["Skills", "Summary"] ...
     return {
-        'font_size_dict': font_size_dict,
-        'font_family_dict': font_family_dict,
-        'left_margin_dict': left_margin_dict,
-        'font_color_dict': font_color_dict,
+        'font_size_dict': defaultdict(list),
+        'font_family_dict': defaultdict(list),
+        'left_margin_dict': defaultdict(list),
+        'font_color_dict': defaultdict(list),
         'all_caps_properties': all_caps_properties,
         'entire_match_properties': entire_match_properties,
-        'number_of_capital_matches': all_caps_properties['number_of_capital_matches']
+        'number_of_capital_matches': 0
     }
 
 
-def keyword_found_in_text(keyword, line_text):
-    """Returns true if the given keyword is matched anywhere in the text."""
-    if (re.search(keyword, line_text, re.IGNORECASE)) is not None:
-        return True
-    return False
-
-
-def keyword_found_in_text_with_capitals(keyword, line_text):
-    """Returns true if the given keyword's capitalized version is matched anywhere in the text"""
-    if (re.search(keyword.upper(), line_text)) is not None:
-        return True
-    return False
-
-
-def keyword_fully_matches_text(keyword, line_text):
-    """Returns true, if the text only contains the keyword and it matches the current keyword"""
-
-    # Remove any non-number / non-letter characters and strip off additional start/end white-spaces
-    line_text = replace_any_non_letter_or_number_character(line_text)
-    if re.fullmatch(keyword.upper(), line_text.upper()) is not None:
-        return True
-    return False
-
-
-def add_line_props_to_dict(line, visual_properties_dict):
-    """Extracts the visual properties of the line and adds it to the dictionary.
-    Returns the dictionary where the values have been "updated" with the current line's values."""
-
-    if line['font_size'] not in visual_properties_dict['font_size'].keys():
-        visual_properties_dict['font_size'][line['font_size']] = 1
-    else:
-        visual_properties_dict['font_size'][line['font_size']] += 1
-
-    if line['font_color'] not in visual_properties_dict['font_color'].keys():
-        visual_properties_dict['font_color'][line['font_color']] = 1
-    else:
-        visual_properties_dict['font_color'][line['font_color']] += 1
-
-    if line['left_margin'] not in visual_properties_dict['left_margin'].keys():
-        visual_properties_dict['left_margin'][line['left_margin']] = 1
-    else:
-        visual_properties_dict['left_margin'][line['left_margin']] += 1
+def add_visual_properties_of_section_keywords_in_line(line, keywords_dict, visual_properties_of_resume):
+    """If the line contains section keywords, adds its visual properties to visual_properties_of_resume
+    (see create_visual_properties_of_section_keywords)."""
+
+    all_caps_properties = visual_properties_of_resume['all_caps_properties']
+    entire_match_properties = visual_properties_of_resume['entire_match_properties']
+
+    line_text = line.normalized_text.cleaned
+    # One match per section (e.g. Skills), its longest keyword found in the line: "Work Experience" or "Areas of
+    # Experience" are more concrete / specific than "Experience".
+    for keyword_match in get_section_keyword_matcher(keywords_dict).match_line(line.normalized_text):
+        visual_properties_of_resume['font_size_dict'][line.font_size].append(line_text)
+        visual_properties_of_resume['font_family_dict'][line.font_family].append(line_text)
+        visual_properties_of_resume['left_margin_dict'][line.left_margin].append(line_text)
+        visual_properties_of_resume['font_color_dict'][line.font_color].append(line_text)
+
+        # If keywords are written with capitals, collect their visual properties.
+        if keyword_match.all_caps:
+            all_caps_properties['lines'].append(line)
+            all_caps_properties['number_of_capital_matches'] += 1
+
+        # If currnet line fully matches the keyword, collect their visual properties.
+        if keyword_match.full_match:
+            entire_match_properties['lines'].append(line)
+
+    visual_properties_of_resume['number_of_capital_matches'] = all_caps_properties['number_of_capital_matches']
+
+
+def find_visual_properties_of_keywords_in_resume(resume_object, visual_properties_of_resume):
+    """Deduces the visual properties of the section keywords of the resume (LineTable) from
+    visual_properties_of_resume. If the layout template store is used, and the style of the section keywords was
+    deduced at least MIN_KEYWORD_STYLE_DEDUCTIONS times for the layout template of the resume (see
+    get_layout_fingerprint), the style of the template is used without deducing it. Otherwise a satisfactory
+    deduction is counted for the template, and resumes with too few section keyword matches are rescued with the
+    style deduced most of the times for their template. Whether the keywords are written with capitals is always
+    decided by the resume."""
+
+    layout_template_store = get_default_layout_template_store()
+    if layout_template_store is not None:
+        fingerprint = get_layout_fingerprint(resume_object)
+        keyword_style = layout_template_store.get_keyword_style(fingerprint, MIN_KEYWORD_STYLE_DEDUCTIONS)
+        if keyword_style is not None:
+            keyword_style['section_keywords_written_in_capital'] = \
+                are_section_keywords_written_in_capital(visual_properties_of_resume)
+            return keyword_style
+
+    properties_of_keywords_in_resume = deduce_visual_properties_of_keywords_in_resume(visual_properties_of_resume)
+    if layout_template_store is None:
+        return properties_of_keywords_in_resume
 
-    if line['font_family'] not in visual_properties_dict['font_family'].keys():
-        visual_properties_dict['font_family'][line['font_family']] = 1
-    else:
-        visual_properties_dict['font_family'][line['font_family']] += 1
+    if is_amount_of_visual_properties_data_satisfactory(properties_of_keywords_in_resume):
+        layout_template_store.record_keyword_style(fingerprint, {
+            visual_property: value for visual_property, value in properties_of_keywords_in_resume.items()
+            if visual_property != 'section_keywords_written_in_capital'})
+        return properties_of_keywords_in_resume
 
-    return visual_properties_dict
+    keyword_style = layout_template_store.get_keyword_style(fingerprint)
+    if keyword_style is None:
+        return properties_of_keywords_in_resume
+    keyword_style['section_keywords_written_in_capital'] = \
+        properties_of_keywords_in_resume['section_keywords_written_in_capital']
+    return keyword_style
 
 
 def deduce_visual_properties_of_keywords_in_resume(visual_properties_of_resume):
@@ -182,85 +582,46 @@ def deduce_visual_properties_of_keywords_in_resume(visual_properties_of_resume):
     font-color etc.) that is common for section keywords. If the number of capital matches were at least 3 it is
     assumed that all section keywords were written with capitals."""
 
+    # Count the occurrences of the different visual properties. (e.g.: font_size : {48.0: 8, 44.0: 1}) Sizes and
+    # margins are quantized the same way as in the StyleIndex, that the lines with the deduced style are looked up in.
+    structural_properties_of_resume = {
+        'all_caps_properties': LayoutStatistics(
+            visual_properties_of_resume['all_caps_properties']['lines']).quantized(),
+        'entire_match_properties': LayoutStatistics(
+            visual_properties_of_resume['entire_match_properties']['lines']).quantized()
+    }
+
     properties_of_keywords_in_resume = {}
     properties_of_keywords_in_resume = deduce_font_color(properties_of_keywords_in_resume,
-                                                         visual_properties_of_resume)
+                                                         structural_properties_of_resume)
     properties_of_keywords_in_resume = deduce_font_family(properties_of_keywords_in_resume,
-                                                          visual_properties_of_resume)
+                                                          structural_properties_of_resume)
     properties_of_keywords_in_resume = deduce_font_size(properties_of_keywords_in_resume,
-                                                        visual_properties_of_resume)
+                                                        structural_properties_of_resume)
     properties_of_keywords_in_resume = deduce_left_margin(properties_of_keywords_in_resume,
-                                                          visual_properties_of_resume)
-
-    # If at least three section keywords were written with capital, we guess, that all of them are with capitals.
-    if visual_properties_of_resume['number_of_capital_matches'] > 2:
-        properties_of_keywords_in_resume['section_keywords_written_in_capital'] = True
-    else:
-        properties_of_keywords_in_resume['section_keywords_written_in_capital'] = False
+                                                          structural_properties_of_resume)
 
+    properties_of_keywords_in_resume['section_keywords_written_in_capital'] = \
+        are_section_keywords_written_in_capital(visual_properties_of_resume)
     return properties_of_keywords_in_resume
 
 
+def are_section_keywords_written_in_capital(visual_properties_of_resume):
+    """If at least three section keywords were written with capital, we guess, that all of them are with capitals."""
+    return visual_properties_of_resume['number_of_capital_matches'] > 2
+
+
 def deduce_font_color(properties_of_keywords_in_resume, structural_properties_of_resume):
     """Takes the font-color that has at least 3 occurrences in all_caps_properties and
     entire_match_properties. If the font-colors match it returns the font-color immediately. If not,
     it returns the font-color with the more occurrences."""
 
-    all_caps_properties = {}
-    entire_match_properties = {}
-
-    # key = colors, value = frequency of color in section keywords
-    if bool(structural_properties_of_resume['all_caps_properties']['font_color']):
-        # sort keys (colors) in descending order of the occurrences
-        sorted_colors_by_occurrence = sorted(structural_properties_of_resume['all_caps_properties']['font_color'],
-                                             key=lambda k:
-                                             structural_properties_of_resume['all_caps_properties']['font_color'][k],
-                                             reverse=True)
-        for color in sorted_colors_by_occurrence:
-            if structural_properties_of_resume['all_caps_properties']['font_color'][color] > 2:
-                all_caps_properties[color] = \
-                    structural_properties_of_resume['all_caps_properties']['font_color'][
-                        color]
-                break
-
-    if bool(structural_properties_of_resume['entire_match_properties']['font_color']):
-        sorted_colors_by_occurrence = sorted(structural_properties_of_resume['entire_match_properties']['font_color'],
-                                             key=lambda k:
-                                             structural_properties_of_resume['entire_match_properties']['font_color'][
-                                                 k],
-                                             reverse=True)
-        for color in sorted_colors_by_occurrence:
-            if structural_properties_of_resume['entire_match_properties']['font_color'][color] > 2:
-                entire_match_properties[color] = \
-                    structural_properties_of_resume['entire_match_properties']['font_color'][
-                        color]
-                break
-
-    if bool(all_caps_properties) and bool(entire_match_properties):
-        all_caps_color, all_caps_occurrence = all_caps_properties.popitem()
-        entire_match_color, entire_match_occurrence = entire_match_properties.popitem()
-        if all_caps_color == entire_match_color:
-            properties_of_keywords_in_resume['font_color'] = all_caps_color
-            return properties_of_keywords_in_resume
-        if all_caps_occurrence > entire_match_occurrence:
-            properties_of_keywords_in_resume['font_color'] = all_caps_color
-            return properties_of_keywords_in_resume
-        else:
-            properties_of_keywords_in_resume['font_color'] = entire_match_color
-            return properties_of_keywords_in_resume
-
-    # If only one of all_caps_properties / entire_match_properties exist --> take that.
-    if bool(all_caps_properties):
-        all_caps_color, all_caps_occurrence = all_caps_properties.popitem()
-        properties_of_keywords_in_resume['font_color'] = all_caps_color
-        return properties_of_keywords_in_resume
-
-    if bool(entire_match_properties):
-        entire_match_color, entire_match_occurrence = entire_match_properties.popitem()
-        properties_of_keywords_in_resume['font_color'] = entire_match_color
-        return properties_of_keywords_in_resume
-
-    return properties_of_keywords_in_resume
+    all_caps_color = most_frequent_value(
+        structural_properties_of_resume['all_caps_properties'].histogram('font_color'), 3)
+    entire_match_color = most_frequent_value(
+        structural_properties_of_resume['entire_match_properties'].histogram('font_color'), 3)
+    return choose_visual_property_of_keywords(properties_of_keywords_in_resume, 'font_color', all_caps_color,
+                                              entire_match_color)
 
 
 def deduce_font_size(properties_of_keywords_in_resume, structural_properties_of_resume):
@@ -268,59 +629,12 @@ def deduce_font_size(properties_of_keywords_in_resume, structural_properties_of_
     entire_match_properties. If the font-size matches it returns the font-size immediately. If not,
     it returns the font-size with the more occurrences."""
 
-    all_caps_properties = {}
-    entire_match_properties = {}
-
-    if bool(structural_properties_of_resume['all_caps_properties']['font_size']):
-        keys = structural_properties_of_resume['all_caps_properties']['font_size'].keys()
-        sorted_float_keys = sorted([float(key[:-2]) for key in keys], reverse=True)
-        for float_key in sorted_float_keys:
-            string_key = str(float_key)
-            if string_key.endswith(".0"):
-                string_key = string_key[:-2]
-            if structural_properties_of_resume['all_caps_properties']['font_size'][string_key + "px"] > 2:
-                all_caps_properties[string_key + "px"] = \
-                    structural_properties_of_resume['all_caps_properties']['font_size'][
-                        string_key + "px"]
-                break
-
-    if bool(structural_properties_of_resume['entire_match_properties']['font_size']):
-        keys = structural_properties_of_resume['entire_match_properties']['font_size'].keys()
-        sorted_float_keys = sorted([float(key[:-2]) for key in keys], reverse=True)
-        for float_key in sorted_float_keys:
-            string_key = str(float_key)
-            if string_key.endswith(".0"):
-                string_key = string_key[:-2]
-            if structural_properties_of_resume['entire_match_properties']['font_size'][string_key + "px"] > 2:
-                entire_match_properties[string_key + "px"] = \
-                    structural_properties_of_resume['entire_match_properties']['font_size'][
-                        string_key + "px"]
-                break
-
-    if bool(all_caps_properties) and bool(entire_match_properties):
-        key_all, value_all = all_caps_properties.popitem()
-        key_entire, value_entire = entire_match_properties.popitem()
-        if key_all == key_entire:
-            properties_of_keywords_in_resume['font_size'] = key_all
-            return properties_of_keywords_in_resume
-        if value_all > value_entire:
-            properties_of_keywords_in_resume['font_size'] = key_all
-            return properties_of_keywords_in_resume
-        else:
-            properties_of_keywords_in_resume['font_size'] = key_entire
-            return properties_of_keywords_in_resume
-
-    if bool(all_caps_properties):
-        key_all, value_all = all_caps_properties.popitem()
-        properties_of_keywords_in_resume['font_size'] = key_all
-        return properties_of_keywords_in_resume
-
-    if bool(entire_match_properties):
-        key_entire, value_entire = entire_match_properties.popitem()
-        properties_of_keywords_in_resume['font_size'] = key_entire
-        return properties_of_keywords_in_resume
-
-    return properties_of_keywords_in_resume
+    all_caps_font_size = largest_value(
+        structural_properties_of_resume['all_caps_properties'].histogram('font_size'), 3)
+    entire_match_font_size = largest_value(
+        structural_properties_of_resume['entire_match_properties'].histogram('font_size'), 3)
+    return choose_visual_property_of_keywords(properties_of_keywords_in_resume, 'font_size', all_caps_font_size,
+                                              entire_match_font_size)
 
 
 def deduce_left_margin(properties_of_keywords_in_resume, structural_properties_of_resume):
@@ -328,59 +642,12 @@ def deduce_left_margin(properties_of_keywords_in_resume, structural_properties_o
     entire_match_properties. If both left_margin matched it returns the left_margin immediately. If not,
     it returns the left_margin with the more occurrences."""
 
-    all_caps_properties = {}
-    entire_match_properties = {}
-
-    if bool(structural_properties_of_resume['all_caps_properties']['left_margin']):
-        keys = structural_properties_of_resume['all_caps_properties']['left_margin'].keys()
-        sorted_float_keys = sorted([float(key[:-2]) for key in keys], reverse=False)
-        for float_key in sorted_float_keys:
-            string_key = str(float_key)
-            if string_key.endswith(".0"):
-                string_key = string_key[:-2]
-            if structural_properties_of_resume['all_caps_properties']['left_margin'][string_key + "px"] > 2:
-                all_caps_properties[string_key + "px"] = \
-                    structural_properties_of_resume['all_caps_properties']['left_margin'][
-                        string_key + "px"]
-                break
-
-    if bool(structural_properties_of_resume['entire_match_properties']['left_margin']):
-        keys = structural_properties_of_resume['entire_match_properties']['left_margin'].keys()
-        sorted_float_keys = sorted([float(key[:-2]) for key in keys], reverse=False)
-        for float_key in sorted_float_keys:
-            string_key = str(float_key)
-            if string_key.endswith(".0"):
-                string_key = string_key[:-2]
-            if structural_properties_of_resume['entire_match_properties']['left_margin'][string_key + "px"] > 2:
-                entire_match_properties[string_key + "px"] = \
-                    structural_properties_of_resume['entire_match_properties']['left_margin'][
-                        string_key + "px"]
-                break
-
-    if bool(all_caps_properties) and bool(entire_match_properties):
-        key_all, value_all = all_caps_properties.popitem()
-        key_entire, value_entire = entire_match_properties.popitem()
-        if key_all == key_entire:
-            properties_of_keywords_in_resume['left_margin'] = key_all
-            return properties_of_keywords_in_resume
-        if value_all > value_entire:
-            properties_of_keywords_in_resume['left_margin'] = key_all
-            return properties_of_keywords_in_resume
-        else:
-            properties_of_keywords_in_resume['left_margin'] = key_entire
-            return properties_of_keywords_in_resume
-
-    if bool(all_caps_properties):
-        key_all, value_all = all_caps_properties.popitem()
-        properties_of_keywords_in_resume['left_margin'] = key_all
-        return properties_of_keywords_in_resume
-
-    if bool(entire_match_properties):
-        key_entire, value_entire = entire_match_properties.popitem()
-        properties_of_keywords_in_resume['left_margin'] = key_entire
-        return properties_of_keywords_in_resume
-
-    return properties_of_keywords_in_resume
+    all_caps_left_margin = smallest_value(
+        structural_properties_of_resume['all_caps_properties'].histogram('left_margin'), 3)
+    entire_match_left_margin = smallest_value(
+        structural_properties_of_resume['entire_match_properties'].histogram('left_margin'), 3)
+    return choose_visual_property_of_keywords(properties_of_keywords_in_resume, 'left_margin', all_caps_left_margin,
+                                              entire_match_left_margin)
 
 
 def deduce_font_family(properties_of_keywords_in_resume, structural_properties_of_resume):
@@ -388,72 +655,78 @@ def deduce_font_family(properties_of_keywords_in_resume, structural_properties_o
         entire_match_properties. If both font families are the same it returns the font family immediately. If not,
         it returns the font family with the more occurrences."""
 
-    all_caps_properties = {}
-    entire_match_properties = {}
-
-    if bool(structural_properties_of_resume['all_caps_properties']['font_family']):
-        sorted_keys_by_value = sorted(structural_properties_of_resume['all_caps_properties']['font_family'],
-                                      key=lambda k:
-                                      structural_properties_of_resume['all_caps_properties']['font_family'][k],
-                                      reverse=True)
-        for key in sorted_keys_by_value:
-            if structural_properties_of_resume['all_caps_properties']['font_family'][key] > 2:
-                all_caps_properties[key] = \
-                    structural_properties_of_resume['all_caps_properties']['font_family'][
-                        key]
-                break
+    all_caps_font_family = most_frequent_value(
+        structural_properties_of_resume['all_caps_properties'].histogram('font_family'), 3)
+    entire_match_font_family = most_frequent_value(
+        structural_properties_of_resume['entire_match_properties'].histogram('font_family'), 3)
+    return choose_visual_property_of_keywords(properties_of_keywords_in_resume, 'font_family', all_caps_font_family,
+                                              entire_match_font_family)
+
+
+def choose_visual_property_of_keywords(properties_of_keywords_in_resume, visual_property, all_caps_choice,
+                                       entire_match_choice):
+    """Stores the value of the visual property chosen from the (value, occurrences) tuples found in
+    all_caps_properties and entire_match_properties (None if nothing was found). If both values are the same, or only
+    one of them exists it is taken. If not, the value with the more occurrences is taken."""
+
+    if all_caps_choice is not None and entire_match_choice is not None:
+        key_all, value_all = all_caps_choice
+        key_entire, value_entire = entire_match_choice
+        if key_all == key_entire or value_all > value_entire:
+            properties_of_keywords_in_resume[visual_property] = key_all
+        else:
+            properties_of_keywords_in_resume[visual_property] = key_entire
+        return properties_of_keywords_in_resume
 
-    if bool(structural_properties_of_resume['entire_match_properties']['font_family']):
-        sorted_keys_by_value = sorted(structural_properties_of_resume['entire_match_properties']['font_family'],
-                                      key=lambda k:
-                                      structural_properties_of_resume['entire_match_properties']['font_family'][k],
-                                      reverse=True)
-        for key in sorted_keys_by_value:
-            if structural_properties_of_resume['entire_match_properties']['font_family'][key] > 2:
-                entire_match_properties[key] = \
-                    structural_properties_of_resume['entire_match_properties']['font_family'][
-                        key]
-                break
+    # If only one of all_caps_properties / entire_match_properties exist --> take that.
+    if all_caps_choice is not None:
+        properties_of_keywords_in_resume[visual_property] = all_caps_choice[0]
+    elif entire_match_choice is not None:
+        properties_of_keywords_in_resume[visual_property] = entire_match_choice[0]
+    return properties_of_keywords_in_resume
 
-    if bool(all_caps_properties) and bool(entire_match_properties):
-        key_all, value_all = all_caps_properties.popitem()
-        key_entire, value_entire = entire_match_properties.popitem()
-        if key_all == key_entire:
-            properties_of_keywords_in_resume['font_family'] = key_all
-            return properties_of_keywords_in_resume
-        if value_all > value_entire:
-            properties_of_keywords_in_resume['font_family'] = key_all
-            return properties_of_keywords_in_resume
-        else:
-            properties_of_keywords_in_resume['font_family'] = key_entire
-            return properties_of_keywords_in_resume
 
-    if bool(all_caps_properties):
-        key_all, value_all = all_caps_properties.popitem()
-        properties_of_keywords_in_resume['font_family'] = key_all
-        return properties_of_keywords_in_resume
+class ResumeSections(dict):
+    """The sections of the resume returned by break_resume_in_sections: a dictionary of the section keywords and the
+    texts of their lines (like a defaultdict(list)). line_indexes contains the line_index of each of these lines in
+    the LineTable, so that the lines of a section are found without looking up their texts."""
 
-    if bool(entire_match_properties):
-        key_entire, value_entire = entire_match_properties.popitem()
-        properties_of_keywords_in_resume['font_family'] = key_entire
-        return properties_of_keywords_in_resume
+    def __init__(self):
+        super().__init__()
+        self.line_indexes = {}
 
-    return properties_of_keywords_in_resume
+    def __missing__(self, section):
+        lines_of_section = self[section] = []
+        return lines_of_section
+
+    def append_line(self, section, line):
+        """Appends the text and the line_index of the line to the section."""
+        self[section].append(line.line_text)
+        self.line_indexes.setdefault(section, []).append(line.line_index)
 
 
 def break_resume_in_sections(resume_info, keywords_dict, visual_properties_of_keywords_in_resume):
-    """Breaks the resume into sections (Skills, WorkExpereince), using the visual properties of keywords."""
-    result = defaultdict(list)
+    """Breaks the resume into sections (Skills, WorkExpereince), using the visual properties of keywords. Returns the
+    ResumeSections."""
+    result = ResumeSections()
     if not is_amount_of_visual_properties_data_satisfactory(visual_properties_of_keywords_in_resume):
         print("Less then three visual properties were extracted for section keywords. "
               "Resume was not broken into sections.")
         return result
 
+    # Only the style of the lines, that may start a new section is compared.
+    candidate_lines = [line for line in resume_info if line_may_have_visual_properties_of_section_keywords(
+        line, visual_properties_of_keywords_in_resume)]
+    resume_info.ensure_styles(candidate_lines)
+    lines_with_style_of_section_keywords = StyleIndex(candidate_lines).find_lines(
+        visual_properties_of_keywords_in_resume)
+
     # Lines that were not recognized as section keyword will be put under this section in the output.
     current_section_keyword = ""
 
     for line in resume_info:
-        if line_has_visual_properties_of_section_keywords(line, visual_properties_of_keywords_in_resume):
+        line_text = line.line_text
+        if line.line_index in lines_with_style_of_section_keywords:
             # Check if line matches any section keyword, and if so get the matched section keyword
             line_matches_section_keyword = False
             section_keyword_match_found = section_keyword_matched_in_line(line, keywords_dict, current_section_keyword)
@@ -462,21 +735,20 @@ def break_resume_in_sections(resume_info, keywords_dict, visual_properties_of_ke
                 line_matches_section_keyword = True
 
             # If not matched, but section_keywords are with capital, and line is capital -> it is probably section keyword
-            if not line_matches_section_keyword and line['line_text'].strip():
+            if not line_matches_section_keyword and not line.normalized_text.is_blank:
                 if visual_properties_of_keywords_in_resume['section_keywords_written_in_capital']:
-                    if is_text_all_capital(line["line_text"]) and not clean_text_from_nonbasic_characters(
-                            line['line_text']):
-                        current_section_keyword = line['line_text']
+                    if line_text == line.normalized_text.upper and not line.normalized_text.cleaned:
+                        current_section_keyword = line_text
                     # If keywords are with capital, but this text is not, then simply append to current section's text
                     else:
-                        result[current_section_keyword].append(line['line_text'])
+                        result.append_line(current_section_keyword, line)
                 # Since line had visual properties of section keywords assume it is.
                 else:
-                    current_section_keyword = line['line_text']
+                    current_section_keyword = line_text
 
         # If it's a normal line append it to the current section we are in.
-        elif current_section_keyword and line['line_text'].strip():
-            result[current_section_keyword].append(line['line_text'])
+        elif current_section_keyword and not line.normalized_text.is_blank:
+            result.append_line(current_section_keyword, line)
     return result
 
 
@@ -489,94 +761,85 @@ def is_amount_of_visual_properties_data_satisfactory(visual_properties_of_keywor
             and visual_properties_of_keywords_in_resume['section_keywords_written_in_capital'])
 
 
-def line_has_visual_properties_of_section_keywords(line, visual_properties_of_keywords_in_resume):
-    """Returns true if the line's given visual property is similar to the property of section keywords"""
-    result = True
-    for visual_property in visual_properties_of_keywords_in_resume.keys():
-        if visual_property != "section_keywords_written_in_capital":
-            if visual_properties_of_keywords_in_resume[visual_property] != line[visual_property]:
-                result = False
-                break
-        else:
-            if visual_properties_of_keywords_in_resume[visual_property]:
-                if line['line_text'] != line['line_text'].upper():
-                    result = False
-                    break
-    return result
+def line_may_have_visual_properties_of_section_keywords(line, visual_properties_of_keywords_in_resume):
+    """Returns false if the line can't start a new section based on its text only: blank lines never do, and if
+    the section keywords are written with capitals, lines that aren't don't have their visual properties either."""
+    if line.normalized_text.is_blank:
+        return False
+    if visual_properties_of_keywords_in_resume['section_keywords_written_in_capital']:
+        return line.line_text == line.normalized_text.upper
+    return True
 
 
 def section_keyword_matched_in_line(line, keywords_dict, current_section_keyword):
     """Iterates over the section keyword dictionary and checks if the current line's text contains any of the
     section keywords. If so, it returns the found section keyword. If no matches found returns current_section_keyword"""
-    for section_keyword_name, section_keyword_variations in keywords_dict.items():
-        for section_keyword in section_keyword_variations:
-            if (re.search(
-                    section_keyword.upper(),
-                    clean_text_from_nonbasic_characters(line['line_text']).upper())) is not None:
-                return section_keyword_name
+    keyword_matches = get_section_keyword_matcher(keywords_dict).match_line(line.normalized_text)
+    if keyword_matches:
+        return keyword_matches[0].section
     return current_section_keyword
 
 
-def is_text_all_capital(text):
-    """Returns true of the entire text is written with capitals. False otherwise."""
-    return text == text.upper()
-
-
 def parse_work_experience(resume_object, parsed_resume):
     """Identify individual work experiences, find the duration of the job and look for skills in their text."""
     if 'WorkExperience' not in parsed_resume:
         return parsed_resume
+    resume_object = LineTable.from_dicts(resume_object)
 
-    # Filter out empty lines and find the start and end index of the WE section in resume_object
-    parsed_resume_no_empty_lines = [line for line in parsed_resume['WorkExperience'] if
-                                    replace_newline_with_space(line).strip()]
-    filtered_resume_info = [line for line in resume_object if replace_newline_with_space(line['line_text'].strip())]
-    work_exp_indexes = find_workexperience_line_indexes_in_resume_object(parsed_resume_no_empty_lines,
-                                                                         filtered_resume_info)
-
-    # Create containers and append the first work expereince to our dictionary
-    job_experiences = []
-    job = {
-        'description': [],
-        'startDate': "",
-        'endDate': "",
-        "skills": []
-    }
-
-    job['description'].append(filtered_resume_info[work_exp_indexes["start_index"]]['line_text'])
+    # Find the first and last line of the WE section in resume_object
+    first_line_index, last_line_index = find_work_experience_line_range(resume_object, parsed_resume)
 
-    complete_resume_text = get_complete_work_experince_text(work_exp_indexes, filtered_resume_info)
+    # The sectioning strategies compare the positions of the lines in the WE section (including blank lines).
+    resume_object.ensure_styles(resume_object[first_line_index:last_line_index + 1])
 
     # Guess the number of experiences in the text, based on the found durations.
-    numer_of_expected_work_experiences = find_number_of_dates_in_text(complete_resume_text)
-
-    # Find end of section based on change in horizontal difference and left-margin difference
-    find_section_based_on_horizontal_diff_and_leftmargin_diff(work_exp_indexes, filtered_resume_info,
-                                                              job_experiences, job)
-
-    # If we didn't find at least half of the experiences, find sections that were seperated by new lines.
-    if len(job_experiences) <= numer_of_expected_work_experiences / 2:
-        job_experiences_new = find_section_based_on_enter(resume_object, parsed_resume)
-        if len(job_experiences_new) > len(job_experiences):
-            job_experiences = job_experiences_new
-
-    # If we didn't find at least half of the experiences, find sections based only on the horizontal difference between lines.
-    if len(job_experiences) <= numer_of_expected_work_experiences / 2:
-        job_experiences_new = find_section_based_on_horizontal_diff_only(resume_object, parsed_resume)
-        if len(job_experiences_new) > len(job_experiences):
-            job_experiences = job_experiences_new
-
-    # If we didn't find at least half of the experiences, find sections based on left margin.
-    if len(job_experiences) <= numer_of_expected_work_experiences / 2:
-        job_experiences_new = find_section_based_on_left_margin_only(work_exp_indexes, filtered_resume_info)
-        if len(job_experiences_new) > len(job_experiences):
-            job_experiences = job_experiences_new
+    numer_of_expected_work_experiences = find_number_of_dates_in_text(
+        get_complete_work_experince_text(resume_object[first_line_index + 1:last_line_index + 1]))
+
+    # Try the segmentation first, that won most of the times for the layout template of the resume. It's accepted if
+    # it found at least half of the experiences, otherwise the WE section is segmented with every strategy.
+    layout_template_store = get_default_layout_template_store()
+    section_found = first_line_index != 0 and last_line_index != 0
+    fingerprint = None
+    if layout_template_store is not None and section_found:
+        fingerprint = get_layout_fingerprint(resume_object)
+    winning_segmentation = None
+    if fingerprint is not None:
+        preferred_segmentation = layout_template_store.get_preferred_segmentation(fingerprint)
+        if preferred_segmentation in WORK_EXPERIENCE_SEGMENTATIONS:
+            job_experiences = segment_work_experience(resume_object, first_line_index, last_line_index,
+                                                      (preferred_segmentation,))[preferred_segmentation]
+            if len(job_experiences) > numer_of_expected_work_experiences / 2:
+                winning_segmentation = preferred_segmentation
+
+    if winning_segmentation is None:
+        segmentations = segment_work_experience(resume_object, first_line_index, last_line_index)
+        winning_segmentation = choose_work_experience_segmentation(segmentations, numer_of_expected_work_experiences)
+        job_experiences = segmentations[winning_segmentation]
+    if fingerprint is not None:
+        layout_template_store.record_segmentation(fingerprint, winning_segmentation)
+
     job_experiences = find_dates_in_job(job_experiences)
     job_experiences = find_skills_in_job(job_experiences)
     parsed_resume['WorkExperience'] = job_experiences
     return parsed_resume
 
 
+def find_work_experience_line_range(resume_object, parsed_resume):
+    """Returns the line_index of the first and the last line of the work experience section in resume_object. The
+    indexes recorded by break_resume_in_sections (see ResumeSections) are used, the lines are only looked up by their
+    texts, if the sections don't have them."""
+    line_indexes = getattr(parsed_resume, 'line_indexes', {}).get('WorkExperience')
+    if line_indexes:
+        return line_indexes[0], line_indexes[-1]
+
+    parsed_resume_no_empty_lines = [line for line in parsed_resume['WorkExperience'] if
+                                    replace_newline_with_space(line).strip()]
+    work_exp_indexes = find_workexperience_line_indexes_in_resume_object(parsed_resume_no_empty_lines,
+                                                                         resume_object)
+    return work_exp_indexes['start_index'], work_exp_indexes['end_index']
+
+
 def find_workexperience_line_indexes_in_resume_object(parsed_resume_no_empty_lines, filtered_resume_info):
     """Finds the first and last indexes in resume_object, where the lines correspond to the work_experience.
     Returns the index if found, else None."""
@@ -587,19 +850,19 @@ def find_workexperience_line_indexes_in_resume_object(parsed_resume_no_empty_lin
     last_line_index = 0
     if we_first_line_text and we_last_line_text:
         for i, line in enumerate(filtered_resume_info):
-            if line['line_text'] == we_first_line_text:
+            if line.line_text == we_first_line_text:
                 first_line_index = i
-            if line['line_text'] == we_last_line_text:
+            if line.line_text == we_last_line_text:
                 last_line_index = i
     return {'start_index': first_line_index, 'end_index': last_line_index}
 
 
-def get_complete_work_experince_text(work_exp_indexes, filtered_resume_info):
-    """Extract the text of a given work experience from the reusme, using the work_exp_indexes that
-    determint the start and end line (index) in the filtered_resume_info"""
+def get_complete_work_experince_text(lines):
+    """Extract the text of a given work experience from the given lines of the resume, blank lines are skipped."""
     text = ""
-    for index in range(work_exp_indexes['start_index'] + 1, work_exp_indexes['end_index'] + 1):
-        text += filtered_resume_info[index]['line_text'] + '\n'
+    for line in lines:
+        if not line.normalized_text.is_blank:
+            text += line.line_text + '\n'
     return text
 
 
@@ -609,46 +872,129 @@ def find_number_of_dates_in_text(text):
     return dr.find_number_of_durations()
 
 
-def find_section_based_on_horizontal_diff_and_leftmargin_diff(work_exp_indexes, filtered_resume_info,
-                                                              job_experiences, job):
-    """Default work experience sectioning strategy, where both horizontal and vertical spacing is used to determine,
-    whether a new section is starting."""
+# The work experience segmentation strategies, in the order they are preferred by parse_work_experience:
+# - 'horizontal_diff_and_left_margin': a new job starts, where both the vertical distance and the left margin change
+# - 'enter': jobs are separated by blank lines
+# - 'horizontal_diff_only': a new job starts, where the vertical distance changes (blank lines included)
+# - 'left_margin_only': a new job starts, where the line starts more to the left than the previous one
+WORK_EXPERIENCE_SEGMENTATIONS = ('horizontal_diff_and_left_margin', 'enter', 'horizontal_diff_only',
+                                 'left_margin_only')
+
+# The segmentations, that skip the blank lines of the section.
+NON_BLANK_LINE_SEGMENTATIONS = ('horizontal_diff_and_left_margin', 'left_margin_only')
+
+
+def choose_work_experience_segmentation(segmentations, numer_of_expected_work_experiences):
+    """Returns the name of the segmentation to use from the segmentations (see segment_work_experience). The
+    segmentation based on change in horizontal difference and left-margin difference is used, unless it didn't find
+    at least half of the expected experiences. Then the fallback strategies are tried in order: sections seperated by
+    new lines, sections based only on the horizontal difference between lines, and sections based on left margin."""
+    winning_segmentation = WORK_EXPERIENCE_SEGMENTATIONS[0]
+    for segmentation in WORK_EXPERIENCE_SEGMENTATIONS[1:]:
+        if len(segmentations[winning_segmentation]) <= numer_of_expected_work_experiences / 2 and \
+                len(segmentations[segmentation]) > len(segmentations[winning_segmentation]):
+            winning_segmentation = segmentation
+    return winning_segmentation
+
+
+def segment_work_experience(resume_object, first_line_index, last_line_index,
+                            requested_segmentations=WORK_EXPERIENCE_SEGMENTATIONS):
+    """Walks the lines of the work experience section (from first_line_index to last_line_index in resume_object)
+    once, and computes the boundary signals of each line: the change of the vertical distance (including page
+    changes) from the previous line and from the previous non-blank line, the change of the left margin and whether
+    the line is blank. Returns the jobs found by each of the requested_segmentations (see
+    WORK_EXPERIENCE_SEGMENTATIONS) in a dictionary, the signals of the other segmentations are not computed. The first
+    job starts with the first line of the section. Only the 'horizontal_diff_and_left_margin' segmentation keeps a
+    single job, if no boundary was found."""
+
+    segmentations = {segmentation: [] for segmentation in requested_segmentations}
+    section_found = first_line_index != 0 and last_line_index != 0
+    # The segmentations of the non-blank lines need a non-blank line before the section.
+    non_blank_segmentations_requested = any(segmentation in NON_BLANK_LINE_SEGMENTATIONS
+                                            for segmentation in requested_segmentations)
+    non_blank_section_found = section_found and non_blank_segmentations_requested and \
+        any(not line.normalized_text.is_blank for line in resume_object[:first_line_index])
+    if not section_found:
+        return segmentations
+    horizontal_diff_only_requested = 'horizontal_diff_only' in requested_segmentations
+
+    lines = resume_object[first_line_index:last_line_index + 1]
+
+    # Distances between the adjacent lines, computed at once for the whole section.
+    if horizontal_diff_only_requested:
+        layout_statistics = LayoutStatistics(lines)
+        vertical_distances = layout_statistics.vertical_distances().tolist()
+        page_changes = layout_statistics.page_changes().tolist()
+    if non_blank_section_found:
+        non_blank_layout_statistics = LayoutStatistics([line for line in lines if not line.normalized_text.is_blank])
+        non_blank_vertical_distances = non_blank_layout_statistics.vertical_distances().tolist()
+        non_blank_left_margin_differences = non_blank_layout_statistics.left_margin_differences().tolist()
+        non_blank_page_changes = non_blank_layout_statistics.page_changes().tolist()
+
+    jobs = {segmentation: create_job([lines[0].line_text]) for segmentation in WORK_EXPERIENCE_SEGMENTATIONS}
+    boundary_found = {segmentation: False for segmentation in WORK_EXPERIENCE_SEGMENTATIONS}
     previous_horizontal_diffs = []
-
-    if work_exp_indexes['start_index'] != 0 and work_exp_indexes['end_index'] != 0:
-        for index in range(work_exp_indexes['start_index'] + 1, work_exp_indexes['end_index'] + 1):
-            # New Section based on Horizontal change?
-            horizontal_space_diff_between_current_and_last_line = \
-                int(float(filtered_resume_info[index - 1]['bottom_margin'][:-2]) -
-                    float(filtered_resume_info[index]['bottom_margin'][:-2]))
-            pageChange = filtered_resume_info[index]['page_number'] != filtered_resume_info[index - 1][
-                'page_number']
-
-            new_section_based_on_change_in_horizontal_distance = \
-                is_new_section_based_on_horizontal_difference(pageChange,
-                                                              horizontal_space_diff_between_current_and_last_line,
-                                                              previous_horizontal_diffs)
-            previous_horizontal_diffs.append(abs(horizontal_space_diff_between_current_and_last_line))
-
-            # New Section based on Left margin change?
-            new_section_based_on_change_in_left_margin = False
-            left_margin_diff_between_current_and_last_line = \
-                int(float(filtered_resume_info[index - 1]['left_margin'][:-2]) -
-                    float(filtered_resume_info[index]['left_margin'][:-2]))
-            if left_margin_diff_between_current_and_last_line > 0:
-                new_section_based_on_change_in_left_margin = True
-
-            if new_section_based_on_change_in_horizontal_distance and new_section_based_on_change_in_left_margin:
-                job_experiences.append(job)
-                job = {
-                    'description': [filtered_resume_info[index]['line_text']],
-                    'startDate': "",
-                    'endDate': "",
-                    "skills": []
-                }
+    previous_non_blank_horizontal_diffs = []
+    non_blank_position = 0
+
+    def start_new_job(segmentation, description):
+        if segmentation in segmentations:
+            segmentations[segmentation].append(jobs[segmentation])
+        jobs[segmentation] = create_job(description)
+        boundary_found[segmentation] = True
+
+    for position in range(1, len(lines)):
+        line_text = lines[position].line_text
+
+        # New Section based on Horizontal change?
+        if horizontal_diff_only_requested:
+            if is_new_section_based_on_horizontal_difference(page_changes[position], vertical_distances[position],
+                                                             previous_horizontal_diffs):
+                start_new_job('horizontal_diff_only', [line_text])
             else:
-                job['description'].append(filtered_resume_info[index]['line_text'])
-        job_experiences.append(job)
+                jobs['horizontal_diff_only']['description'].append(line_text)
+            previous_horizontal_diffs.append(abs(vertical_distances[position]))
+
+        if lines[position].normalized_text.is_blank:
+            start_new_job('enter', [])
+            continue
+        jobs['enter']['description'].append(line_text)
+        if not non_blank_section_found:
+            continue
+
+        # New Section based on Horizontal change and Left margin change, comparing the non-blank lines only.
+        non_blank_position += 1
+        horizontal_space_diff = non_blank_vertical_distances[non_blank_position]
+        new_section_based_on_change_in_horizontal_distance = is_new_section_based_on_horizontal_difference(
+            non_blank_page_changes[non_blank_position], horizontal_space_diff, previous_non_blank_horizontal_diffs)
+        previous_non_blank_horizontal_diffs.append(abs(horizontal_space_diff))
+        new_section_based_on_change_in_left_margin = non_blank_left_margin_differences[non_blank_position] > 0
+
+        if new_section_based_on_change_in_horizontal_distance and new_section_based_on_change_in_left_margin:
+            start_new_job('horizontal_diff_and_left_margin', [line_text])
+        else:
+            jobs['horizontal_diff_and_left_margin']['description'].append(line_text)
+        if new_section_based_on_change_in_left_margin:
+            start_new_job('left_margin_only', [line_text])
+        else:
+            jobs['left_margin_only']['description'].append(line_text)
+
+    for segmentation in requested_segmentations:
+        if segmentation in NON_BLANK_LINE_SEGMENTATIONS and not non_blank_section_found:
+            segmentations[segmentation] = []
+        elif boundary_found[segmentation] or segmentation == WORK_EXPERIENCE_SEGMENTATIONS[0]:
+            segmentations[segmentation].append(jobs[segmentation])
+    return segmentations
+
+
+def create_job(description):
+    """Returns the dictionary of a job (work experience) with the given lines of description."""
+    return {
+        'description': description,
+        'startDate': "",
+        'endDate': "",
+        "skills": []
+    }
 
 
 def is_new_section_based_on_horizontal_difference(pageChange, horizontal_space_diff_between_current_and_last_line,
@@ -670,129 +1016,6 @@ def is_new_section_based_on_horizontal_difference(pageChange, horizontal_space_d
                               previous_horizontal_diffs[-1] * HORIZONTAL_DIFF_TRESHOLD))
 
 
-def find_section_based_on_enter(resume_object, parsed_resume):
-    """A fallback work experience separation strategy, where blank lines are used to identify new sections."""
-    parsed_resume_no_empty_lines = [line for line in parsed_resume['WorkExperience'] if
-                                    replace_newline_with_space(line).strip()]
-    work_exp_indexes = find_workexperience_line_indexes_in_resume_object(parsed_resume_no_empty_lines,
-                                                                         resume_object)
-
-    job_experiences = []
-    job = {
-        'description': [],
-        'startDate': "",
-        'endDate': "",
-        "skills": []
-    }
-    job['description'].append(resume_object[work_exp_indexes["start_index"]]['line_text'])
-
-    we_found = False
-    if work_exp_indexes['start_index'] != 0 and work_exp_indexes['end_index'] != 0:
-        for index in range(work_exp_indexes['start_index'] + 1, work_exp_indexes['end_index'] + 1):
-            if not replace_newline_with_space(resume_object[index]['line_text']).strip():
-                we_found = True
-                job_experiences.append(job)
-                job = {
-                    'description': [],
-                    'startDate': "",
-                    'endDate': "",
-                    "skills": []
-                }
-            else:
-                job['description'].append(resume_object[index]['line_text'])
-        if we_found:
-            job_experiences.append(job)
-    return job_experiences
-
-
-def find_section_based_on_horizontal_diff_only(resume_object, parsed_resume):
-    """A fallback work experience separation strategy, where only the horizontal difference
-     is used to identify new sections."""
-    parsed_resume_no_empty_lines = [line for line in parsed_resume['WorkExperience'] if
-                                    replace_newline_with_space(line).strip()]
-    work_exp_indexes = find_workexperience_line_indexes_in_resume_object(parsed_resume_no_empty_lines,
-                                                                         resume_object)
-
-    job_experiences = []
-    job = {
-        'description': [],
-        'startDate': "",
-        'endDate': "",
-        "skills": []
-    }
-    job['description'].append(resume_object[work_exp_indexes["start_index"]]['line_text'])
-    previous_horizontal_diffs = []
-
-    we_found = False
-    if work_exp_indexes['start_index'] != 0 and work_exp_indexes['end_index'] != 0:
-        for index in range(work_exp_indexes['start_index'] + 1, work_exp_indexes['end_index'] + 1):
-            # New Section based on Horizontal change?
-            horizontal_space_diff_between_current_and_last_line = \
-                int(float(resume_object[index - 1]['bottom_margin'][:-2]) -
-                    float(resume_object[index]['bottom_margin'][:-2]))
-            pageChange = resume_object[index]['page_number'] != resume_object[index - 1][
-                'page_number']
-
-            new_section_based_on_change_in_horizontal_distance = \
-                is_new_section_based_on_horizontal_difference(pageChange,
-                                                              horizontal_space_diff_between_current_and_last_line,
-                                                              previous_horizontal_diffs)
-            previous_horizontal_diffs.append(abs(horizontal_space_diff_between_current_and_last_line))
-
-            if new_section_based_on_change_in_horizontal_distance:
-                we_found = True
-                job_experiences.append(job)
-                job = {
-                    'description': [resume_object[index]['line_text']],
-                    'startDate': "",
-                    'endDate': "",
-                    "skills": []
-                }
-            else:
-                job['description'].append(resume_object[index]['line_text'])
-        if we_found:
-            job_experiences.append(job)
-    return job_experiences
-
-
-def find_section_based_on_left_margin_only(work_exp_indexes, filtered_resume_info):
-    """A fallback work experience separation strategy, where only the left margin is used to indentify new sections."""
-    job_experiences = []
-    job = {
-        'description': [],
-        'startDate': "",
-        'endDate': "",
-        "skills": []
-    }
-    job['description'].append(filtered_resume_info[work_exp_indexes["start_index"]]['line_text'])
-
-    we_found = False
-    if work_exp_indexes['start_index'] != 0 and work_exp_indexes['end_index'] != 0:
-        for index in range(work_exp_indexes['start_index'] + 1, work_exp_indexes['end_index'] + 1):
-
-            new_section_based_on_change_in_left_margin = False
-            left_margin_diff_between_current_and_last_line = \
-                int(float(filtered_resume_info[index - 1]['left_margin'][:-2]) -
-                    float(filtered_resume_info[index]['left_margin'][:-2]))
-            if left_margin_diff_between_current_and_last_line > 0:
-                new_section_based_on_change_in_left_margin = True
-
-            if new_section_based_on_change_in_left_margin:
-                we_found = True
-                job_experiences.append(job)
-                job = {
-                    'description': [filtered_resume_info[index]['line_text']],
-                    'startDate': "",
-                    'endDate': "",
-                    "skills": []
-                }
-            else:
-                job['description'].append(filtered_resume_info[index]['line_text'])
-        if we_found:
-            job_experiences.append(job)
-    return job_experiences
-
-
 def find_dates_in_job(job_experiences):
     """Finds the duration of each job experience and adds it to the given job's dictionary."""
     for job in job_experiences:
@@ -832,30 +1055,17 @@ def find_skills_in_job(job_experiences):
 
 
 def find_skills_in_text(text):
-    """Looks through the entire skill section, looking for skills."""
-    skills = resource_string('resources.extracted-lists', "skills_to_find.txt").decode("utf-8",
-                                                                                      "strict").splitlines()
-
-    skills.sort(key=len, reverse=True)
-    found_skills = []
-    for skill in skills:
-        match = re.search(r'((?<=^)|(?<=[^a-zA-Z\d]))' + re.escape(skill.lower()) + r'(?=$|[^a-zA-Z\d])', text.lower())
-        if match:
-            text = text.replace(match.group(), "")
-            found_skills.append(skill)
-
-    return found_skills
+    """Looks through the entire skill section, looking for skills. Returns each found skill once, the longest skills
+    first."""
+    return resource_registry.get('skills_to_find').matcher.find_distinct_skills(text)
 
 
 def find_skills_for_skill_learning(word, known_word_but_not_skill, found_skills_set):
     """Checks whether the given word is a skill, or not a skill."""
-    skills = resource_string('resources.extracted-lists', "skills_to_find.txt").decode("utf-8",
-                                                                                      "strict").splitlines()
-
     if word.lower() in known_word_but_not_skill:
         return False
 
-    if word.lower() in skills:
+    if word.lower() in resource_registry.get('skills_to_find').skill_set:
         if found_skills_set is not None:
             found_skills_set.add(word.lower())
             return True
@@ -881,9 +1091,15 @@ def learn_skills_from_resume(resume_dict):
     """Checks each word of the skill section, whether it is a known skill. If there is an unknown word, between to
     known skill-words, then we can assume, that the word in the middle is also a skill, hence it is added to the skill
     dictionary."""
+    save_learned_skills(find_unknown_skills_of_resume(resume_dict))
+
 
-    skills_to_avoid = resource_string('resources.extracted-lists', "skills_to_avoid.txt").decode("utf-8",
-                                                                                      "strict").splitlines()
+def find_unknown_skills_of_resume(resume_dict):
+    """Returns the unknown words of the skill section, that are learned as skills (see learn_skills_from_resume),
+    without adding them to the skill dictionary."""
+
+    learned_skills = []
+    skills_to_avoid = resource_registry.get('skills_to_avoid')
 
     if "Skills" in resume_dict:
         skills_text = ""
@@ -905,7 +1121,15 @@ def learn_skills_from_resume(resume_dict):
                 current_is_not_skill = not find_skills_for_skill_learning(skills_list[x], known_words, found_skills)
                 next_is_skill = find_skills_for_skill_learning(skills_list[x + 1], known_words, found_skills)
                 if prev_is_skill and current_is_not_skill and next_is_skill and skills_list[x].lower() not in skills_to_avoid:
-                    file_path = path.relpath("resources/extracted-lists/skills_to_find.txt")
-                    with open(file_path, "a") as myfile:
-                        myfile.write("\n" + skills_list[x])
+                    learned_skills.append(skills_list[x])
+    return learned_skills
+
+
+def save_learned_skills(learned_skills):
+    """Appends the learned skills (each of them once) to the skill dictionary with a single write."""
+    learned_skills = list(OrderedDict.fromkeys(learned_skills))
+    if learned_skills:
+        file_path = path.relpath("resources/extracted-lists/skills_to_find.txt")
+        with open(file_path, "a") as myfile:
+            myfile.write("".join("\n" + skill for skill in learned_skills))
 
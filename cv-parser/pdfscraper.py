@@ -0,0 +1,110 @@
+from pdfminer.converter import PDFPageAggregator
+from pdfminer.layout import LAParams, LTChar, LTTextBox, LTTextLine
+from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+from pdfminer.pdfpage import PDFPage
+
+from .scraper import correct_left_margin
+from .staticscraper import format_css_pixel_value, trim_excluding_non_breaking_spaces
+
+
+def convert_pdf_resume_to_object(pdf_file):
+    """Reads the text lines and their visual properties straight from the pdf resume (given by its path or as a binary
+    file object), without converting it to html. The returned list of "line dictionaries" is the same as the one
+    returned by convert_html_resume_to_object, except that positions and sizes are measured in pdf points instead of
+    the pixels of the pdf2htmlEX output. The sectioning only compares these values within the same resume, so the
+    different scale doesn't matter."""
+
+    return list(iterate_pdf_resume_lines(pdf_file))
+
+
+def iterate_pdf_resume_lines(pdf_file):
+    """Generator version of convert_pdf_resume_to_object, yielding the "line dictionaries" page by page, as soon as
+    the layout of a page has been analyzed."""
+
+    if isinstance(pdf_file, str):
+        with open(pdf_file, 'rb') as opened_pdf_file:
+            for line_props in iterate_pdf_resume_lines(opened_pdf_file):
+                yield line_props
+        return
+
+    resource_manager = PDFResourceManager()
+    device = PDFPageAggregator(resource_manager, laparams=LAParams())
+    interpreter = PDFPageInterpreter(resource_manager, device)
+
+    for page_index, page in enumerate(PDFPage.get_pages(pdf_file)):
+        interpreter.process_page(page)
+        # pdf2htmlEX numbers the pages with hexadecimal numbers, keep the same format.
+        page_number = format(page_index + 1, 'x')
+        for line in find_text_lines(device.get_result()):
+            line_props = get_pdf_line_properties(line)
+            line_props['page_number'] = page_number
+            yield line_props
+
+
+def find_text_lines(layout):
+    """Returns the text lines of the page layout in reading order."""
+    text_lines = []
+    for element in layout:
+        if isinstance(element, LTTextBox):
+            text_lines.extend(line for line in element if isinstance(line, LTTextLine))
+    return text_lines
+
+
+def get_pdf_line_properties(line):
+    """Puts the details (font-size, font-family, left-margin, text-color and text) of a pdfminer text line into a
+    dictionary. The style of the line is the style of its first visible character."""
+
+    text = trim_excluding_non_breaking_spaces(line.get_text().rstrip('\n')).replace('\xa0', ' ')
+    first_character = find_first_visible_character(line)
+
+    font_size = "0px"
+    font_family = ""
+    font_color = "rgba(0, 0, 0, 1)"
+    if first_character is not None:
+        font_size = format_css_pixel_value(first_character.size)
+        font_family = remove_font_subset_prefix(first_character.fontname)
+        font_color = format_pdf_color(getattr(first_character, 'graphicstate', None))
+
+    return {
+        'font_size': font_size,
+        'font_family': font_family,
+        'left_margin': correct_left_margin(format_css_pixel_value(line.x0), text),
+        'font_color': font_color,
+        'bottom_margin': format_css_pixel_value(line.y0),
+        'line_text': text,
+        'page_number': 0
+    }
+
+
+def find_first_visible_character(line):
+    """Returns the first non white-space character (LTChar) of the line, or None if there is no such character."""
+    for character in line:
+        if isinstance(character, LTChar) and character.get_text().strip():
+            return character
+    return None
+
+
+def remove_font_subset_prefix(font_name):
+    """Removes the subset tag from the name of embedded fonts (e.g.: ABCDEF+Arial-Bold -> Arial-Bold)."""
+    if len(font_name) > 7 and font_name[6] == '+' and font_name[:6].isupper():
+        return font_name[7:]
+    return font_name
+
+
+def format_pdf_color(graphic_state):
+    """Converts the non-stroking (fill) color of the character's graphic state to the rgba() format returned by
+    WebDriver. Gray, RGB and CMYK colors are supported, anything else is treated as black."""
+
+    color = None if graphic_state is None else graphic_state.ncolor
+    if isinstance(color, (list, tuple)) and not all(isinstance(component, (int, float)) for component in color):
+        color = None
+    if isinstance(color, (int, float)):
+        color = (color, color, color)
+    if isinstance(color, (list, tuple)) and len(color) == 1:
+        color = (color[0], color[0], color[0])
+    if isinstance(color, (list, tuple)) and len(color) == 4:
+        cyan, magenta, yellow, black = color
+        color = ((1 - cyan) * (1 - black), (1 - magenta) * (1 - black), (1 - yellow) * (1 - black))
+    if not isinstance(color, (list, tuple)) or len(color) != 3:
+        color = (0, 0, 0)
+    return 'rgba(' + ', '.join(str(int(round(component * 255))) for component in color) + ', 1)'
@@ -0,0 +1,66 @@
+import argparse
+import sys
+import time
+
+from main.scraper import *
+
+
+class RoundTripCounter:
+    """Counts the WebDriver commands (each one is an HTTP round-trip to the chromedriver) sent by a browser."""
+
+    def __init__(self, browser):
+        self.browser = browser
+        self.count = 0
+        self.original_execute = browser.execute
+        browser.execute = self.execute
+
+    def execute(self, driver_command, params=None):
+        self.count += 1
+        return self.original_execute(driver_command, params)
+
+    def detach(self):
+        self.browser.execute = self.original_execute
+
+
+def benchmark(scraper, path_to_html, scraping_function, repetitions):
+    """Scrapes the resume repetitions times with the given function. Returns the scraped lines, the number of
+    round-trips of one scraping and the average duration in seconds."""
+
+    durations = []
+    round_trips = 0
+    resume_lines = []
+    for _ in range(repetitions):
+        counter = RoundTripCounter(scraper.browser)
+        start = time.perf_counter()
+        resume_lines = scraping_function(scraper, path_to_html)
+        durations.append(time.perf_counter() - start)
+        counter.detach()
+        round_trips = counter.count
+    return resume_lines, round_trips, sum(durations) / len(durations)
+
+
+def start(paths_to_html, repetitions):
+    """Compares the per-line and the per-page scraping of the given html resumes."""
+
+    result_row = "{:<40} {:>6} {:>12} {:>12} {:>10} {:>10} {:>8}"
+    print(result_row.format("resume", "lines", "trips/line", "trips/page", "s/line", "s/page", "equal"))
+    with Scraper() as scraper:
+        for path_to_html in paths_to_html:
+            path_to_html = os.path.abspath(path_to_html)
+            lines_by_line, trips_by_line, duration_by_line = benchmark(scraper, path_to_html,
+                                                                       scrape_html_resume_line_by_line, repetitions)
+            lines_by_page, trips_by_page, duration_by_page = benchmark(scraper, path_to_html,
+                                                                       scrape_html_resume, repetitions)
+            print(result_row.format(os.path.basename(path_to_html)[-40:], len(lines_by_line),
+                                    trips_by_line, trips_by_page,
+                                    "{:.3f}".format(duration_by_line), "{:.3f}".format(duration_by_page),
+                                    str(lines_by_line == lines_by_page)))
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description='Compare WebDriver round-trips and latency of the per-line '
+                                                     'and the per-page scraping of html resumes.')
+    arg_parser.add_argument('htmlFiles', nargs='+', help='Html resumes generated by pdf2htmlEX.')
+    arg_parser.add_argument('--repetitions', type=int, default=3, help='Number of measurements per resume.')
+    parsed_args = arg_parser.parse_args(sys.argv[1:])
+    start(parsed_args.htmlFiles, parsed_args.repetitions)
@@ -0,0 +1,121 @@
+import math
+import re
+from collections import defaultdict
+
+from .linetable import Line, LineTable
+
+
+# Maximum difference (in pixels) between the bottom margins of text fragments, that are on the same baseline.
+BASELINE_TOLERANCE = 0.5
+
+# Number of the top and bottom baselines of each page, whose lines can be headers and footers.
+HEADER_FOOTER_BASELINES = 3
+
+# Page numbers in the headers and footers: "Page 2", "Page 2 of 3", "2/3", or a bare number (e.g. "- 2 -").
+page_number_regex = re.compile(r'page\s*\d+(\s*(of|/)\s*\d+)?')
+bare_page_number_regex = re.compile(r'^[\s\-\u2013\u2014]*\d{1,3}(\s*/\s*\d{1,3})?[\s\-\u2013\u2014]*$')
+
+
+def preprocess_resume_lines(resume_object):
+    """Cleans the lines of the resume (LineTable or list of "line dictionaries") before they are broken into
+    sections: merges the fragments of the visual lines (see coalesce_line_fragments) and removes the headers and
+    footers repeated on the pages (see remove_repeated_page_lines). Returns a new LineTable."""
+
+    lines = list(coalesce_line_fragments(LineTable.from_dicts(resume_object)))
+    lines = remove_repeated_page_lines(lines)
+
+    preprocessed_resume_object = LineTable()
+    for line in lines:
+        preprocessed_resume_object.append_dict(line)
+    return preprocessed_resume_object
+
+
+def coalesce_line_fragments(lines):
+    """pdf2htmlEX often splits a visual line into several text elements (e.g. a job title and its dates aligned to
+    the right). Generator merging the consecutive lines (Lines or "line dictionaries") on the same page and
+    baseline, written with the same style, into a single Line. The fragments are joined with a space, the merged Line
+    keeps the position of its first fragment. Blank lines are never merged."""
+
+    pending_line = None
+    try:
+        for line in lines:
+            if not isinstance(line, Line):
+                line = Line.from_dict(line, 0)
+            if pending_line is not None and is_fragment_of_line(pending_line, line):
+                pending_line = merge_line_fragments(pending_line, line)
+                continue
+            if pending_line is not None:
+                yield pending_line
+            pending_line = line
+        if pending_line is not None:
+            yield pending_line
+    finally:
+        # Stop the extraction of the lines, if the caller stopped early.
+        if hasattr(lines, 'close'):
+            lines.close()
+
+
+def is_fragment_of_line(line, fragment):
+    """Returns true if the fragment continues the line: it's on the same page and baseline, to the right of the
+    line, and has the same font size, font family and color. Both have to contain text."""
+    return line.page_number == fragment.page_number and \
+        abs(line.bottom_margin - fragment.bottom_margin) <= BASELINE_TOLERANCE and \
+        fragment.left_margin > line.left_margin and \
+        line.font_size == fragment.font_size and \
+        line.font_family == fragment.font_family and \
+        line.font_color == fragment.font_color and \
+        bool(line.line_text.strip()) and bool(fragment.line_text.strip())
+
+
+def merge_line_fragments(line, fragment):
+    """Returns a new Line with the text of the fragment appended to the text of the line."""
+    return Line(line.font_size, line.font_family, line.left_margin, line.font_color, line.bottom_margin,
+                line.line_text.rstrip() + ' ' + fragment.line_text.strip(), line.page_number, line.page_index,
+                line.line_index)
+
+
+def remove_repeated_page_lines(lines):
+    """Removes the headers and footers (name, contact line, page numbers etc.) repeated on the pages of the resume:
+    the lines in the top or bottom band of their page (see find_header_and_footer_lines), whose text (ignoring case
+    and page numbers) appears at the same position on at least half of the pages (and at least on 2 pages). Lines in
+    the middle of the pages (e.g. the dates of the jobs in a template) and blank lines are kept. Returns the list of
+    the remaining lines."""
+
+    header_and_footer_lines = find_header_and_footer_lines(lines)
+    pages_of_line = defaultdict(set)
+    for line in header_and_footer_lines.values():
+        pages_of_line[get_repeated_line_key(line)].add(line.page_number)
+
+    number_of_pages = len(set(line.page_number for line in lines))
+    minimum_number_of_pages = max(2, math.ceil(number_of_pages / 2))
+    return [line for line in lines if id(line) not in header_and_footer_lines or
+            len(pages_of_line[get_repeated_line_key(line)]) < minimum_number_of_pages]
+
+
+def find_header_and_footer_lines(lines):
+    """Returns the non-blank lines on the HEADER_FOOTER_BASELINES highest and lowest baselines of their page, in a
+    dictionary (id of the line -> line)."""
+
+    baselines_of_page = defaultdict(set)
+    for line in lines:
+        if line.line_text.strip():
+            baselines_of_page[line.page_number].add(round(line.bottom_margin))
+
+    band_baselines_of_page = {}
+    for page_number, baselines in baselines_of_page.items():
+        baselines = sorted(baselines)
+        band_baselines_of_page[page_number] = set(baselines[:HEADER_FOOTER_BASELINES] +
+                                                  baselines[-HEADER_FOOTER_BASELINES:])
+    return {id(line): line for line in lines if line.line_text.strip() and
+            round(line.bottom_margin) in band_baselines_of_page[line.page_number]}
+
+
+def get_repeated_line_key(line):
+    """Returns the position (rounded to pixels) and the normalized text of the line. Page numbers are replaced, so
+    that e.g. "Page 1 of 3" and "Page 2 of 3" have the same key, other numbers (e.g. dates) are kept."""
+    normalized_text = ' '.join(line.line_text.lower().split())
+    if bare_page_number_regex.match(normalized_text):
+        normalized_text = '#'
+    else:
+        normalized_text = page_number_regex.sub('page #', normalized_text)
+    return round(line.bottom_margin), round(line.left_margin), normalized_text
@@ -0,0 +1,109 @@
+import os
+import threading
+from collections import OrderedDict
+
+from pkg_resources import resource_filename, resource_listdir
+
+from .keywordmatcher import SectionKeywords, SkillMatcher
+
+
+class ResourceRegistry:
+    """Loads the resource files (keyword and skill lists) once per process, and keeps the structures compiled from
+    them (e.g. the SectionKeywordMatcher) instead of reading and decoding the files on every use. Whenever a resource
+    is requested, its files are checked for changes (by their modification time and size): a changed resource is
+    reloaded and recompiled, and the new structures replace the old ones at once. Hence a long-running worker picks
+    up the edited lists without a restart, and never sees a half-loaded resource."""
+
+    def __init__(self):
+        self.loaders = {}
+        self.resources = {}
+        self.lock = threading.Lock()
+
+    def register(self, name, package, resource_filter, load_function):
+        """Registers a resource: the files of the package (e.g. 'resources.keywordlists') selected by
+        resource_filter (called with the file name) are read and passed to load_function as an OrderedDict
+        (file name -> text), that returns the compiled resource."""
+        self.loaders[name] = (package, resource_filter, load_function)
+        self.resources.pop(name, None)
+
+    def get(self, name):
+        """Returns the compiled resource, reloading it if its files changed since it was loaded."""
+        package, resource_filter, load_function = self.loaders[name]
+        resource_paths = find_resource_paths(package, resource_filter)
+        signature = get_signature_of_files(resource_paths)
+
+        loaded_resource = self.resources.get(name)
+        if loaded_resource is None or loaded_resource[0] != signature:
+            with self.lock:
+                loaded_resource = self.resources.get(name)
+                if loaded_resource is None or loaded_resource[0] != signature:
+                    loaded_resource = (signature, load_function(read_resource_files(resource_paths)))
+                    self.resources[name] = loaded_resource
+        return loaded_resource[1]
+
+
+def find_resource_paths(package, resource_filter):
+    """Returns the (file name, path) pairs of the files of the package selected by resource_filter."""
+    return [(resource_name, resource_filename(package, resource_name))
+            for resource_name in resource_listdir(package, '') if resource_filter(resource_name)]
+
+
+def get_signature_of_files(resource_paths):
+    """Returns the names, modification times and sizes of the files, that change whenever a file is modified."""
+    signature = []
+    for resource_name, resource_path in resource_paths:
+        try:
+            stat_result = os.stat(resource_path)
+        except OSError:
+            continue
+        signature.append((resource_name, stat_result.st_mtime_ns, stat_result.st_size))
+    return tuple(signature)
+
+
+def read_resource_files(resource_paths):
+    """Reads the files into an OrderedDict (file name -> text)."""
+    resource_texts = OrderedDict()
+    for resource_name, resource_path in resource_paths:
+        with open(resource_path, 'rb') as resource_file:
+            resource_texts[resource_name] = resource_file.read().decode("utf-8", "strict")
+    return resource_texts
+
+
+def compile_section_keywords(keyword_texts):
+    """Creates the SectionKeywords from the keyword lists. The key is always the filename (E.g.: Skills.txt -> Skills)
+    and the values are the list of keywords (skill, skills, abilities, languages etc.)."""
+    keywords_dict = SectionKeywords()
+    for name, text in keyword_texts.items():
+        keywords_dict[os.path.splitext(name)[0]] = text.splitlines()
+    # Compile the matcher before the keywords are swapped in.
+    keywords_dict.matcher
+    return keywords_dict
+
+
+class SkillList:
+    """The list of the known skills (skills_to_find.txt) and the structures compiled from it: the set of the skills
+    and the SkillMatcher finding them in a text."""
+
+    def __init__(self, skills):
+        self.skills = skills
+        self.skill_set = set(skills)
+        self.matcher = SkillMatcher(skills)
+
+
+def compile_skill_list(skill_texts):
+    """Creates the SkillList from the skills_to_find.txt file (an empty list if the file doesn't exist)."""
+    return SkillList([skill for text in skill_texts.values() for skill in text.splitlines()])
+
+
+def compile_skills_to_avoid(skill_texts):
+    """Returns the set of the words, that are never learned as skills (skills_to_avoid.txt)."""
+    return set(skill for text in skill_texts.values() for skill in text.splitlines())
+
+
+resource_registry = ResourceRegistry()
+resource_registry.register('section_keywords', 'resources.keywordlists',
+                           lambda name: os.path.splitext(name)[1] == '.txt', compile_section_keywords)
+resource_registry.register('skills_to_find', 'resources.extracted-lists',
+                           lambda name: name == 'skills_to_find.txt', compile_skill_list)
+resource_registry.register('skills_to_avoid', 'resources.extracted-lists',
+                           lambda name: name == 'skills_to_avoid.txt', compile_skills_to_avoid)
@@ -12,6 +12,46 @@ def create_arg_parser():
                         help='Path to the directory that contains the resumes.')
     parser.add_argument('--targetDirectory',
                         help='Path to the target directory that will contain the output.')
+    parser.add_argument('--backend', choices=sorted(set(EXTRACTION_BACKENDS) | set(TWO_PHASE_EXTRACTION_BACKENDS)),
+                        default='selenium',
+                        help='How the visual properties of the resume are extracted. "static" reads the pdf2htmlEX '
+                             'stylesheet directly and does not need a browser, "pdf" reads the pdf without converting '
+                             'it to html. "selenium-two-phase" fetches the texts first and the styles only for the '
+                             'lines, whose style is used.')
+    parser.add_argument('--streaming', action='store_true',
+                        help='Analyze the first pages of a resume while its next pages are still being extracted.')
+    parser.add_argument('--conversionProfile', choices=sorted(PDF_TO_HTML_PROFILES.keys()),
+                        default=DEFAULT_PDF_TO_HTML_PROFILE,
+                        help='pdf2htmlEX settings used for converting the resumes. "text" only generates the text '
+                             'layer the parser needs, "text-split" also writes each page into its own file (static '
+                             'backend only), "full" keeps the fonts and the background images.')
+    parser.add_argument('--skipTrailingPages', action='store_true',
+                        help='Stop reading a resume after the page, where the work experience and skills sections '
+                             'ended.')
+    parser.add_argument('--bundle', action='store_true',
+                        help='Each file is a bundle of several resumes: split it into the individual resumes and '
+                             'write the list of their information into the output.')
+    parser.add_argument('--bundleWorkers', type=int,
+                        help='Number of processes parsing the resumes of a bundle (default: number of cpus).')
+    parser.add_argument('--conversionWorkers', type=int,
+                        help='Number of pdf2htmlEX conversions running at the same time (default: number of cpus).')
+    parser.add_argument('--cacheDirectory',
+                        help='Directory caching the converted resumes by their content. By default the html is '
+                             'generated next to the pdf.')
+    parser.add_argument('--cacheSize', type=int,
+                        help='Size limit of the cache directory (in MB). The least recently used resumes are removed '
+                             'from the cache above this limit.')
+    parser.add_argument('--compressCache', action='store_true',
+                        help='Store the converted resumes compressed in the cache directory.')
+    parser.add_argument('--layoutStore',
+                        help='File storing what was learned about the layout templates of the parsed resumes (e.g. '
+                             'which work experience segmentation works for a template), shared between the runs.')
+    parser.add_argument('--browsers', type=int, default=1,
+                        help='Number of headless browsers kept open for the selenium backend.')
+    parser.add_argument('--resumesPerBrowser', type=int, default=200,
+                        help='Number of resumes after which a browser is restarted.')
+    parser.add_argument('--browserMemoryLimit', type=int, default=1024,
+                        help='Memory usage (in MB) after which a browser is restarted.')
     return parser
 
 
@@ -25,6 +65,13 @@ def passed_arguments_are_correct(parsed_args):
         if not os.path.isdir(parsed_args.targetDirectory):
             print('Argument passed for targetDirectory is not valid. Please provide a valid directory!')
             return False
+    if parsed_args.conversionProfile in SPLIT_PAGE_PDF_TO_HTML_PROFILES and \
+            parsed_args.backend in SELENIUM_EXTRACTION_BACKENDS:
+        print('The ' + parsed_args.conversionProfile + ' conversion profile can only be used with the static backend!')
+        return False
+    if parsed_args.bundle and parsed_args.backend in TWO_PHASE_EXTRACTION_BACKENDS:
+        print('Bundles can not be parsed with the ' + parsed_args.backend + ' backend!')
+        return False
     return True
 
 
@@ -33,38 +80,104 @@ def start_resume_parsing(parsed_args):
 
     print('Parsing resumes in dir:', parsed_args.inputDirectory)
 
-    for root, dirs, files in os.walk(parsed_args.inputDirectory):
+    if parsed_args.backend in SELENIUM_EXTRACTION_BACKENDS:
+        configure_default_scraper_pool(parsed_args.browsers, parsed_args.resumesPerBrowser,
+                                       parsed_args.browserMemoryLimit * 1024 * 1024)
+
+    if parsed_args.layoutStore is not None:
+        configure_default_layout_template_store(parsed_args.layoutStore)
+
+    resume_paths = find_resumes_in_directory(parsed_args.inputDirectory)
+
+    # Word resumes are read directly, without conversion.
+    for resume_path in resume_paths:
+        if get_extraction_backend_of_resume(resume_path, parsed_args.backend) == DOCX_EXTRACTION_BACKEND:
+            parse_converted_resume(resume_path, resume_path, parsed_args.targetDirectory, DOCX_EXTRACTION_BACKEND,
+                                   parsed_args.streaming, parsed_args.skipTrailingPages, parsed_args.bundle,
+                                   parsed_args.bundleWorkers)
+    resume_paths = [resume_path for resume_path in resume_paths
+                    if get_extraction_backend_of_resume(resume_path, parsed_args.backend) != DOCX_EXTRACTION_BACKEND]
+
+    if parsed_args.backend in PDF_EXTRACTION_BACKENDS:
+        for resume_path in resume_paths:
+            parse_converted_resume(resume_path, resume_path, parsed_args.targetDirectory, parsed_args.backend,
+                                   parsed_args.streaming, parsed_args.skipTrailingPages, parsed_args.bundle,
+                                   parsed_args.bundleWorkers)
+        return
+
+    # Convert the resumes concurrently and parse each of them as soon as its conversion finished.
+    conversion_cache = None
+    if parsed_args.cacheDirectory is not None:
+        cache_size = None if parsed_args.cacheSize is None else parsed_args.cacheSize * 1024 * 1024
+        conversion_cache = ConversionCache(parsed_args.cacheDirectory, cache_size, parsed_args.compressCache)
+    conversion_pool = PdfToHtmlConversionPool(parsed_args.conversionWorkers, cache=conversion_cache,
+                                              profile=parsed_args.conversionProfile)
+    for conversion_result in conversion_pool.iterate_conversions(resume_paths):
+        if conversion_result.html_path is None:
+            print('The file ' + conversion_result.pdf_path + " can't be converted to html. Sorry.")
+            continue
+        try:
+            parse_converted_resume(conversion_result.pdf_path, conversion_result.html_path,
+                                   parsed_args.targetDirectory, parsed_args.backend, parsed_args.streaming,
+                                   parsed_args.skipTrailingPages, parsed_args.bundle, parsed_args.bundleWorkers)
+        finally:
+            if conversion_cache is not None:
+                conversion_cache.release(conversion_result.html_path)
+
+
+def find_resumes_in_directory(input_directory):
+    """Returns the paths of the pdf and docx resumes found in the input directory."""
+
+    resume_paths = []
+    for root, dirs, files in os.walk(input_directory):
         if files.__len__() == 0:
             print("The directory doesn't contain any files!")
-            return
+            return resume_paths
 
         for filename in files:
-            if filename.endswith(".pdf") or filename.endswith(".PDF"):
-                file_path = os.path.join(root, filename)
-                parse_resume(file_path, parsed_args.targetDirectory)
-
-
-def parse_resume(resume_path, target_dir):
-    """Parses the resume provided in resume_path and puts the output in target_dir"""
-
-    renamed_resume_path = remove_blanks_from_filename(resume_path)
-    os.rename(resume_path, renamed_resume_path)
-
-    print("Processing: " + renamed_resume_path)
-    html_resume_path = convert_pdf_to_html(renamed_resume_path)
-    if html_resume_path is not None:
-        json_data = extract_information_into_json(html_resume_path)
-        filename = os.path.split(renamed_resume_path)[1]
-        if target_dir is None:
-            target_dir = os.path.split(renamed_resume_path)[0]
-        output_path = os.path.join(target_dir, os.path.splitext(filename)[0] + ".json")
-        with open(output_path, 'w') as outfile:
-            outfile.write(json_data + '\n')
-
-
-def remove_blanks_from_filename(file_path):
-    new_name = file_path.replace(" ", "_")
-    return new_name
+            if os.path.splitext(filename)[1].lower() in (".pdf", ".docx"):
+                resume_paths.append(os.path.join(root, filename))
+    return resume_paths
+
+
+def parse_resume(resume_path, target_dir, backend='selenium', cache=None, profile=DEFAULT_PDF_TO_HTML_PROFILE):
+    """Parses the resume provided in resume_path and puts the output in target_dir. The converted html is taken from
+    the ConversionCache, if one is given. profile is the name of the conversion profile (see PDF_TO_HTML_PROFILES).
+    The resume file itself is never modified (see parse_resume_data for parsing resumes without files). Word (.docx)
+    resumes are read directly by the DOCX_EXTRACTION_BACKEND."""
+
+    backend = get_extraction_backend_of_resume(resume_path, backend)
+    if backend in PDF_EXTRACTION_BACKENDS or backend == DOCX_EXTRACTION_BACKEND:
+        converted_resume_path = resume_path
+    else:
+        converted_resume_path = convert_pdf_to_html(resume_path, cache, profile)
+    if converted_resume_path is None:
+        return
+    try:
+        parse_converted_resume(resume_path, converted_resume_path, target_dir, backend)
+    finally:
+        if cache is not None and converted_resume_path != resume_path:
+            cache.release(converted_resume_path)
+
+
+def parse_converted_resume(resume_path, converted_resume_path, target_dir, backend, streaming=False,
+                           skip_trailing_pages=False, bundle=False, bundle_workers=None):
+    """Extracts the information from the converted resume (see extract_information_into_json) and writes it into
+    a json file, named after the resume, in target_dir (by default next to the resume). If bundle is set, the resume
+    is split into the resumes it contains, which are parsed in bundle_workers processes (see
+    extract_bundled_information_into_json)."""
+
+    print("Processing: " + resume_path)
+    if bundle:
+        json_data = extract_bundled_information_into_json(converted_resume_path, backend, bundle_workers)
+    else:
+        json_data = extract_information_into_json(converted_resume_path, backend, streaming, skip_trailing_pages)
+    filename = os.path.split(resume_path)[1]
+    if target_dir is None:
+        target_dir = os.path.split(resume_path)[0]
+    output_path = os.path.join(target_dir, os.path.splitext(filename)[0] + ".json")
+    with open(output_path, 'w') as outfile:
+        outfile.write(json_data + '\n')
 
 
 if __name__ == "__main__":
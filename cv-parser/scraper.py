@@ -1,56 +1,468 @@
+import atexit
 import os
+import pathlib
+import queue
+import shutil
 import subprocess
+import tempfile
+import threading
+import weakref
+from contextlib import contextmanager
 
+import psutil
 from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
 
 
 class Scraper:
     """WebDriver used for opening, rendering, and scraping HTML files."""
 
-    def __init__(self):
+    def __init__(self, headless=True):
         chromedriver = os.path.dirname(os.path.abspath(__file__)) + "/webdriver/chromedriver"
         os.environ["webdriver.chrome.driver"] = chromedriver
-        self.browser = webdriver.Chrome(chromedriver)
+        options = webdriver.ChromeOptions()
+        if headless:
+            options.add_argument("--headless")
+            options.add_argument("--disable-gpu")
+        self.browser = webdriver.Chrome(chromedriver, chrome_options=options)
         self.browser.set_window_position(-100000, 0)  # move browser window out of screen
+        self.number_of_processed_resumes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Quits the browser, including the chromedriver and every Chrome process started by it."""
+        self.browser.quit()
+
+    def get_memory_usage(self):
+        """Returns the resident memory (in bytes) used by the chromedriver and the Chrome processes started by it."""
+        try:
+            driver_process = psutil.Process(self.browser.service.process.pid)
+            processes = [driver_process] + driver_process.children(recursive=True)
+        except psutil.Error:
+            return 0
+
+        memory_usage = 0
+        for process in processes:
+            try:
+                memory_usage += process.memory_info().rss
+            except psutil.Error:
+                # The process exited in the meantime.
+                pass
+        return memory_usage
+
+
+class ScraperPool:
+    """Pool of long-lived headless browsers. A browser is checked out for scraping a resume and returned afterwards,
+    so that the browser start-up is only paid once for many resumes. A browser is recycled (quit and replaced by a new
+    one when needed) after it has processed max_resumes_per_browser resumes, or when its memory usage exceeds
+    max_memory_per_browser bytes. The pool quits every browser when the interpreter exits."""
+
+    def __init__(self, size=1, max_resumes_per_browser=200, max_memory_per_browser=1024 * 1024 * 1024):
+        self.size = size
+        self.max_resumes_per_browser = max_resumes_per_browser
+        self.max_memory_per_browser = max_memory_per_browser
+        self.idle_scrapers = queue.LifoQueue()
+        self.available_slots = threading.BoundedSemaphore(size)
+        self.lock = threading.Lock()
+        self.closed = False
+        open_scraper_pools.add(self)
+
+    def __enter__(self):
+        return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.browser.close()
+        self.close()
+
+    def acquire(self):
+        """Checks out a browser from the pool. Blocks until a browser is available, if all of them are in use."""
+        if self.closed:
+            raise RuntimeError("The scraper pool has already been closed.")
+        self.available_slots.acquire()
+        try:
+            return self.idle_scrapers.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            return Scraper()
+        except Exception:
+            self.available_slots.release()
+            raise
+
+    def release(self, scraper, discard=False):
+        """Returns the browser to the pool. The browser is quit instead, if discard is set (e.g. the browser crashed),
+        if it should be recycled, or if the pool has been closed in the meantime."""
+        scraper.number_of_processed_resumes += 1
+        # The memory usage is queried (and the browser is quit) without holding the lock.
+        discard = discard or self.scraper_needs_recycling(scraper)
+        with self.lock:
+            discard = discard or self.closed
+            if not discard:
+                self.idle_scrapers.put(scraper)
+        if discard:
+            scraper.close()
+        self.available_slots.release()
+
+    @contextmanager
+    def scraper(self):
+        """Context manager that checks out a browser and returns it to the pool at the end of the block."""
+        scraper = self.acquire()
+        discard = False
+        try:
+            yield scraper
+        except WebDriverException:
+            # The browser might have crashed, don't hand it out again.
+            discard = True
+            raise
+        finally:
+            self.release(scraper, discard)
+
+    def scraper_needs_recycling(self, scraper):
+        """Returns true, if the browser reached its resume or memory limit."""
+        return scraper.number_of_processed_resumes >= self.max_resumes_per_browser or \
+               scraper.get_memory_usage() > self.max_memory_per_browser
+
+    def close(self):
+        """Quits the idle browsers. Browsers that are checked out at the moment are quit when they are returned."""
+        open_scraper_pools.discard(self)
+        with self.lock:
+            self.closed = True
+            while True:
+                try:
+                    scraper = self.idle_scrapers.get_nowait()
+                except queue.Empty:
+                    break
+                try:
+                    scraper.close()
+                except Exception:
+                    # The browser is already gone, there is nothing left to clean up.
+                    pass
+
+
+# The pools, that are not closed yet. They are closed when the interpreter exits.
+open_scraper_pools = weakref.WeakSet()
+
+
+def close_open_scraper_pools():
+    """Closes every pool, that is not closed yet."""
+    for scraper_pool in list(open_scraper_pools):
+        scraper_pool.close()
+
+
+atexit.register(close_open_scraper_pools)
+
+
+# Pool used by convert_html_resume_to_object, unless another pool is passed to it.
+default_scraper_pool = None
 
 
-def convert_pdf_to_html(file_path):
+def get_default_scraper_pool():
+    """Returns the process-wide scraper pool, and creates it on the first call."""
+    global default_scraper_pool
+    if default_scraper_pool is None:
+        default_scraper_pool = ScraperPool()
+    return default_scraper_pool
+
+
+def configure_default_scraper_pool(size=1, max_resumes_per_browser=200, max_memory_per_browser=1024 * 1024 * 1024):
+    """Replaces the process-wide scraper pool with a pool of the given settings. The old pool is closed."""
+    global default_scraper_pool
+    if default_scraper_pool is not None:
+        default_scraper_pool.close()
+    default_scraper_pool = ScraperPool(size, max_resumes_per_browser, max_memory_per_browser)
+    return default_scraper_pool
+
+
+# Named sets of pdf2htmlEX arguments (conversion profiles). The parser only uses the text layer of the html (the text
+# lines with their position and style), hence the default "text" profile doesn't render the background images
+# (graphics, non-text elements), the outline and the printing styles, and doesn't embed the fonts (most of the size of
+# the html). This makes the html much smaller and faster to load. pdf2htmlEX writes the fonts into separate files next
+# to the html, hence every conversion writes into its own directory (see create_conversion_output_dir). "text-split"
+# writes each page into its own file next to a small index html, the pages are parsed only when they are needed (see
+# iterate_static_html_resume_pages), hence it can only be read by the static backend. The "full" profile keeps the
+# visual fidelity of the pdf.
+PDF_TO_HTML_PROFILES = {
+    'text': ["--optimize-text", "1", "--embed-font", "0",
+             "--process-nontext", "0", "--process-outline", "0", "--printing", "0"],
+    'text-split': ["--optimize-text", "1", "--embed-font", "0",
+                   "--process-nontext", "0", "--process-outline", "0", "--printing", "0", "--split-pages", "1"],
+    'full': ["--optimize-text", "1"]
+}
+DEFAULT_PDF_TO_HTML_PROFILE = 'text'
+
+# Profiles generating one file per page.
+SPLIT_PAGE_PDF_TO_HTML_PROFILES = {'text-split'}
+
+
+def convert_pdf_to_html(file_path, cache=None, profile=DEFAULT_PDF_TO_HTML_PROFILE):
     """"Converts the file to HTML to PDF and returns the path.
-    The returned value is None if the file could not be converted."""
+    The returned value is None if the file could not be converted. The html is generated into the directory of the
+    conversion profile next to the pdf (see get_conversion_dir), and reused by the next conversions with the profile.
+    If a ConversionCache is given, the html is taken from (or generated into) the cache instead. profile is the name
+    of the conversion profile (see PDF_TO_HTML_PROFILES)."""
+
+    if cache is not None:
+        return convert_pdf_to_html_with_cache(file_path, cache, profile)
 
-    path_of_generated_html = os.path.splitext(file_path)[0] + ".html"
-    directory_of_file = os.path.dirname(os.path.abspath(path_of_generated_html))
+    path_of_generated_html = get_path_of_generated_html(file_path, profile)
     if not os.path.exists(path_of_generated_html):
-        if execute_pdf_to_html_process(file_path, directory_of_file) is not 0:
+        output_dir = create_conversion_output_dir(file_path, profile)
+        if execute_pdf_to_html_process(file_path, output_dir, profile) != 0:
+            shutil.rmtree(output_dir, ignore_errors=True)
             print('The file ' + file_path + " can't be converted to html. Sorry.")
             return None
+        move_conversion_output(output_dir, file_path, profile)
     return path_of_generated_html
 
 
-def execute_pdf_to_html_process(filename, destination_dir=None):
+def convert_pdf_to_html_with_cache(file_path, cache, profile=DEFAULT_PDF_TO_HTML_PROFILE):
+    """Returns the path of the cached html of the pdf file. If the pdf (with the settings of the conversion profile)
+    is not in the cache yet, it is converted and stored in the cache first. Returns None if the file could not be
+    converted. The cache entry isn't evicted until the html is released (see ConversionCache.release)."""
+
+    key = cache.get_key(file_path, PDF_TO_HTML_PROFILES[profile])
+    path_of_cached_html = cache.lookup(key)
+    if path_of_cached_html is not None:
+        return path_of_cached_html
+
+    conversion, converting = cache.start_conversion(key)
+    if not converting:
+        # The same pdf is being converted by another thread, wait for its result.
+        process_status_code = conversion.result()[0]
+    else:
+        process_status_code = None
+        try:
+            process_status_code = convert_pdf_to_html_into_cache(file_path, key, cache, profile)
+        finally:
+            cache.finish_conversion(key, process_status_code)
+    if process_status_code != 0:
+        print('The file ' + file_path + " can't be converted to html. Sorry.")
+        return None
+    return cache.lookup(key)
+
+
+def convert_pdf_to_html_into_cache(file_path, key, cache, profile=DEFAULT_PDF_TO_HTML_PROFILE):
+    """Converts the pdf file into the cache entry of the key (unless it was stored in the meantime) and returns the
+    status code of pdf2htmlEX."""
+
+    if cache.load_metadata(key) is not None:
+        return 0
+    output_dir = cache.create_output_dir()
+    process_status_code = execute_pdf_to_html_process(file_path, output_dir, profile)
+    if process_status_code != 0:
+        shutil.rmtree(output_dir, ignore_errors=True)
+        return process_status_code
+    cache.store(key, output_dir, os.path.basename(get_path_of_generated_html(file_path)),
+                get_conversion_metadata(file_path, profile))
+    return process_status_code
+
+
+def get_conversion_metadata(file_path, profile):
+    """Returns the information stored with the cached conversion of the file: the name of the pdf and the conversion
+    profile used (its name and pdf2htmlEX arguments)."""
+    return {'source': os.path.basename(file_path), 'profile': profile, 'settings': PDF_TO_HTML_PROFILES[profile]}
+
+
+def get_path_of_generated_html(file_path, profile=DEFAULT_PDF_TO_HTML_PROFILE):
+    """Returns the path of the html file that pdf2htmlEX generates for the pdf file (see get_conversion_dir)."""
+    html_filename = os.path.basename(os.path.splitext(file_path)[0]) + ".html"
+    return os.path.join(get_conversion_dir(file_path, profile), html_filename)
+
+
+def get_conversion_dir(file_path, profile=DEFAULT_PDF_TO_HTML_PROFILE):
+    """Returns the directory next to the pdf file, that holds the html and the font files generated with the
+    conversion profile. Each profile has its own directory, hence an html is only reused for the same profile."""
+    return os.path.splitext(file_path)[0] + "_" + profile + "_html"
+
+
+def create_conversion_output_dir(file_path, profile=DEFAULT_PDF_TO_HTML_PROFILE):
+    """Returns a new, empty directory next to the pdf file for a single conversion, so that concurrent conversions
+    don't overwrite each other's files. The output is moved into place with move_conversion_output."""
+    return tempfile.mkdtemp(prefix=".converting-", dir=os.path.dirname(os.path.abspath(file_path)))
+
+
+def move_conversion_output(output_dir, file_path, profile=DEFAULT_PDF_TO_HTML_PROFILE):
+    """Renames the output directory of a conversion (see create_conversion_output_dir) to the conversion directory of
+    the profile. The rename is atomic, hence readers never see a half-written html."""
+    try:
+        os.rename(output_dir, get_conversion_dir(file_path, profile))
+    except OSError:
+        # The same pdf was converted in the meantime.
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+
+def execute_pdf_to_html_process(filename, destination_dir=None, profile=DEFAULT_PDF_TO_HTML_PROFILE):
     """Converts the PDF file specified by filename to PDF file, by calling the pdf2htmlEX
-    in a separate 'terminal process'. Optionally puts it in the destination_dir. If destination_dir
+    in a separate process. Optionally puts it in the destination_dir. If destination_dir
      is empty, the execution folder is used, i.e. the folder in which the pdf was found."""
 
-    if destination_dir is None:
-        destination_dir = os.path.dirname(filename)
-        command = "pdf2htmlEX --dest-dir " + destination_dir + " --optimize-text 1 " + filename
-    else:
-        command = "pdf2htmlEX --dest-dir " + destination_dir + " --optimize-text 1 " + filename
-    process_status_code = subprocess.call(command, shell=True)
+    try:
+        process_status_code = subprocess.call(build_pdf_to_html_command(filename, destination_dir, profile))
+    except OSError:
+        # pdf2htmlEX can't be started, report the status code the shell returns for a missing command.
+        process_status_code = 127
     return process_status_code
 
 
-def convert_html_resume_to_object(path_to_html):
+def build_pdf_to_html_command(filename, destination_dir=None, profile=DEFAULT_PDF_TO_HTML_PROFILE):
+    """Returns the argument list of the pdf2htmlEX call converting filename into destination_dir (by default the
+    folder in which the pdf was found) with the given conversion profile. The arguments are passed without a shell,
+    hence the file names don't have to be escaped."""
+
+    if destination_dir is None:
+        destination_dir = os.path.dirname(filename) or "."
+    return ["pdf2htmlEX", "--dest-dir", destination_dir] + PDF_TO_HTML_PROFILES[profile] + [filename]
+
+
+def convert_html_resume_to_object(path_to_html, scraper_pool=None):
     """Parses the html resume line by line into a list of "line dictionaries".
     For each line the font-type, font-size, left-margin, font-color, page-number
-    and text are extracted and stored in a dict. At the end the list of dictionaries is returned."""
+    and text are extracted and stored in a dict. At the end the list of dictionaries is returned.
+    The browser is checked out from scraper_pool (by default from the process-wide pool)."""
+
+    if scraper_pool is None:
+        scraper_pool = get_default_scraper_pool()
+    with scraper_pool.scraper() as scraper:
+        return scrape_html_resume(scraper, path_to_html)
+
+
+def iterate_html_resume_lines(path_to_html, scraper_pool=None):
+    """Generator version of convert_html_resume_to_object: yields the "line dictionaries" page by page, as soon as
+    a page has been scraped. The browser stays checked out until the generator is exhausted or closed."""
+
+    if scraper_pool is None:
+        scraper_pool = get_default_scraper_pool()
+    with scraper_pool.scraper() as scraper:
+        for page_lines in iterate_scraped_html_resume_pages(scraper, path_to_html):
+            for line_props in page_lines:
+                yield line_props
+
+
+# Functions formatting the values the same way, as WebDriver returns them for value_of_css_property and element.text:
+# colors are converted to rgba(), the text of each line is trimmed (except for non-breaking spaces, which are
+# converted to normal spaces).
+LINE_FORMATTING_SCRIPT = r"""
+var toRgba = function (color) {
+    var match = /^rgb\((.*)\)$/.exec(color);
+    return match ? 'rgba(' + match[1] + ', 1)' : color;
+};
+var visibleText = function (element) {
+    return element.innerText.split('\n').map(function (line) {
+        return line.replace(/^[^\S\xa0]+|[^\S\xa0]+$/g, '');
+    }).join('\n').replace(/\xa0/g, ' ');
+};
+"""
+
+# Scrolls to the page (passed as arguments[0]) and returns the computed properties of each of its lines in a single
+# WebDriver round-trip.
+PAGE_LINE_PROPERTIES_SCRIPT = LINE_FORMATTING_SCRIPT + r"""
+var page = arguments[0];
+page.scrollIntoView();
+var lines = page.getElementsByClassName('t');
+var properties = [];
+for (var i = 0; i < lines.length; i++) {
+    var style = window.getComputedStyle(lines[i]);
+    properties.push([style.fontSize, style.fontFamily, style.left, toRgba(style.color), style.bottom,
+                     visibleText(lines[i])]);
+}
+return {'page_number': page.getAttribute('data-page-no'), 'lines': properties};
+"""
+
+
+# First phase of the two-phase scraping: returns the page number and the text of every line of the resume in a single
+# WebDriver round-trip, without computing their styles.
+LINE_TEXTS_SCRIPT = LINE_FORMATTING_SCRIPT + r"""
+var texts = [];
+var pages = document.getElementById('page-container').getElementsByClassName('pf');
+for (var i = 0; i < pages.length; i++) {
+    pages[i].scrollIntoView();
+    var lines = pages[i].getElementsByClassName('t');
+    for (var j = 0; j < lines.length; j++) {
+        texts.push([pages[i].getAttribute('data-page-no'), visibleText(lines[j])]);
+    }
+}
+return texts;
+"""
+
+# Second phase of the two-phase scraping: returns the computed style of the lines given by their indexes (in the order
+# of LINE_TEXTS_SCRIPT, passed as arguments[0]) in a single WebDriver round-trip.
+LINE_STYLES_SCRIPT = LINE_FORMATTING_SCRIPT + r"""
+var lines = document.getElementById('page-container').querySelectorAll('.pf .t');
+return arguments[0].map(function (index) {
+    var style = window.getComputedStyle(lines[index]);
+    return [style.fontSize, style.fontFamily, style.left, toRgba(style.color), style.bottom];
+});
+"""
+
+
+@contextmanager
+def open_html_resume_for_two_phase_scraping(path_to_html, scraper_pool=None):
+    """Opens the html resume in a browser checked out from scraper_pool (by default from the process-wide pool),
+    and scrapes the texts of the lines only. Yields the list of (page_number, text) pairs of the lines and a function,
+    that fetches the styles of the lines given by their indexes (see LineTable.from_texts). The browser stays checked
+    out and the resume open, until the context is left."""
 
-    scraper = Scraper()
-    url_to_file = "file:///" + path_to_html
+    if scraper_pool is None:
+        scraper_pool = get_default_scraper_pool()
+    with scraper_pool.scraper() as scraper:
+        url_to_file = get_file_url(path_to_html)
+        scraper.browser.get(url_to_file)
+        line_texts = scraper.browser.execute_script(LINE_TEXTS_SCRIPT)
+
+        def fetch_line_styles(line_indexes):
+            return scraper.browser.execute_script(LINE_STYLES_SCRIPT, line_indexes)
+
+        yield line_texts, fetch_line_styles
+
+
+def get_file_url(path):
+    """Returns the file:// url of the path, opened by the browser (special characters like blanks are escaped)."""
+    return pathlib.Path(os.path.abspath(path)).as_uri()
+
+
+def scrape_html_resume(scraper, path_to_html):
+    """Opens the html resume in the browser of the scraper and extracts the "line dictionaries" from it.
+    The properties of the lines are fetched with one script execution per page, instead of asking the browser
+    for every property of every line separately (see scrape_html_resume_line_by_line)."""
+
+    resume_lines = []
+    for page_lines in iterate_scraped_html_resume_pages(scraper, path_to_html):
+        resume_lines.extend(page_lines)
+    return resume_lines
+
+
+def iterate_scraped_html_resume_pages(scraper, path_to_html):
+    """Opens the html resume in the browser of the scraper and yields the list of "line dictionaries" of each page."""
+
+    url_to_file = get_file_url(path_to_html)
+    scraper.browser.get(url_to_file)
+
+    page_container = scraper.browser.find_element_by_id("page-container")
+    for page in page_container.find_elements_by_class_name("pf"):
+        page_properties = scraper.browser.execute_script(PAGE_LINE_PROPERTIES_SCRIPT, page)
+        page_lines = []
+        for font_size, font_family, left_margin, font_color, bottom_margin, text in page_properties['lines']:
+            page_lines.append({
+                'font_size': font_size,
+                'font_family': font_family,
+                'left_margin': correct_left_margin(left_margin, text),
+                'font_color': font_color,
+                'bottom_margin': bottom_margin,
+                'line_text': text,
+                'page_number': page_properties['page_number']
+            })
+        yield page_lines
+
+
+def scrape_html_resume_line_by_line(scraper, path_to_html):
+    """Same as scrape_html_resume, but queries each property of each line with a separate WebDriver command.
+    Kept as a reference for performanceTester/scraping_benchmark.py."""
+
+    url_to_file = get_file_url(path_to_html)
     scraper.browser.get(url_to_file)
 
     resume_lines = []
@@ -102,8 +514,14 @@ def get_corrected_left_margin(line):
     The function looks into such cases and increases the left margin value for such lines. The amount is not relevant,
     only the fact, that it has significantly higher left-margin, hence the multiplication with 5"""
 
-    left_margin_value = line.value_of_css_property("left")
-    text = line.text
+    return correct_left_margin(line.value_of_css_property("left"), line.text)
+
+
+def correct_left_margin(left_margin_value, text):
+    """Applies the left margin correction described in get_corrected_left_margin to an already extracted
+    left margin value (e.g. '95.5px') and the text of the line. Used by the extraction backends that don't
+    operate on WebDriver elements."""
+
     if text[:5].strip() == "":
         left_margin_value = float(left_margin_value[:-2]) # Remove the px post-script
         left_margin_value *= 5
@@ -0,0 +1,238 @@
+import os
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from lxml import html
+
+from .scraper import correct_left_margin
+
+
+# pdf2htmlEX writes every visual property of a text line (.t element) as a short CSS class. The prefix of the class
+# tells which property it holds, e.g.: .fs3{font-size:48.000000px;} or .x1a{left:95.500000px;}
+CLASS_PREFIX_TO_CSS_PROPERTY = {
+    'fs': 'font-size',
+    'ff': 'font-family',
+    'fc': 'color',
+    'x': 'left',
+    'y': 'bottom'
+}
+
+# Values returned for a property whose class is missing from the stylesheet.
+DEFAULT_CSS_PROPERTY_VALUES = {
+    'font-size': '16px',
+    'font-family': '',
+    'color': 'rgba(0, 0, 0, 1)',
+    'left': '0px',
+    'bottom': '0px'
+}
+
+# Number of split pages (see iterate_static_html_resume_pages) parsed at the same time by default.
+DEFAULT_PAGE_WORKERS = min(4, os.cpu_count() or 1)
+
+css_class_rule_regex = re.compile(r'\.(fs|ff|fc|x|y)([0-9a-f]+)\s*\{([^{}]*)\}')
+media_print_regex = re.compile(r'@media\s+print\s*\{')
+rgb_color_regex = re.compile(r'rgba?\(([^)]*)\)')
+
+
+def convert_static_html_resume_to_object(path_to_html):
+    """Parses the html resume (generated by pdf2htmlEX) into a list of "line dictionaries" without starting a browser.
+    Instead of asking the browser for the computed style of each line, the CSS classes written by pdf2htmlEX are
+    resolved using the stylesheet of the document. The returned list is the same as the one returned by
+    convert_html_resume_to_object."""
+
+    return list(iterate_static_html_resume_lines(path_to_html))
+
+
+def iterate_static_html_resume_lines(path_to_html, max_workers=DEFAULT_PAGE_WORKERS):
+    """Generator version of convert_static_html_resume_to_object, yielding the "line dictionaries" page by page."""
+
+    for page_lines in iterate_static_html_resume_pages(path_to_html, max_workers):
+        for line_props in page_lines:
+            yield line_props
+
+
+def iterate_static_html_resume_pages(path_to_html, max_workers=DEFAULT_PAGE_WORKERS):
+    """Generator yielding the list of "line dictionaries" of each page of the html resume. The html may also be the
+    index file of a conversion with split pages (pdf2htmlEX --split-pages 1), where the page elements only refer to
+    the files of the pages (data-page-url). These files are parsed only when their page is requested, and at most
+    max_workers of them are parsed ahead in parallel, so that stopping the generator early skips the trailing
+    pages."""
+
+    base_dir = os.path.dirname(os.path.abspath(path_to_html))
+    document = html.parse(path_to_html).getroot()
+    css_classes = load_pdf2htmlex_css_classes(document, base_dir)
+
+    page_container = document.get_element_by_id("page-container")
+    pages = find_elements_by_class_name(page_container, "pf")
+    if not any(page.get("data-page-url") for page in pages):
+        for page in pages:
+            yield get_static_page_lines(page, page.get("data-page-no"), css_classes)
+        return
+
+    with ThreadPoolExecutor(max_workers=max_workers or 1) as executor:
+        parsed_pages = deque()
+        remaining_pages = iter(pages)
+        try:
+            while True:
+                # Keep max_workers pages parsing in the background, while the caller processes the current one.
+                for page in remaining_pages:
+                    parsed_pages.append(executor.submit(parse_split_page, page, base_dir, css_classes))
+                    if len(parsed_pages) >= (max_workers or 1):
+                        break
+                if not parsed_pages:
+                    return
+                yield parsed_pages.popleft().result()
+        finally:
+            for parsed_page in parsed_pages:
+                parsed_page.cancel()
+
+
+def parse_split_page(page, base_dir, css_classes):
+    """Returns the "line dictionaries" of the page element of a split conversion. The content of the page is read from
+    its own file, if the page element only refers to it."""
+
+    page_url = page.get("data-page-url")
+    if page_url and not find_elements_by_class_name(page, "t"):
+        page_document = html.parse(os.path.join(base_dir, page_url)).getroot()
+        return get_static_page_lines(page_document, page.get("data-page-no"), css_classes)
+    return get_static_page_lines(page, page.get("data-page-no"), css_classes)
+
+
+def get_static_page_lines(page, page_number, css_classes):
+    """Returns the "line dictionaries" of the text lines (.t elements) in the page element."""
+    page_lines = []
+    for line in find_elements_by_class_name(page, "t"):
+        line_props = get_static_line_properties(line, css_classes)
+        line_props['page_number'] = page_number
+        page_lines.append(line_props)
+    return page_lines
+
+
+def find_elements_by_class_name(element, class_name):
+    """Returns the descendants of the lxml element that have the given class, in document order."""
+    return element.xpath(".//*[contains(concat(' ', normalize-space(@class), ' '), ' " + class_name + " ')]")
+
+
+def get_static_line_properties(line, css_classes):
+    """Static counterpart of get_line_properties: puts the details of the html (line) element into a dictionary,
+    by looking up its pdf2htmlEX classes in css_classes."""
+
+    properties = dict(DEFAULT_CSS_PROPERTY_VALUES)
+    for class_name in line.get("class", "").split():
+        if class_name in css_classes:
+            css_property, value = css_classes[class_name]
+            properties[css_property] = value
+
+    text = get_visible_text(line)
+    return {
+        'font_size': properties['font-size'],
+        'font_family': properties['font-family'],
+        'left_margin': correct_left_margin(properties['left'], text),
+        'font_color': properties['color'],
+        'bottom_margin': properties['bottom'],
+        'line_text': text,
+        'page_number': 0
+    }
+
+
+def get_visible_text(element):
+    """Returns the text of the element the way WebDriver's element.text does for pdf2htmlEX lines: each line is
+    trimmed, but non-breaking spaces are kept (and converted to normal spaces). This matters for
+    get_corrected_left_margin, which looks for leading blanks."""
+
+    text = element.text_content()
+    lines = [trim_excluding_non_breaking_spaces(line) for line in text.split('\n')]
+    return '\n'.join(lines).replace('\xa0', ' ')
+
+
+def trim_excluding_non_breaking_spaces(text):
+    """Strips white-spaces from both ends of the text, except for non-breaking spaces."""
+    return re.sub(r'^[^\S\xa0]+|[^\S\xa0]+$', '', text)
+
+
+def load_pdf2htmlex_css_classes(document, base_dir):
+    """Collects the stylesheet of the document (embedded <style> elements and linked local css files) and returns
+    a dictionary, where the key is the pdf2htmlEX class name (e.g. fs3) and the value is a tuple of the css property
+    and its value, formatted the same way, as the browser returns the computed value (e.g. ('font-size', '48px'))."""
+
+    css_classes = {}
+    for stylesheet in get_stylesheets(document, base_dir):
+        stylesheet = remove_media_print_rules(stylesheet)
+        for prefix, class_id, declarations in css_class_rule_regex.findall(stylesheet):
+            css_property = CLASS_PREFIX_TO_CSS_PROPERTY[prefix]
+            value = find_declaration_value(declarations, css_property)
+            if value is not None:
+                css_classes[prefix + class_id] = (css_property, format_computed_value(css_property, value))
+    return css_classes
+
+
+def get_stylesheets(document, base_dir):
+    """Returns the text of the stylesheets of the document in the order they are applied."""
+    stylesheets = []
+    for element in document.xpath("//style | //link[@rel='stylesheet']"):
+        if element.tag == 'style':
+            stylesheets.append(element.text or "")
+        else:
+            css_path = os.path.join(base_dir, element.get("href", ""))
+            if os.path.isfile(css_path):
+                with open(css_path, encoding="utf-8") as css_file:
+                    stylesheets.append(css_file.read())
+    return stylesheets
+
+
+def remove_media_print_rules(stylesheet):
+    """Removes the @media print{...} blocks from the stylesheet. pdf2htmlEX repeats the position classes there in
+    points, and these must not override the values used on screen."""
+
+    match = media_print_regex.search(stylesheet)
+    while match:
+        depth = 1
+        index = match.end()
+        while index < len(stylesheet) and depth > 0:
+            if stylesheet[index] == '{':
+                depth += 1
+            elif stylesheet[index] == '}':
+                depth -= 1
+            index += 1
+        stylesheet = stylesheet[:match.start()] + stylesheet[index:]
+        match = media_print_regex.search(stylesheet)
+    return stylesheet
+
+
+def find_declaration_value(declarations, css_property):
+    """Returns the value of the css property in a declaration block (e.g. 'font-size:48.000000px;line-height:1'),
+    or None, if the property is not declared."""
+    for declaration in declarations.split(';'):
+        name, separator, value = declaration.partition(':')
+        if separator and name.strip() == css_property:
+            return value.strip()
+    return None
+
+
+def format_computed_value(css_property, value):
+    """Formats the declared css value the way the browser reports the computed value."""
+    if css_property == 'color':
+        return format_css_color(value)
+    if value.endswith('px'):
+        return format_css_pixel_value(float(value[:-2]))
+    return value
+
+
+def format_css_pixel_value(value):
+    """Formats a pixel value the way Chrome serializes computed lengths (at most 6 significant digits, no trailing
+    zeros). E.g.: 48.000000 -> '48px', 12.480000 -> '12.48px'"""
+    return '{:.6g}px'.format(value)
+
+
+def format_css_color(value):
+    """Formats a css color the way WebDriver returns it (e.g.: rgb(0,0,0) -> 'rgba(0, 0, 0, 1)')."""
+    if value == 'transparent':
+        return 'rgba(0, 0, 0, 0)'
+    match = rgb_color_regex.fullmatch(value)
+    if match is None:
+        return value
+    components = [component.strip() for component in match.group(1).split(',')]
+    if len(components) == 3:
+        components.append('1')
+    return 'rgba(' + ', '.join(components) + ')'
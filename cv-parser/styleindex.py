@@ -0,0 +1,55 @@
+import math
+from collections import defaultdict, namedtuple
+
+
+# Widths (in pixels) of the buckets, that font sizes and left margins are quantized into, so that near-identical
+# values (e.g. 12.48px and 12.5px) are treated as the same.
+QUANTIZATION_BUCKETS = {
+    'font_size': 0.5,
+    'left_margin': 1.0
+}
+
+# The visual properties, that the section keywords are recognized by, quantized.
+StyleSignature = namedtuple('StyleSignature', ['font_size', 'font_family', 'left_margin', 'font_color'])
+
+
+def quantize_visual_property(visual_property, value):
+    """Rounds a font size or a left margin to the middle of its bucket (see QUANTIZATION_BUCKETS). Other properties
+    (and unknown values) are returned unchanged."""
+    bucket = QUANTIZATION_BUCKETS.get(visual_property)
+    if bucket is None or value is None:
+        return value
+    return math.floor(value / bucket + 0.5) * bucket
+
+
+def get_style_signature(line):
+    """Returns the StyleSignature of the line."""
+    return StyleSignature(*(quantize_visual_property(visual_property, getattr(line, visual_property))
+                            for visual_property in StyleSignature._fields))
+
+
+class StyleIndex:
+    """Lines of a resume grouped by their StyleSignature, so that the lines having a given style are found with a
+    lookup, instead of comparing the properties of each line one by one. Lines without a loaded style are left out."""
+
+    def __init__(self, lines):
+        self.lines_of_signature = defaultdict(set)
+        for line in lines:
+            if line.has_style:
+                self.lines_of_signature[get_style_signature(line)].add(line.line_index)
+
+    def find_lines(self, style):
+        """Returns the set of the line indexes, whose quantized style matches the visual properties (dictionary, e.g.
+        the deduced style of the section keywords). Properties missing from the dictionary match any value."""
+        required_values = [(position, quantize_visual_property(visual_property, style[visual_property]))
+                           for position, visual_property in enumerate(StyleSignature._fields)
+                           if visual_property in style]
+        if len(required_values) == len(StyleSignature._fields):
+            return set(self.lines_of_signature.get(StyleSignature(*(value for position, value in required_values)),
+                                                   ()))
+
+        line_indexes = set()
+        for signature, lines_of_signature in self.lines_of_signature.items():
+            if all(signature[position] == value for position, value in required_values):
+                line_indexes |= lines_of_signature
+        return line_indexes
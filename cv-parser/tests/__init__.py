@@ -0,0 +1,13 @@
+def create_line_dictionary(line_text, page_number='1', bottom_margin=1000, left_margin=50, font_size=12,
+                           font_family='ff1', font_color='rgb(0, 0, 0)'):
+    """Returns a "line dictionary" (as returned by the extraction backends), by default with the style of the body
+    text of the test resumes. The sizes and positions are given in pixels."""
+    return {
+        'font_size': str(font_size) + 'px',
+        'font_family': font_family,
+        'left_margin': str(left_margin) + 'px',
+        'font_color': font_color,
+        'bottom_margin': str(bottom_margin) + 'px',
+        'line_text': line_text,
+        'page_number': page_number
+    }
@@ -0,0 +1,50 @@
+import unittest
+
+from main.linetable import LineTable
+from main.parser import split_resume_bundle
+from main.tests import create_line_dictionary
+
+
+KEYWORDS_DICT = {
+    'WorkExperience': ['Work Experience', 'Experience'],
+    'Education': ['Education'],
+    'Skills': ['Skills']
+}
+
+
+def create_bundle(pages):
+    """Returns the LineTable of the pages, given as lists of line texts."""
+    resume_object = []
+    for page_number, line_texts in enumerate(pages, 1):
+        for position, line_text in enumerate(line_texts):
+            resume_object.append(create_line_dictionary(line_text, format(page_number, 'x'), 1000 - 50 * position))
+    return LineTable.from_dicts(resume_object)
+
+
+class SplitResumeBundleTest(unittest.TestCase):
+
+    def test_headings_starting_over_start_a_new_resume(self):
+        bundle = create_bundle([
+            ['Work Experience', 'Developer, ACME', 'Skills', 'Python'],
+            ['Work Experience', 'Engineer, Foo', 'Education', 'TU Munich']
+        ])
+        self.assertEqual(split_resume_bundle(bundle, KEYWORDS_DICT), [(0, 0), (1, 1)])
+
+    def test_heading_repeated_on_a_continuation_page_does_not_start_a_new_resume(self):
+        bundle = create_bundle([
+            ['Work Experience', 'Developer, ACME', '01/2015 - 03/2017'],
+            ['Experience', 'Engineer, Foo', '04/2012 - 12/2014', 'Skills', 'Python']
+        ])
+        self.assertEqual(split_resume_bundle(bundle, KEYWORDS_DICT), [(0, 1)])
+
+    def test_new_contact_block_starts_a_new_resume(self):
+        bundle = create_bundle([
+            ['John Doe', 'john.doe@example.com', 'Work Experience', 'Developer, ACME'],
+            ['Skills', 'Python'],
+            ['Jane Roe', 'jane.roe@example.com', 'Education', 'TU Munich']
+        ])
+        self.assertEqual(split_resume_bundle(bundle, KEYWORDS_DICT), [(0, 1), (2, 2)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import io
+import unittest
+import zipfile
+
+from main.docxscraper import convert_docx_resume_to_object
+
+
+DOCUMENT_TEMPLATE = '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" ' \
+                    'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006" ' \
+                    'xmlns:wps="http://schemas.microsoft.com/office/word/2010/wordprocessingShape" ' \
+                    'xmlns:v="urn:schemas-microsoft-com:vml"><w:body>{}<w:sectPr/></w:body></w:document>'
+
+
+def create_paragraph(text):
+    return '<w:p><w:r><w:t xml:space="preserve">{}</w:t></w:r></w:p>'.format(text)
+
+
+def create_text_box(text):
+    """Returns a paragraph anchoring a text box with the text, stored the way Word does: as a drawing, and as a VML
+    fallback repeating the content of the text box."""
+    text_box_content = '<w:txbxContent>{}</w:txbxContent>'.format(create_paragraph(text))
+    return '<w:p><w:r><mc:AlternateContent>' \
+           '<mc:Choice Requires="wps"><w:drawing><wps:txbx>{0}</wps:txbx></w:drawing></mc:Choice>' \
+           '<mc:Fallback><w:pict><v:textbox>{0}</v:textbox></w:pict></mc:Fallback>' \
+           '</mc:AlternateContent></w:r></w:p>'.format(text_box_content)
+
+
+def create_docx(body):
+    """Returns a minimal Word document (without styles) with the body xml as a binary file object."""
+    docx_file = io.BytesIO()
+    with zipfile.ZipFile(docx_file, 'w') as docx_package:
+        docx_package.writestr('word/document.xml', DOCUMENT_TEMPLATE.format(body))
+    docx_file.seek(0)
+    return docx_file
+
+
+class DocxScraperTest(unittest.TestCase):
+
+    def test_paragraphs_are_read_in_document_order(self):
+        docx_file = create_docx(create_paragraph('John Doe') + create_paragraph('Skills'))
+        lines = convert_docx_resume_to_object(docx_file)
+        self.assertEqual([line['line_text'] for line in lines], ['John Doe', 'Skills'])
+
+    def test_text_box_is_read_once_without_its_anchor(self):
+        docx_file = create_docx(create_text_box('John Doe') + create_paragraph('Skills'))
+        lines = convert_docx_resume_to_object(docx_file)
+        self.assertEqual([line['line_text'] for line in lines], ['John Doe', 'Skills'])
+
+    def test_empty_paragraph_is_kept(self):
+        docx_file = create_docx(create_paragraph('John Doe') + '<w:p/>' + create_paragraph('Skills'))
+        lines = convert_docx_resume_to_object(docx_file)
+        self.assertEqual([line['line_text'] for line in lines], ['John Doe', '', 'Skills'])
+
+
+if __name__ == '__main__':
+    unittest.main()
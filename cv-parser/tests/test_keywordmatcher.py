@@ -0,0 +1,106 @@
+import os
+import random
+import re
+import unittest
+
+from main.keywordmatcher import SectionKeywordMatcher
+from main.textCleaners import clean_text_from_nonbasic_characters, replace_any_non_letter_or_number_character
+
+
+KEYWORD_LIST_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'resources',
+                                'keywordlists')
+
+
+def load_keyword_lists():
+    """Returns the section keywords of the resources, the way the ResourceRegistry loads them."""
+    keywords_dict = {}
+    for file_name in sorted(os.listdir(KEYWORD_LIST_DIR)):
+        if file_name.endswith('.txt'):
+            with open(os.path.join(KEYWORD_LIST_DIR, file_name), encoding='utf-8') as keyword_file:
+                keywords_dict[os.path.splitext(file_name)[0]] = keyword_file.read().splitlines()
+    return keywords_dict
+
+
+def match_line_with_regular_expressions(keywords_dict, text):
+    """The former matching of the section keywords: the keywords of each section are searched with regular
+    expressions one by one, the longest first."""
+    line_text = clean_text_from_nonbasic_characters(text)
+    matches = []
+    for section, keywords in keywords_dict.items():
+        for keyword in sorted(keywords, key=len, reverse=True):
+            if re.search(keyword, line_text, re.IGNORECASE) is not None:
+                alphanumeric_text = replace_any_non_letter_or_number_character(line_text).upper()
+                matches.append((section, keyword, re.search(keyword.upper(), line_text) is not None,
+                                re.fullmatch(keyword.upper(), alphanumeric_text) is not None))
+                break
+    return matches
+
+
+def find_section_of_heading_with_regular_expressions(keywords_dict, text):
+    """The former lookup of the section of a heading."""
+    line_text = clean_text_from_nonbasic_characters(text)
+    if not line_text.strip():
+        return None
+    for section, keywords in keywords_dict.items():
+        for keyword in keywords:
+            if re.fullmatch(keyword.upper(), replace_any_non_letter_or_number_character(line_text).upper()):
+                return section
+    return None
+
+
+class SectionKeywordMatcherTest(unittest.TestCase):
+
+    def setUp(self):
+        self.keywords_dict = {
+            'WorkExperience': ['Experience', 'Work Experience', 'Employment'],
+            'Skills': ['Skills', 'Areas of Experience'],
+            'Education': ['Education']
+        }
+        self.matcher = SectionKeywordMatcher(self.keywords_dict)
+
+    def get_matches(self, text):
+        return [(match.section, match.keyword, match.all_caps, match.full_match)
+                for match in self.matcher.match_line(text)]
+
+    def test_longest_keyword_of_each_section_is_matched(self):
+        self.assertEqual(self.get_matches('Work Experience and Areas of Experience'),
+                         [('WorkExperience', 'Work Experience', False, False),
+                          ('Skills', 'Areas of Experience', False, False)])
+
+    def test_all_caps_and_full_match_flags(self):
+        self.assertEqual(self.get_matches('WORK EXPERIENCE:'), [('WorkExperience', 'Work Experience', True, True)])
+        self.assertEqual(self.get_matches('Education'), [('Education', 'Education', False, True)])
+        self.assertEqual(self.get_matches('EDUCATION at TU Munich'), [('Education', 'Education', True, False)])
+
+    def test_span_of_the_match(self):
+        match, = self.matcher.match_line('My Skills')
+        self.assertEqual(match.span, (3, 9))
+
+    def test_lines_without_keywords(self):
+        self.assertEqual(self.matcher.match_line('Developer, ACME'), [])
+        self.assertEqual(self.matcher.match_line(''), [])
+
+    def test_section_of_heading(self):
+        self.assertEqual(self.matcher.find_section_of_heading('WORK EXPERIENCE'), 'WorkExperience')
+        self.assertEqual(self.matcher.find_section_of_heading('Skills:'), 'Skills')
+        self.assertIsNone(self.matcher.find_section_of_heading('Skills and hobbies'))
+        self.assertIsNone(self.matcher.find_section_of_heading('   '))
+
+    def test_same_results_as_regular_expressions(self):
+        keywords_dict = load_keyword_lists()
+        matcher = SectionKeywordMatcher(keywords_dict)
+        words = [keyword for keywords in keywords_dict.values() for keyword in keywords] + \
+            ['foo', 'and', ':', '-', '  ', 'é', 'SKILLS', 'Work', '•']
+        random_generator = random.Random(1)
+        for _ in range(2000):
+            text = ' '.join(random_generator.choice(words) for _ in range(random_generator.randint(1, 3)))
+            text = random_generator.choice([text, text.upper(), text.lower(), text + ':', '• ' + text])
+            self.assertEqual([(match.section, match.keyword, match.all_caps, match.full_match)
+                              for match in matcher.match_line(text)],
+                             match_line_with_regular_expressions(keywords_dict, text), text)
+            self.assertEqual(matcher.find_section_of_heading(text),
+                             find_section_of_heading_with_regular_expressions(keywords_dict, text), text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,178 @@
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from main.layouttemplates import LayoutTemplateStore, configure_default_layout_template_store, get_layout_fingerprint
+from main.linetable import LineTable
+from main.parser import break_text_into_sections
+from main.tests import create_line_dictionary
+
+
+KEYWORDS_DICT = {
+    'WorkExperience': ['Work Experience'],
+    'Education': ['Education'],
+    'Skills': ['Skills'],
+    'Summary': ['Summary']
+}
+
+
+def create_resume(headings):
+    """Returns the "line dictionaries" of a resume with the headings (followed by a line of text each)."""
+    resume_object = []
+    for position, heading in enumerate(headings):
+        bottom_margin = 1000 - 40 * position
+        resume_object.append(create_line_dictionary(heading, bottom_margin=bottom_margin, font_size=16,
+                                                    font_family='ff2'))
+        resume_object.append(create_line_dictionary('Text ' + str(position), bottom_margin=bottom_margin - 20))
+    return resume_object
+
+
+def record_segmentations_in_shared_store(store_path):
+    """Records and saves two segmentation wins ten times, with a store of its own (run in a separate process)."""
+    store = LayoutTemplateStore(store_path)
+    for flush in range(10):
+        store.record_segmentation('template', 'enter')
+        store.record_segmentation('template', 'enter')
+        store.flush()
+
+
+class LayoutTemplateStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.store_dir = tempfile.mkdtemp()
+        self.store_path = os.path.join(self.store_dir, 'layouttemplates.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.store_dir)
+
+    def read_store_file(self):
+        with open(self.store_path) as store_file:
+            return json.load(store_file)
+
+    def test_counts_are_saved_in_batches(self):
+        store = LayoutTemplateStore(self.store_path, flush_interval=3)
+        store.record_segmentation('template', 'enter')
+        store.record_segmentation('template', 'enter')
+        self.assertFalse(os.path.exists(self.store_path))
+        self.assertEqual(store.get_preferred_segmentation('template'), 'enter')
+
+        store.record_segmentation('template', 'left_margin_only')
+        self.assertEqual(self.read_store_file(),
+                         {'template': {'segmentation_wins': {'enter': 2, 'left_margin_only': 1}}})
+
+    def test_templates_seen_once_are_not_saved(self):
+        store = LayoutTemplateStore(self.store_path)
+        store.record_segmentation('one-off', 'enter')
+        store.record_segmentation('template', 'enter')
+        store.record_segmentation('template', 'enter')
+        store.flush()
+        self.assertEqual(list(self.read_store_file()), ['template'])
+
+        # The template is saved, once it's seen again.
+        store.record_segmentation('one-off', 'enter')
+        store.flush()
+        self.assertEqual(sorted(self.read_store_file()), ['one-off', 'template'])
+
+    def test_counts_of_the_stores_sharing_the_file_are_merged(self):
+        first_store = LayoutTemplateStore(self.store_path)
+        second_store = LayoutTemplateStore(self.store_path)
+        for store in (first_store, second_store):
+            store.record_segmentation('template', 'enter')
+            store.record_segmentation('template', 'enter')
+            store.flush()
+        self.assertEqual(self.read_store_file(), {'template': {'segmentation_wins': {'enter': 4}}})
+        self.assertEqual(LayoutTemplateStore(self.store_path).get_counts('template', 'segmentation_wins'),
+                         {'enter': 4})
+
+    def test_counts_of_concurrently_saving_processes_are_not_lost(self):
+        with multiprocessing.Pool(4) as pool:
+            pool.map(record_segmentations_in_shared_store, [self.store_path] * 8)
+        self.assertEqual(self.read_store_file(), {'template': {'segmentation_wins': {'enter': 160}}})
+
+    def test_most_frequent_keyword_style(self):
+        store = LayoutTemplateStore(self.store_path)
+        self.assertIsNone(store.get_keyword_style('template'))
+        odd_style = {'font_size': 12.0, 'font_family': 'ff1'}
+        style = {'font_size': 16.0, 'font_family': 'ff2'}
+        for keyword_style in (odd_style, style, style):
+            store.record_keyword_style('template', keyword_style)
+        self.assertEqual(store.get_keyword_style('template'), style)
+
+    def test_segmentation_needs_enough_wins(self):
+        store = LayoutTemplateStore(self.store_path)
+        store.record_segmentation('template', 'enter')
+        self.assertIsNone(store.get_preferred_segmentation('template'))
+
+
+class KeywordStyleOfLayoutTemplateTest(unittest.TestCase):
+
+    def setUp(self):
+        self.store_dir = tempfile.mkdtemp()
+        self.store = configure_default_layout_template_store(os.path.join(self.store_dir, 'layouttemplates.json'))
+
+    def tearDown(self):
+        configure_default_layout_template_store(None)
+        shutil.rmtree(self.store_dir)
+
+    def test_resume_with_too_few_keywords_is_rescued_by_its_template(self):
+        resume_object = create_resume(['Summary', 'Work Experience', 'Education', 'Skills'])
+        self.assertEqual(sorted(break_text_into_sections(resume_object, KEYWORDS_DICT)),
+                         ['Education', 'Skills', 'Summary', 'WorkExperience'])
+
+        # The style of the headings of two keywords can't be deduced, the style of the template is used.
+        resume_object = create_resume(['Work Experience', 'Projects', 'Education'])
+        self.assertEqual(sorted(break_text_into_sections(resume_object, KEYWORDS_DICT)),
+                         ['Education', 'Projects', 'WorkExperience'])
+        configure_default_layout_template_store(None)
+        self.assertEqual(break_text_into_sections(resume_object, KEYWORDS_DICT), {})
+
+    def test_resume_with_keywords_in_its_text_is_rescued_by_its_template(self):
+        resume_object = create_resume(['Summary', 'Work Experience', 'Education', 'Skills'])
+        resume_object.append(create_line_dictionary('Skills: Python', bottom_margin=600))
+        self.assertEqual(sorted(break_text_into_sections(resume_object, KEYWORDS_DICT)),
+                         ['Education', 'Skills', 'Summary', 'WorkExperience'])
+
+        resume_object = create_resume(['Work Experience', 'Projects', 'Education'])
+        self.assertEqual(sorted(break_text_into_sections(resume_object, KEYWORDS_DICT)),
+                         ['Education', 'Projects', 'WorkExperience'])
+
+    def test_satisfactory_deduction_of_the_resume_is_used(self):
+        resume_object = create_resume(['Summary', 'Work Experience', 'Education', 'Skills'])
+        fingerprint = get_layout_fingerprint(LineTable.from_dicts(resume_object))
+        self.store.record_keyword_style(fingerprint, {'font_size': 12.0, 'font_family': 'ff1', 'left_margin': 50.0,
+                                                      'font_color': 'rgb(0, 0, 0)'})
+        self.assertEqual(sorted(break_text_into_sections(resume_object, KEYWORDS_DICT)),
+                         ['Education', 'Skills', 'Summary', 'WorkExperience'])
+        self.assertEqual(self.store.get_counts(fingerprint, 'keyword_styles')[
+            '{"font_color": "rgb(0, 0, 0)", "font_family": "ff2", "font_size": 16.0, "left_margin": 50.0}'], 1)
+
+    def test_established_style_of_the_template_is_used_without_deduction(self):
+        resume_object = create_resume(['Summary', 'Work Experience', 'Education', 'Skills'])
+        for deduction in range(2):
+            self.assertEqual(len(break_text_into_sections(resume_object, KEYWORDS_DICT)), 4)
+
+        with mock.patch('main.parser.deduce_visual_properties_of_keywords_in_resume') as deduce:
+            self.assertEqual(sorted(break_text_into_sections(resume_object, KEYWORDS_DICT)),
+                             ['Education', 'Skills', 'Summary', 'WorkExperience'])
+        deduce.assert_not_called()
+
+    def test_fingerprint_does_not_depend_on_the_loaded_styles(self):
+        resume_object = LineTable.from_dicts(create_resume(['Summary', 'Work Experience', 'Education']))
+
+        def load_styles(line_indexes):
+            return [tuple(resume_object[line_index][visual_property] for visual_property in
+                          ('font_size', 'font_family', 'left_margin', 'font_color', 'bottom_margin'))
+                    for line_index in line_indexes]
+
+        two_phase_resume_object = LineTable.from_texts(
+            [(line.page_number, line.line_text) for line in resume_object], load_styles)
+        self.assertEqual(get_layout_fingerprint(two_phase_resume_object),
+                         get_layout_fingerprint(resume_object))
+
+
+if __name__ == '__main__':
+    unittest.main()
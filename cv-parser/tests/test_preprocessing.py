@@ -0,0 +1,52 @@
+import unittest
+
+from main.preprocessing import preprocess_resume_lines
+from main.tests import create_line_dictionary
+
+
+def create_page(page_number, body_lines, header='John Doe, john.doe@example.com', footer=None):
+    """Returns the lines of a page: the header, the body lines from the top to the bottom and the footer."""
+    lines = [create_line_dictionary(header, page_number, 1000)]
+    for position, line_text in enumerate(body_lines):
+        lines.append(create_line_dictionary(line_text, page_number, 900 - 50 * position))
+    if footer is not None:
+        lines.append(create_line_dictionary(footer, page_number, 20))
+    return lines
+
+
+def get_texts(resume_object):
+    return [line.line_text for line in resume_object]
+
+
+class RemoveRepeatedPageLinesTest(unittest.TestCase):
+
+    def test_repeated_header_and_page_numbers_are_removed(self):
+        resume_object = create_page('1', ['Work Experience', 'Developer, ACME', '01/2015 - 03/2017'],
+                                    footer='Page 1 of 2') + \
+            create_page('2', ['Engineer, Foo', '04/2012 - 12/2014', 'Skills'], footer='Page 2 of 2')
+        self.assertEqual(get_texts(preprocess_resume_lines(resume_object)),
+                         ['Work Experience', 'Developer, ACME', '01/2015 - 03/2017', 'Engineer, Foo',
+                          '04/2012 - 12/2014', 'Skills'])
+
+    def test_bare_page_numbers_are_removed(self):
+        resume_object = create_page('1', ['Work Experience'], footer='- 1 -') + \
+            create_page('2', ['Skills'], footer='- 2 -')
+        self.assertEqual(get_texts(preprocess_resume_lines(resume_object)), ['Work Experience', 'Skills'])
+
+    def test_date_rows_at_the_same_position_are_kept(self):
+        # Template resumes put the dates of the jobs at the same position on every page.
+        resume_object = create_page('1', ['Work Experience', 'Developer, ACME', '01/2015 - 03/2017']) + \
+            create_page('2', ['Engineer, Foo', '', '04/2012 - 12/2014'])
+        self.assertEqual(get_texts(preprocess_resume_lines(resume_object)),
+                         ['Work Experience', 'Developer, ACME', '01/2015 - 03/2017', 'Engineer, Foo', '',
+                          '04/2012 - 12/2014'])
+
+    def test_repeated_lines_in_the_middle_of_the_pages_are_kept(self):
+        body_lines = ['Line ' + str(position) for position in range(8)]
+        resume_object = create_page('1', body_lines[:3] + ['References'] + body_lines[3:]) + \
+            create_page('2', body_lines[:3] + ['References'] + body_lines[3:])
+        self.assertEqual(get_texts(preprocess_resume_lines(resume_object)).count('References'), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
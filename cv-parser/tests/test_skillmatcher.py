@@ -0,0 +1,66 @@
+import random
+import re
+import unittest
+
+from main.keywordmatcher import SkillMatch, SkillMatcher
+
+
+SKILLS = ['python', 'java', 'javascript', 'c', 'c++', 'c#', 'go', 'google cloud', 'sql', 'sql server', 'ms sql', 'r',
+          'node.js', 'js', 'machine learning', 'learning', 'Java', '.net', 'asp.net', 'objective-c', 'html5', 'html',
+          'css', 'aws', 'scala']
+
+
+def find_skills_with_regular_expressions(skills, text):
+    """The former search of the skills: the regular expression of each skill is searched one by one, the longest
+    first, and the found skill is removed from the text."""
+    found_skills = []
+    for skill in sorted(skills, key=len, reverse=True):
+        match = re.search(r'((?<=^)|(?<=[^a-zA-Z\d]))' + re.escape(skill.lower()) + r'(?=$|[^a-zA-Z\d])',
+                          text.lower())
+        if match:
+            text = text.replace(match.group(), "")
+            found_skills.append(skill)
+    return found_skills
+
+
+class SkillMatcherTest(unittest.TestCase):
+
+    def setUp(self):
+        self.matcher = SkillMatcher(SKILLS)
+
+    def test_longer_skills_win(self):
+        self.assertEqual(self.matcher.find_distinct_skills('javascript'), ['javascript'])
+        self.assertEqual(self.matcher.find_distinct_skills('java and javascript'), ['javascript', 'java'])
+        self.assertEqual(self.matcher.find_distinct_skills('sql server'), ['sql server'])
+        self.assertEqual(self.matcher.find_distinct_skills('ms sql'), ['ms sql'])
+        self.assertEqual(self.matcher.find_distinct_skills('ms sql, sql server and sql'),
+                         ['sql server', 'ms sql', 'sql'])
+        self.assertEqual(self.matcher.find_distinct_skills('machine learning'), ['machine learning'])
+
+    def test_skills_are_matched_as_whole_words(self):
+        self.assertEqual(self.matcher.find_distinct_skills('c++, c# and c'), ['c++', 'c#', 'c'])
+        self.assertEqual(self.matcher.find_distinct_skills('google'), [])
+        self.assertEqual(self.matcher.find_distinct_skills('html5 (css3)'), ['html5'])
+        self.assertEqual(self.matcher.find_distinct_skills('asp.net/node.js'), ['node.js', 'asp.net'])
+
+    def test_case_variants_are_found_once(self):
+        self.assertEqual(self.matcher.find_distinct_skills('JAVA, Java and java'), ['java'])
+
+    def test_spans_of_the_occurrences(self):
+        self.assertEqual(self.matcher.find_skills('Java, javascript and SQL Server'),
+                         [SkillMatch('java', (0, 4)), SkillMatch('javascript', (6, 16)),
+                          SkillMatch('sql server', (21, 31))])
+
+    def test_same_results_as_regular_expressions(self):
+        words = SKILLS + ['and', 'with', 'experience', 'google', 'learning-based', 'x', '5', 'javascripts']
+        separators = [' ', ', ', '/', '-', '.', ' (', ') ', '\n']
+        random_generator = random.Random(1)
+        for _ in range(2000):
+            text = ''.join(random_generator.choice(words) + random_generator.choice(separators)
+                           for _ in range(random_generator.randint(1, 12))).lower()
+            self.assertEqual(self.matcher.find_distinct_skills(text),
+                             find_skills_with_regular_expressions(SKILLS, text), text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+
+from main.layoutstatistics import LayoutStatistics
+from main.linetable import Line
+from main.styleindex import StyleIndex, StyleSignature, get_style_signature, quantize_visual_property
+from main.tests import create_line_dictionary
+
+
+def create_line(line_index, **style):
+    """Returns the Line of the first page with the given style (see create_line_dictionary)."""
+    line_props = create_line_dictionary('Line ' + str(line_index), bottom_margin=1000 - 20 * line_index, **style)
+    return Line.from_dict(line_props, 0, line_index)
+
+
+def create_line_without_style(line_index):
+    """Returns a Line, whose style is not loaded yet."""
+    return Line(None, None, None, None, None, 'Line ' + str(line_index), '1', 0, line_index)
+
+
+class QuantizationTest(unittest.TestCase):
+
+    def test_font_sizes_at_the_bucket_edges(self):
+        self.assertEqual(quantize_visual_property('font_size', 12.24), 12.0)
+        self.assertEqual(quantize_visual_property('font_size', 12.25), 12.5)
+        self.assertEqual(quantize_visual_property('font_size', 12.74), 12.5)
+        self.assertEqual(quantize_visual_property('font_size', 12.75), 13.0)
+
+    def test_left_margins_at_the_bucket_edges(self):
+        self.assertEqual(quantize_visual_property('left_margin', 72.49), 72.0)
+        self.assertEqual(quantize_visual_property('left_margin', 72.5), 73.0)
+
+    def test_other_properties_and_unknown_values_are_unchanged(self):
+        self.assertEqual(quantize_visual_property('font_family', 'ff1'), 'ff1')
+        self.assertEqual(quantize_visual_property('bottom_margin', 12.24), 12.24)
+        self.assertIsNone(quantize_visual_property('font_size', None))
+
+    def test_layout_statistics_are_quantized_the_same_way(self):
+        values = [12.24, 12.25, 12.74, 12.75]
+        lines = [create_line(line_index, font_size=value, left_margin=value * 6)
+                 for line_index, value in enumerate(values)]
+        layout_statistics = LayoutStatistics(lines).quantized()
+        self.assertEqual(layout_statistics.font_size.tolist(),
+                         [quantize_visual_property('font_size', value) for value in values])
+        self.assertEqual(layout_statistics.left_margin.tolist(),
+                         [quantize_visual_property('left_margin', value * 6) for value in values])
+
+
+class StyleIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.lines = [
+            create_line(0, font_size=16.02, font_family='ff2', left_margin=49.8),
+            create_line(1),
+            create_line(2, font_size=15.98, font_family='ff2', left_margin=50.2),
+            create_line(3, font_size=16.0, font_family='ff2', left_margin=80.0),
+            create_line_without_style(4)
+        ]
+        self.style_index = StyleIndex(self.lines)
+
+    def test_signature_of_line(self):
+        self.assertEqual(get_style_signature(self.lines[0]), StyleSignature(16.0, 'ff2', 50.0, 'rgb(0, 0, 0)'))
+
+    def test_lines_with_near_identical_style_are_found(self):
+        style = {'font_size': 16.0, 'font_family': 'ff2', 'left_margin': 50.0, 'font_color': 'rgb(0, 0, 0)'}
+        self.assertEqual(self.style_index.find_lines(style), {0, 2})
+
+    def test_missing_properties_match_any_value(self):
+        self.assertEqual(self.style_index.find_lines({'font_size': 16.0, 'font_family': 'ff2'}), {0, 2, 3})
+        self.assertEqual(self.style_index.find_lines({}), {0, 1, 2, 3})
+
+    def test_no_line_has_the_style(self):
+        self.assertEqual(self.style_index.find_lines({'font_size': 20.0}), set())
+
+
+if __name__ == '__main__':
+    unittest.main()
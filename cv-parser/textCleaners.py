@@ -1,10 +1,15 @@
 import re
+from collections import namedtuple
 from nltk.tokenize import sent_tokenize
 
 
 # Module containing various text cleaning functions
 
 
+# Normalized forms of the text of a resume line (see normalize_line_text).
+NormalizedText = namedtuple('NormalizedText', ['cleaned', 'upper', 'alphanumeric', 'is_blank'])
+
+
 def clean_text_from_geometrical_shape_unicode(line):
     """Cleans the line from geometrical shape characters and replaces these with space."""
     line = re.sub(r"([\u25A0-\u25FF])", " ", line)
@@ -118,4 +123,13 @@ def clean_for_comparison(text):
     """Cleans the text by removing almost all non-alphanumeric characters."""
     text = clean_text(text)
     text = clean_text_from_nonbasic_characters(text)
-    return text
\ No newline at end of file
+    return text
+
+
+def normalize_line_text(text):
+    """Returns the NormalizedText of the text: the text cleaned by clean_text_from_nonbasic_characters, the upper-cased
+    text, the upper-cased alphanumeric characters of the cleaned text (see replace_any_non_letter_or_number_character)
+    and whether the text is blank."""
+    cleaned_text = clean_text_from_nonbasic_characters(text)
+    return NormalizedText(cleaned_text, text.upper(), replace_any_non_letter_or_number_character(cleaned_text).upper(),
+                          not text.strip())